@@ -0,0 +1,98 @@
+"""
+`mpu6050_async`
+================================================================================
+
+uasyncio driver for the MPU6050 6-DoF Accelerometer and Gyroscope, built on top of
+upy_adafruit_mpu6050.py. The 1 ms polls of the reset bit and of the first sample
+are awaited instead of slept, so the other tasks keep running while the sensor starts.
+
+* Author(s): Rodrigo França
+
+Implementation Notes
+--------------------
+
+**Software and Dependencies:**
+
+* upy_adafruit_mpu6050.py and upy_i2c_register_tools.py
+
+* uasyncio (MicroPython) or asyncio (CPython)
+
+"""
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+from upy_adafruit_mpu6050 import MPU6050
+
+try:
+    from typing import Tuple
+    from machine import I2C
+except ImportError:
+    pass
+
+
+class AsyncMPU6050(MPU6050):
+    """uasyncio driver for the MPU6050. The constructor only checks the device id,
+    `begin` must be awaited before the first read.
+
+    :param ~machine.I2C i2c: The I2C bus the device is connected to
+    :param int i2c_addr: The I2C device address. Defaults to :const:`0x68`
+    :param bool cache_registers: Keep a shadow copy of the configuration registers.
+        Defaults to :const:`False`
+
+    .. code-block:: python
+
+        async def main():
+            mpu = AsyncMPU6050(i2c)
+            await mpu.begin()
+            while True:
+                acceleration, gyro, temperature = await mpu.read()
+                await asyncio.sleep_ms(10)
+    """
+
+    def __init__(
+        self,
+        i2c: I2C,
+        i2c_addr: int = 0x68,
+        cache_registers: bool = False,
+    ) -> None:
+        self._setup(i2c, i2c_addr, cache_registers)
+
+    async def begin(self, warm_start: bool = False) -> None:
+        """Reset and configure the sensor, yielding to the event loop during every wait.
+        With ``warm_start``, a sensor that is already awake and configured is kept as is"""
+        for delay in self._begin(warm_start):
+            await asyncio.sleep(delay)
+
+    async def reset_async(self) -> None:
+        """Reinitialize the sensor like :meth:`reset`, yielding to the event loop during every wait"""
+        for delay in self._reset_steps():
+            await asyncio.sleep(delay)
+
+    async def configure(
+        self,
+        gyro_range: int = None,
+        accelerometer_range: int = None,
+        filter_bandwidth: int = None,
+        cycle_rate: int = None,
+    ) -> None:
+        """Change several settings and await the settling time once instead of
+        sleeping 10 ms after each property assignment"""
+        if gyro_range is not None:
+            self._write_gyro_range(gyro_range)
+        if accelerometer_range is not None:
+            self._write_accelerometer_range(accelerometer_range)
+        if filter_bandwidth is not None:
+            self._write_filter_bandwidth(filter_bandwidth)
+        if cycle_rate is not None:
+            self._write_cycle_rate(cycle_rate)
+        await asyncio.sleep(0.01)
+
+    async def read(
+        self,
+    ) -> Tuple[Tuple[float, float, float], Tuple[float, float, float], float]:
+        """Acceleration in :math:`m/s^2`, gyroscope in :math:`rad/s` and temperature in
+        º Celsius, read in a single I2C transaction"""
+        return self.read_all()
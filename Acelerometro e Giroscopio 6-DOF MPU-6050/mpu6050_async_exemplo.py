@@ -0,0 +1,58 @@
+"""!
+@file mpu6050_async_exemplo.py
+@brief Programa para ler o IMU MPU6050, o teclado matricial 4x4 e o sensor HC-SR04 de forma concorrente com uasyncio.
+@details Este programa utiliza as bibliotecas mpu6050_async, matrix_keyboard_4x4_async e hcsr04_async. Cada sensor é
+         atendido por uma tarefa do uasyncio e todas as esperas (inicialização do IMU, estabilização das linhas do
+         teclado, debounce e pulso de echo do HC-SR04) devolvem o controle para as outras tarefas.
+         As bibliotecas matrix_keyboard_4x4.py, matrix_keyboard_4x4_async.py, hcsr04.py e hcsr04_async.py devem ser
+         copiadas para o Raspberry Pi Pico junto com as bibliotecas do MPU6050.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Importa as classes Pin e I2C da biblioteca machine para controlar o hardware do Raspberry Pi Pico
+from machine import Pin, I2C
+# Importa a biblioteca uasyncio para executar tarefas concorrentes
+import uasyncio as asyncio
+# Importa as classes dos drivers uasyncio
+from mpu6050_async import AsyncMPU6050
+from matrix_keyboard_4x4_async import AsyncMatrixKeyboard
+from hcsr04_async import AsyncHCSR04
+
+# Define os pinos do Raspberry Pi Pico conectados ao barramento I2C 0
+i2c0_slc_pin = 9
+i2c0_sda_pin = 8
+
+# Inicializa o I2C0 com os pinos GPIO9 (SCL) e GPIO8 (SDA)
+i2c0 = I2C(0, scl=Pin(i2c0_slc_pin), sda=Pin(i2c0_sda_pin), freq=100000)
+
+# Tarefa que lê o IMU MPU6050 a cada segundo
+async def imu_task():
+    mpu6050 = AsyncMPU6050(i2c0)
+    await mpu6050.begin()
+    while True:
+        (accel, gyro, temp) = await mpu6050.read()
+        print("Aceleração X: {:.2f}, Y: {:.2f}, Z: {:.2f} m/s^2".format(*accel))
+        print("Rotação X: {:.2f}, Y: {:.2f}, Z: {:.2f} rad/s".format(*gyro))
+        print("Temperatura: {:.2f} C".format(temp))
+        await asyncio.sleep(1)
+
+# Tarefa que exibe as teclas pressionadas no teclado matricial
+async def keyboard_task():
+    keyboard = AsyncMatrixKeyboard([18, 19, 20, 21], [10, 11, 12, 13])
+    while True:
+        key = await keyboard.next_key()
+        print("Tecla pressionada: {}".format(key))
+
+# Tarefa que mede a distância com o sensor HC-SR04 a cada 500 ms
+async def sonar_task():
+    sonar = AsyncHCSR04(trigger_pin=16, echo_pin=17)
+    while True:
+        print("Distância: {:.1f} cm".format(await sonar.measure_cm()))
+        await asyncio.sleep(0.5)
+
+# Executa as tarefas de forma concorrente
+async def main():
+    await asyncio.gather(imu_task(), keyboard_task(), sonar_task())
+
+asyncio.run(main())
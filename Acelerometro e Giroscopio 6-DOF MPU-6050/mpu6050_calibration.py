@@ -0,0 +1,173 @@
+"""
+`mpu6050_calibration`
+================================================================================
+
+Bias calibration of the MPU6050 6-DoF Accelerometer and Gyroscope. `calibrate`
+collects a block of raw samples through the sensor FIFO (one bulk I2C read per up
+to 85 samples), computes the mean and the noise of every axis in a single pass of
+integer sums, and returns a `Calibration` with the offsets. `Calibration.apply`
+loads them into the driver, which subtracts them in the raw-count domain on every
+reading, and `Calibration.save` / `Calibration.load` keep them in a JSON file so the
+next boots skip the calibration:
+
+.. code-block:: python
+
+    calibration = Calibration.load()
+    if calibration is None:
+        calibration = calibrate(mpu)  # keep the sensor still and level
+        calibration.save()
+    calibration.apply(mpu)
+
+The offsets are stored in counts of the ±2 g and ±250 º/s ranges, so they stay
+valid when the ranges change.
+
+* Author(s): Rodrigo França
+
+Implementation Notes
+--------------------
+
+**Software and Dependencies:**
+
+* upy_adafruit_mpu6050.py, upy_i2c_register_tools.py, upy_sample_ring.py and mpu6050_fifo.py
+
+"""
+
+import json
+from math import sqrt
+
+from utime import sleep_ms
+
+from mpu6050_fifo import MPU6050FIFO
+from upy_adafruit_mpu6050 import MPU6050, _ACCEL_LSB, _GYRO_LSB
+
+try:
+    from typing import Tuple
+except ImportError:
+    pass
+
+_CACHE_VERSION = 1  # version of the calibration file format
+
+
+class Calibration:
+    """Accelerometer and gyroscope offsets and noise, in counts of the ±2 g and
+    ±250 º/s ranges.
+
+    :param accel_offset: The accelerometer X, Y and Z offsets
+    :param gyro_offset: The gyroscope X, Y and Z offsets
+    :param accel_noise: The standard deviation of the accelerometer X, Y and Z
+    :param gyro_noise: The standard deviation of the gyroscope X, Y and Z
+    :param int samples: The number of samples the calibration was computed from
+    """
+
+    def __init__(
+        self,
+        accel_offset: Tuple[int, int, int] = (0, 0, 0),
+        gyro_offset: Tuple[int, int, int] = (0, 0, 0),
+        accel_noise: Tuple[float, float, float] = (0.0, 0.0, 0.0),
+        gyro_noise: Tuple[float, float, float] = (0.0, 0.0, 0.0),
+        samples: int = 0,
+    ) -> None:
+        self.accel_offset = tuple(accel_offset)
+        self.gyro_offset = tuple(gyro_offset)
+        self.accel_noise = tuple(accel_noise)
+        self.gyro_noise = tuple(gyro_noise)
+        self.samples = samples
+
+    def apply(self, sensor: MPU6050) -> None:
+        """Load the offsets into the driver"""
+        sensor.offsets = (self.accel_offset, self.gyro_offset)
+
+    def to_dict(self) -> dict:
+        """The calibration as a dict of lists, ready for `json`"""
+        return {
+            "version": _CACHE_VERSION,
+            "accel_offset": list(self.accel_offset),
+            "gyro_offset": list(self.gyro_offset),
+            "accel_noise": list(self.accel_noise),
+            "gyro_noise": list(self.gyro_noise),
+            "samples": self.samples,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Calibration":
+        """Rebuild a calibration from `to_dict`"""
+        if data.get("version") != _CACHE_VERSION:
+            raise ValueError("Unsupported calibration version")
+        return cls(
+            data["accel_offset"],
+            data["gyro_offset"],
+            data.get("accel_noise", (0.0, 0.0, 0.0)),
+            data.get("gyro_noise", (0.0, 0.0, 0.0)),
+            data.get("samples", 0),
+        )
+
+    def save(self, path: str = "mpu6050_calibration.json") -> None:
+        """Save the calibration to a JSON file"""
+        with open(path, "w") as calibration_file:
+            json.dump(self.to_dict(), calibration_file)
+
+    @classmethod
+    def load(cls, path: str = "mpu6050_calibration.json"):
+        """Load a calibration saved by `save`. Returns :const:`None` if the file is
+        missing or invalid"""
+        try:
+            with open(path) as calibration_file:
+                return cls.from_dict(json.load(calibration_file))
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def calibrate(
+    sensor: MPU6050,
+    samples: int = 512,
+    gravity: Tuple[int, int, int] = (0, 0, 1),
+) -> Calibration:
+    """Measure the offsets of a still sensor. The sensor FIFO is used to collect the
+    samples, so it must not be streaming.
+
+    :param MPU6050 sensor: The configured sensor, kept still during the calibration
+    :param int samples: The number of samples averaged. Defaults to :const:`512`
+    :param gravity: The gravity on the X, Y and Z axes in g, for the orientation of
+        the sensor. Defaults to :const:`(0, 0, 1)`, Z axis up
+    """
+    stream = MPU6050FIFO(sensor, capacity=128)
+    sums = [0] * 6
+    squares = [0] * 6
+    collected = 0
+    # Wait for about half a FIFO (42 samples) between the drains
+    wait_ms = max(1, int(42000 / stream.sample_rate))
+
+    stream.start()
+    try:
+        while collected < samples:
+            sleep_ms(wait_ms)
+            stream.drain()
+            for _, raw in stream.ring.drain(samples - collected):
+                for axis in range(6):
+                    value = raw[axis]
+                    sums[axis] += value
+                    squares[axis] += value * value
+                collected += 1
+    finally:
+        stream.stop()
+
+    # Back to the counts of the ±2 g and ±250 º/s ranges
+    accel_range, gyro_range = sensor._ranges
+    accel_factor = _ACCEL_LSB[0] / _ACCEL_LSB[accel_range]
+    gyro_factor = _GYRO_LSB[0] / _GYRO_LSB[gyro_range]
+    means = []
+    noise = []
+    for axis in range(6):
+        factor = accel_factor if axis < 3 else gyro_factor
+        # Exact integer numerator, the float form cancels catastrophically on large offsets
+        variance = (collected * squares[axis] - sums[axis] * sums[axis]) / (collected * max(1, collected - 1))
+        means.append(sums[axis] / collected * factor)
+        noise.append(sqrt(max(0.0, variance)) * factor)
+
+    return Calibration(
+        tuple(round(means[axis] - gravity[axis] * _ACCEL_LSB[0]) for axis in range(3)),
+        tuple(round(means[axis]) for axis in range(3, 6)),
+        tuple(noise[0:3]),
+        tuple(noise[3:6]),
+        collected,
+    )
@@ -0,0 +1,58 @@
+"""!
+@file mpu6050_calibration_exemplo.py
+@brief Programa para calibrar os offsets do IMU MPU6050 e salvá-los na memória flash do Raspberry Pi Pico.
+@details Este programa utiliza a biblioteca mpu6050_calibration para medir os offsets do acelerômetro e do giroscópio
+         do MPU6050 com o sensor parado e nivelado (eixo Z para cima). A calibração é salva no arquivo
+         mpu6050_calibration.json e carregada nas próximas inicializações, sem calibrar novamente. Depois disso a
+         aceleração e a rotação corrigidas são exibidas no console a cada segundo.
+         As bibliotecas upy_adafruit_mpu6050.py, upy_i2c_register_tools.py, upy_sample_ring.py e mpu6050_fifo.py
+         devem ser copiadas para o Raspberry Pi Pico.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Importa as classes Pin e I2C da biblioteca machine para controlar o hardware do Raspberry Pi Pico
+from machine import Pin, I2C
+# Importa a classe MPU6050 da biblioteca upy_adafruit_mpu6050.py
+from upy_adafruit_mpu6050 import MPU6050
+# Importa a classe Calibration e a função calibrate da biblioteca mpu6050_calibration.py
+from mpu6050_calibration import Calibration, calibrate
+# Importa a biblioteca utime para usar funções relacionadas ao tempo
+import utime
+
+# Define os pinos do Raspberry Pi Pico conectados ao barramento I2C 0
+i2c0_slc_pin = 9
+i2c0_sda_pin = 8
+
+# Inicializa o I2C0 com os pinos GPIO9 (SCL) e GPIO8 (SDA)
+i2c0 = I2C(0, scl=Pin(i2c0_slc_pin), sda=Pin(i2c0_sda_pin), freq=400000)
+
+# Inicializa o IMU MPU6050
+mpu6050 = MPU6050(i2c0)
+
+# Carrega a calibração salva na memória flash ou calibra o sensor, se ela não existir
+calibracao = Calibration.load()
+if calibracao is None:
+    print("Calibrando: mantenha o sensor parado e nivelado...")
+    calibracao = calibrate(mpu6050, samples=512)
+    calibracao.save()
+    print("Calibração salva com {} amostras".format(calibracao.samples))
+
+# Aplica os offsets no driver e exibe os valores no console
+calibracao.apply(mpu6050)
+print("Offsets do acelerômetro: {}, do giroscópio: {}".format(calibracao.accel_offset, calibracao.gyro_offset))
+print("Ruído do acelerômetro: {:.1f}, {:.1f}, {:.1f}".format(*calibracao.accel_noise))
+print("Ruído do giroscópio: {:.1f}, {:.1f}, {:.1f}".format(*calibracao.gyro_noise))
+
+# Loop infinito
+while True:
+
+    # Lê a aceleração, rotação e temperatura corrigidas em uma única transação I2C
+    (accel, gyro, temp) = mpu6050.read_all()
+
+    # Exibe os valores lidos no console
+    print("Aceleração X: {:.2f}, Y: {:.2f}, Z: {:.2f} m/s^2".format(accel[0], accel[1], accel[2]))
+    print("Rotação X: {:.3f}, Y: {:.3f}, Z: {:.3f} rad/s".format(gyro[0], gyro[1], gyro[2]))
+
+    # Aguarda 1 segundo antes de ler novamente
+    utime.sleep(1)
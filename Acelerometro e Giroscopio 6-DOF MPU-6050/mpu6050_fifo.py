@@ -0,0 +1,158 @@
+"""
+`mpu6050_fifo`
+================================================================================
+
+FIFO streaming for the MPU6050 6-DoF Accelerometer and Gyroscope, built on top of
+upy_adafruit_mpu6050.py. The sensor loads every accelerometer and gyroscope sample
+into its 1024-byte FIFO (12 bytes per sample), and `MPU6050FIFO.drain` moves all the
+whole samples waiting in it to a preallocated `upy_sample_ring.SampleRing` with one
+INT_STATUS read, one FIFO_COUNT read and one bulk FIFO read. The application no longer has to poll at
+the sample rate: at 1 kHz the FIFO holds 85 ms of samples between two drains.
+
+* Author(s): Rodrigo França
+
+Implementation Notes
+--------------------
+
+**Software and Dependencies:**
+
+* upy_adafruit_mpu6050.py, upy_i2c_register_tools.py and upy_sample_ring.py
+
+"""
+
+from utime import ticks_add, ticks_diff, ticks_us
+
+from upy_adafruit_mpu6050 import MPU6050, _MPU6050_FIFO_R_W
+from upy_sample_ring import SampleRing
+
+_FIFO_SIZE = 1024  # bytes
+_FIFO_ACCEL_GYRO = 0x78  # FIFO_EN: XG_FIFO_EN, YG_FIFO_EN, ZG_FIFO_EN and ACCEL_FIFO_EN
+_FRAME_SIZE = 12  # ACCEL_XOUT to ACCEL_ZOUT followed by GYRO_XOUT to GYRO_ZOUT
+_FRAME_FORMAT = ">6h"
+_FIFO_OFLOW_INT = 0x10  # INT_STATUS: the FIFO overflowed since the last INT_STATUS read
+
+
+class MPU6050FIFO:
+    """Streams the accelerometer and gyroscope samples of a `MPU6050` through its FIFO.
+
+    :param MPU6050 sensor: The configured sensor. The sample rate is read from its
+        :attr:`~MPU6050.sample_rate_divisor` and :attr:`~MPU6050.filter_bandwidth`
+        when :meth:`start` is called
+    :param int capacity: The number of samples kept in :attr:`ring`. Defaults to :const:`256`
+
+    Each sample in :attr:`ring` is ``(index, (ax, ay, az, gx, gy, gz))`` in raw counts,
+    where ``index`` counts the samples since :meth:`start`, so its time in seconds is
+    ``index / sample_rate``, and :meth:`timestamp` converts it to ``utime.ticks_us()``
+    without reading the clock for every sample. Use :meth:`scale` to convert to
+    :math:`m/s^2` and :math:`rad/s`.
+
+    .. code-block:: python
+
+        mpu.sample_rate_divisor = 0
+        mpu.filter_bandwidth = Bandwidth.BAND_184_HZ  # 1 kHz
+        stream = MPU6050FIFO(mpu)
+        stream.start()
+        while True:
+            stream.drain()
+            for index, raw in stream.ring.drain():
+                acceleration, gyro = stream.scale(raw)
+            utime.sleep_ms(20)
+    """
+
+    def __init__(self, sensor: MPU6050, capacity: int = 256) -> None:
+        self.sensor = sensor
+        self.ring = SampleRing(capacity, _FRAME_FORMAT)
+        self.sample_rate = sensor.sample_rate
+        self.period_us = 1000000 / self.sample_rate
+        """The sample period, in µs"""
+        self.overflows = 0
+        """Number of times the FIFO filled up before being drained. The samples lost
+        are skipped in the sample indices, estimated from the time since :meth:`start`,
+        so the indices and :meth:`timestamp` keep following the sample clock"""
+        self.overflow_index = None
+        """Index of the first sample after the last overflow, the samples from the
+        last one drained up to it were lost. :const:`None` before any overflow"""
+        self._next_index = 0
+        self._start_us = ticks_us()
+
+    def start(self) -> None:
+        """Empty the FIFO and start loading the accelerometer and gyroscope samples"""
+        sensor = self.sensor
+        self.sample_rate = sensor.sample_rate
+        self.period_us = 1000000 / self.sample_rate
+        sensor._fifo_enable = False
+        sensor._fifo_en = _FIFO_ACCEL_GYRO
+        sensor._fifo_reset = True
+        sensor._int_status  # clear an overflow flag left from before the reset
+        sensor._fifo_enable = True
+        self._start_us = ticks_us()
+        self._next_index = 0
+        self.overflows = 0
+        self.overflow_index = None
+        self.ring.clear()
+
+    def timestamp(self, index: int) -> int:
+        """The ``utime.ticks_us()`` time of the sample ``index``, from the time of
+        :meth:`start` and the sample period"""
+        return ticks_add(self._start_us, int((index + 1) * self.period_us))
+
+    def stop(self) -> None:
+        """Stop loading samples into the FIFO"""
+        self.sensor._fifo_enable = False
+        self.sensor._fifo_en = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of whole samples waiting in the FIFO"""
+        return self.sensor._fifo_count // _FRAME_SIZE
+
+    def drain(self) -> int:
+        """Move the whole samples waiting in the FIFO to :attr:`ring`, with a single
+        bulk read (two when the ring wraps around). Returns the number of samples moved.
+        Reading INT_STATUS clears its other flags too, such as DATA_RDY"""
+        sensor = self.sensor
+        if sensor._int_status & _FIFO_OFLOW_INT:
+            # The oldest bytes were overwritten, so the frames are no longer
+            # aligned: stop the FIFO, empty it and start loading it again
+            sensor._fifo_enable = False
+            sensor._fifo_reset = True
+            sensor._fifo_enable = True
+            self.overflows += 1
+            # The next sample loaded is the first one after the reset
+            elapsed_us = ticks_diff(ticks_us(), self._start_us)
+            self._next_index = max(self._next_index, int(elapsed_us / self.period_us))
+            self.overflow_index = self._next_index
+            return 0
+
+        count = sensor._fifo_count
+
+        ring = self.ring
+        i2c = sensor._i2c
+        addr = sensor._i2c_addr
+        remaining = count // _FRAME_SIZE
+        while remaining:
+            view, nsamples = ring.reserve(remaining)
+            i2c.readfrom_mem_into(addr, _MPU6050_FIFO_R_W, view)
+            ring.commit(nsamples, self._next_index)
+            self._next_index += nsamples
+            remaining -= nsamples
+        return count // _FRAME_SIZE
+
+    def scale(self, raw):
+        """Convert the raw counts of a sample to acceleration in :math:`m/s^2` and
+        gyroscope in :math:`rad/s`, using the ranges and offsets cached by the sensor"""
+        offsets = self.sensor._raw_offsets
+        accel_scale = self.sensor._accel_scale
+        gyro_scale = self.sensor._gyro_scale
+        return (
+            (
+                (raw[0] - offsets[0]) * accel_scale,
+                (raw[1] - offsets[1]) * accel_scale,
+                (raw[2] - offsets[2]) * accel_scale,
+            ),
+            (
+                (raw[3] - offsets[4]) * gyro_scale,
+                (raw[4] - offsets[5]) * gyro_scale,
+                (raw[5] - offsets[6]) * gyro_scale,
+            ),
+        )
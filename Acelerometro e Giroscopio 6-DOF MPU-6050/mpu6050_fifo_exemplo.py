@@ -0,0 +1,65 @@
+"""!
+@file mpu6050_fifo_exemplo.py
+@brief Programa para amostrar o IMU MPU6050 a 1 kHz usando a FIFO do sensor e o Raspberry Pi Pico.
+@details Este programa utiliza a biblioteca mpu6050_fifo para carregar as amostras do acelerômetro e do giroscópio na
+         FIFO do MPU6050 a 1 kHz. A cada 50 ms todas as amostras da FIFO são copiadas para um buffer circular com uma
+         única leitura em bloco, e a média da aceleração e o número de amostras recebidas são exibidos no console.
+         As bibliotecas upy_adafruit_mpu6050.py, upy_i2c_register_tools.py e upy_sample_ring.py devem ser copiadas
+         para o Raspberry Pi Pico.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Importa as classes Pin e I2C da biblioteca machine para controlar o hardware do Raspberry Pi Pico
+from machine import Pin, I2C
+# Importa as classes MPU6050 e Bandwidth da biblioteca upy_adafruit_mpu6050.py
+from upy_adafruit_mpu6050 import MPU6050, Bandwidth
+# Importa a classe MPU6050FIFO da biblioteca mpu6050_fifo.py
+from mpu6050_fifo import MPU6050FIFO
+# Importa a biblioteca utime para usar funções relacionadas ao tempo
+import utime
+
+# Define os pinos do Raspberry Pi Pico conectados ao barramento I2C 0
+i2c0_slc_pin = 9
+i2c0_sda_pin = 8
+
+# Inicializa o I2C0 com os pinos GPIO9 (SCL) e GPIO8 (SDA) a 400 kHz
+i2c0 = I2C(0, scl=Pin(i2c0_slc_pin), sda=Pin(i2c0_sda_pin), freq=400000)
+
+# Inicializa o IMU MPU6050
+mpu6050 = MPU6050(i2c0)
+
+# Configura a taxa de amostragem em 1 kHz: filtro passa-baixas ligado (1 kHz) e divisor 0
+mpu6050.filter_bandwidth = Bandwidth.BAND_184_HZ
+mpu6050.sample_rate_divisor = 0
+
+# Inicia o carregamento das amostras na FIFO, com um buffer circular de 256 amostras
+mpu6050_fifo = MPU6050FIFO(mpu6050, capacity=256)
+mpu6050_fifo.start()
+print("Taxa de amostragem: {:.0f} Hz".format(mpu6050_fifo.sample_rate))
+
+# Loop infinito
+while True:
+
+    # Copia as amostras da FIFO para o buffer circular
+    mpu6050_fifo.drain()
+
+    # Calcula a média da aceleração das amostras recebidas
+    soma = [0, 0, 0]
+    amostras = 0
+    for (indice, amostra) in mpu6050_fifo.ring.drain():
+        soma[0] += amostra[0]
+        soma[1] += amostra[1]
+        soma[2] += amostra[2]
+        amostras += 1
+
+    # Exibe a média no console
+    if amostras > 0:
+        (accel, gyro) = mpu6050_fifo.scale((soma[0] / amostras, soma[1] / amostras, soma[2] / amostras, 0, 0, 0))
+        print("Amostra {}: {} amostras, aceleração média X: {:.2f}, Y: {:.2f}, Z: {:.2f} m/s^2".format(
+            indice, amostras, accel[0], accel[1], accel[2]))
+    if mpu6050_fifo.overflows:
+        print("FIFO cheia {} vezes".format(mpu6050_fifo.overflows))
+
+    # Aguarda 50 ms antes de esvaziar a FIFO novamente
+    utime.sleep_ms(50)
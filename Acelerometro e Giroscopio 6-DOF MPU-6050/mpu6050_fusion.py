@@ -0,0 +1,294 @@
+"""
+`mpu6050_fusion`
+================================================================================
+
+Attitude estimation for the MPU6050 6-DoF Accelerometer and Gyroscope, running on
+the board at the sensor sample rate. `ComplementaryFilter` and `MadgwickFilter`
+take the raw counts straight from the sensor, one sample at a time (`update`) or a
+block of raw samples from the FIFO or the data-ready acquisition (`update_frames`,
+`update_ring`), without unpacking them into tuples. The state lives in a
+preallocated ``array('f')`` and every constant that depends on the sample period
+and on the gyroscope range is computed once, in `configure`.
+
+The accelerometer is only used as a direction, so its range does not matter. Yaw
+is not observable without a magnetometer, it is the integrated gyroscope rate.
+
+* Author(s): Rodrigo França
+
+Implementation Notes
+--------------------
+
+**Software and Dependencies:**
+
+* upy_adafruit_mpu6050.py and upy_sample_ring.py
+
+"""
+
+from array import array
+from math import asin, atan2, cos, sin, sqrt
+
+import micropython
+
+from upy_adafruit_mpu6050 import MPU6050
+
+try:
+    from typing import Tuple
+except ImportError:
+    pass
+
+# Offset of the gyroscope data in the samples of the supported rings, by sample size
+_GYRO_OFFSETS = {12: 6, 14: 8}  # FIFO frames, data register samples with temperature
+
+
+class AttitudeFilter:
+    """Base class of the attitude filters. The filters provide ``reset()``, which
+    returns to the level attitude with zero yaw, and ``update(ax, ay, az, gx, gy, gz)``,
+    which advances the estimate by one sample in raw counts.
+
+    :param MPU6050 sensor: The configured sensor. The sample rate and the gyroscope
+        range are read from it. Call :meth:`configure` again if they change
+    :param float sample_rate: The rate the samples are fed to the filter, in Hz.
+        Defaults to the sample rate of the sensor
+    """
+
+    def __init__(self, sensor: MPU6050, sample_rate: float = None) -> None:
+        self.sensor = sensor
+        self.samples = 0
+        self.configure(sample_rate)
+        self.reset()
+
+    def configure(self, sample_rate: float = None) -> None:
+        """Precompute the constants of the sample period and of the gyroscope range"""
+        if sample_rate is None:
+            sample_rate = self.sensor.sample_rate
+        self.sample_rate = sample_rate
+        self.dt = 1.0 / sample_rate
+        self._gyro_dt = self.sensor._gyro_scale * self.dt  # rad per count per sample
+
+    @micropython.native
+    def update_frames(self, buf, nframes: int, frame_size: int = 12, gyro_offset: int = 6) -> None:
+        """Advance the estimate by a block of raw big-endian samples, such as the
+        12-byte FIFO frames (the default) or the 14-byte data register samples
+        (``frame_size=14, gyro_offset=8``), corrected by the offsets of the sensor"""
+        update = self.update
+        offsets = self.sensor._raw_offsets
+        oax = offsets[0] + 0x10000
+        oay = offsets[1] + 0x10000
+        oaz = offsets[2] + 0x10000
+        ogx = offsets[4] + 0x10000
+        ogy = offsets[5] + 0x10000
+        ogz = offsets[6] + 0x10000
+        i = 0
+        for _ in range(nframes):
+            ax = buf[i] << 8 | buf[i + 1]
+            ay = buf[i + 2] << 8 | buf[i + 3]
+            az = buf[i + 4] << 8 | buf[i + 5]
+            j = i + gyro_offset
+            gx = buf[j] << 8 | buf[j + 1]
+            gy = buf[j + 2] << 8 | buf[j + 3]
+            gz = buf[j + 4] << 8 | buf[j + 5]
+            # sign extension and offset correction in one subtraction
+            update(
+                ax - oax if ax & 0x8000 else ax - oax + 0x10000,
+                ay - oay if ay & 0x8000 else ay - oay + 0x10000,
+                az - oaz if az & 0x8000 else az - oaz + 0x10000,
+                gx - ogx if gx & 0x8000 else gx - ogx + 0x10000,
+                gy - ogy if gy & 0x8000 else gy - ogy + 0x10000,
+                gz - ogz if gz & 0x8000 else gz - ogz + 0x10000,
+            )
+            i += frame_size
+
+    def update_ring(self, ring) -> int:
+        """Advance the estimate by all the samples of a `upy_sample_ring.SampleRing`
+        filled by `mpu6050_fifo.MPU6050FIFO` or `mpu6050_irq.MPU6050DataReady`, and
+        remove them from the ring. Returns the number of samples"""
+        frame_size = ring.sample_size
+        gyro_offset = _GYRO_OFFSETS.get(frame_size)
+        if gyro_offset is None:
+            raise ValueError("Samples of %d bytes are not supported" % frame_size)
+        total = 0
+        for view, nsamples in ring.regions():
+            self.update_frames(view, nsamples, frame_size, gyro_offset)
+            total += nsamples
+        ring.discard(total)
+        return total
+
+    @property
+    def euler(self) -> Tuple[float, float, float]:
+        """Roll, pitch and yaw in radians"""
+        return (self.roll, self.pitch, self.yaw)
+
+
+class ComplementaryFilter(AttitudeFilter):
+    """Complementary filter: the integrated gyroscope rate, corrected towards the
+    accelerometer tilt by ``1 - alpha`` on every sample.
+
+    :param MPU6050 sensor: The configured sensor
+    :param float alpha: The weight of the gyroscope, from 0 to 1. Defaults to :const:`0.98`
+    :param float sample_rate: The rate the samples are fed to the filter, in Hz.
+        Defaults to the sample rate of the sensor
+    """
+
+    def __init__(self, sensor: MPU6050, alpha: float = 0.98, sample_rate: float = None) -> None:
+        self.alpha = alpha
+        self._angles = array("f", (0.0, 0.0, 0.0))  # roll, pitch and yaw
+        super().__init__(sensor, sample_rate)
+
+    def reset(self) -> None:
+        """Return to the level attitude with zero yaw"""
+        angles = self._angles
+        angles[0] = angles[1] = angles[2] = 0.0
+        self.samples = 0
+
+    @micropython.native
+    def update(self, ax: int, ay: int, az: int, gx: int, gy: int, gz: int) -> None:
+        """Advance the estimate by one sample, in raw counts"""
+        angles = self._angles
+        alpha = self.alpha
+        gyro_dt = self._gyro_dt
+        accel_roll = atan2(ay, az)
+        accel_pitch = atan2(-ax, sqrt(ay * ay + az * az))
+        angles[0] = alpha * (angles[0] + gx * gyro_dt) + (1.0 - alpha) * accel_roll
+        angles[1] = alpha * (angles[1] + gy * gyro_dt) + (1.0 - alpha) * accel_pitch
+        angles[2] += gz * gyro_dt
+        self.samples += 1
+
+    @property
+    def roll(self) -> float:
+        """Rotation about the X axis, in radians"""
+        return self._angles[0]
+
+    @property
+    def pitch(self) -> float:
+        """Rotation about the Y axis, in radians"""
+        return self._angles[1]
+
+    @property
+    def yaw(self) -> float:
+        """Rotation about the Z axis, in radians (gyroscope only)"""
+        return self._angles[2]
+
+    @property
+    def quaternion(self) -> Tuple[float, float, float, float]:
+        """The attitude as a unit quaternion (w, x, y, z)"""
+        half_roll = self._angles[0] / 2
+        half_pitch = self._angles[1] / 2
+        half_yaw = self._angles[2] / 2
+        cr, sr = cos(half_roll), sin(half_roll)
+        cp, sp = cos(half_pitch), sin(half_pitch)
+        cy, sy = cos(half_yaw), sin(half_yaw)
+        return (
+            cr * cp * cy + sr * sp * sy,
+            sr * cp * cy - cr * sp * sy,
+            cr * sp * cy + sr * cp * sy,
+            cr * cp * sy - sr * sp * cy,
+        )
+
+
+class MadgwickFilter(AttitudeFilter):
+    """Madgwick gradient descent filter (IMU version, without magnetometer), keeping
+    the attitude as a quaternion.
+
+    :param MPU6050 sensor: The configured sensor
+    :param float beta: The gain of the accelerometer correction, in rad/s. Higher
+        values converge faster and let more accelerometer noise in. Defaults to :const:`0.1`
+    :param float sample_rate: The rate the samples are fed to the filter, in Hz.
+        Defaults to the sample rate of the sensor
+    """
+
+    def __init__(self, sensor: MPU6050, beta: float = 0.1, sample_rate: float = None) -> None:
+        self.beta = beta
+        self._q = array("f", (1.0, 0.0, 0.0, 0.0))  # w, x, y, z
+        super().__init__(sensor, sample_rate)
+
+    def configure(self, sample_rate: float = None) -> None:
+        super().configure(sample_rate)
+        self._half_gyro_dt = 0.5 * self._gyro_dt
+        self._beta_dt = self.beta * self.dt
+
+    def reset(self) -> None:
+        """Return to the level attitude with zero yaw"""
+        q = self._q
+        q[0] = 1.0
+        q[1] = q[2] = q[3] = 0.0
+        self.samples = 0
+
+    @micropython.native
+    def update(self, ax: int, ay: int, az: int, gx: int, gy: int, gz: int) -> None:
+        """Advance the estimate by one sample, in raw counts"""
+        q = self._q
+        q0 = q[0]
+        q1 = q[1]
+        q2 = q[2]
+        q3 = q[3]
+
+        # Rate of change of the quaternion from the gyroscope, times dt
+        half_gyro_dt = self._half_gyro_dt
+        hx = gx * half_gyro_dt
+        hy = gy * half_gyro_dt
+        hz = gz * half_gyro_dt
+        dq0 = -q1 * hx - q2 * hy - q3 * hz
+        dq1 = q0 * hx + q2 * hz - q3 * hy
+        dq2 = q0 * hy - q1 * hz + q3 * hx
+        dq3 = q0 * hz + q1 * hy - q2 * hx
+
+        norm = ax * ax + ay * ay + az * az
+        if norm > 0:
+            # Gradient descent step towards the gravity direction measured by the accelerometer
+            norm = 1.0 / sqrt(norm)
+            fax = ax * norm
+            fay = ay * norm
+            faz = az * norm
+            q0q0 = q0 * q0
+            q1q1 = q1 * q1
+            q2q2 = q2 * q2
+            q3q3 = q3 * q3
+            s0 = 4.0 * q0 * q2q2 + 2.0 * q2 * fax + 4.0 * q0 * q1q1 - 2.0 * q1 * fay
+            s1 = (4.0 * q1 * q3q3 - 2.0 * q3 * fax + 4.0 * q0q0 * q1 - 2.0 * q0 * fay - 4.0 * q1
+                  + 8.0 * q1 * q1q1 + 8.0 * q1 * q2q2 + 4.0 * q1 * faz)
+            s2 = (4.0 * q0q0 * q2 + 2.0 * q0 * fax + 4.0 * q2 * q3q3 - 2.0 * q3 * fay - 4.0 * q2
+                  + 8.0 * q2 * q1q1 + 8.0 * q2 * q2q2 + 4.0 * q2 * faz)
+            s3 = 4.0 * q1q1 * q3 - 2.0 * q1 * fax + 4.0 * q2q2 * q3 - 2.0 * q2 * fay
+            norm = s0 * s0 + s1 * s1 + s2 * s2 + s3 * s3
+            if norm > 0:
+                norm = self._beta_dt / sqrt(norm)
+                dq0 -= s0 * norm
+                dq1 -= s1 * norm
+                dq2 -= s2 * norm
+                dq3 -= s3 * norm
+
+        q0 += dq0
+        q1 += dq1
+        q2 += dq2
+        q3 += dq3
+        norm = 1.0 / sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+        q[0] = q0 * norm
+        q[1] = q1 * norm
+        q[2] = q2 * norm
+        q[3] = q3 * norm
+        self.samples += 1
+
+    @property
+    def quaternion(self) -> Tuple[float, float, float, float]:
+        """The attitude as a unit quaternion (w, x, y, z)"""
+        q = self._q
+        return (q[0], q[1], q[2], q[3])
+
+    @property
+    def roll(self) -> float:
+        """Rotation about the X axis, in radians"""
+        q0, q1, q2, q3 = self._q
+        return atan2(2.0 * (q0 * q1 + q2 * q3), 1.0 - 2.0 * (q1 * q1 + q2 * q2))
+
+    @property
+    def pitch(self) -> float:
+        """Rotation about the Y axis, in radians"""
+        q0, q1, q2, q3 = self._q
+        value = 2.0 * (q0 * q2 - q3 * q1)
+        return asin(max(-1.0, min(1.0, value)))
+
+    @property
+    def yaw(self) -> float:
+        """Rotation about the Z axis, in radians (gyroscope only)"""
+        q0, q1, q2, q3 = self._q
+        return atan2(2.0 * (q0 * q3 + q1 * q2), 1.0 - 2.0 * (q2 * q2 + q3 * q3))
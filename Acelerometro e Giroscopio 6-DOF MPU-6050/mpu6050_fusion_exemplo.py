@@ -0,0 +1,59 @@
+"""!
+@file mpu6050_fusion_exemplo.py
+@brief Programa para estimar a orientação (roll, pitch e yaw) do IMU MPU6050 usando o Raspberry Pi Pico.
+@details Este programa utiliza a biblioteca mpu6050_fifo para amostrar o MPU6050 a 200 Hz pela FIFO e a biblioteca
+         mpu6050_fusion para estimar a orientação com o filtro de Madgwick, processando todas as amostras recebidas
+         no próprio Raspberry Pi Pico. Os ângulos roll, pitch e yaw são exibidos no console a cada 100 ms.
+         As bibliotecas upy_adafruit_mpu6050.py, upy_i2c_register_tools.py, upy_sample_ring.py e mpu6050_fifo.py
+         devem ser copiadas para o Raspberry Pi Pico.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Importa as classes Pin e I2C da biblioteca machine para controlar o hardware do Raspberry Pi Pico
+from machine import Pin, I2C
+# Importa as classes MPU6050 e Bandwidth da biblioteca upy_adafruit_mpu6050.py
+from upy_adafruit_mpu6050 import MPU6050, Bandwidth
+# Importa a classe MPU6050FIFO da biblioteca mpu6050_fifo.py
+from mpu6050_fifo import MPU6050FIFO
+# Importa a classe MadgwickFilter da biblioteca mpu6050_fusion.py
+from mpu6050_fusion import MadgwickFilter
+# Importa a função degrees da biblioteca math para converter os ângulos para graus
+from math import degrees
+# Importa a biblioteca utime para usar funções relacionadas ao tempo
+import utime
+
+# Define os pinos do Raspberry Pi Pico conectados ao barramento I2C 0
+i2c0_slc_pin = 9
+i2c0_sda_pin = 8
+
+# Inicializa o I2C0 com os pinos GPIO9 (SCL) e GPIO8 (SDA) a 400 kHz
+i2c0 = I2C(0, scl=Pin(i2c0_slc_pin), sda=Pin(i2c0_sda_pin), freq=400000)
+
+# Inicializa o IMU MPU6050
+mpu6050 = MPU6050(i2c0)
+
+# Configura a taxa de amostragem em 200 Hz: filtro passa-baixas de 94 Hz (1 kHz) e divisor 4 (1 kHz / 5)
+mpu6050.filter_bandwidth = Bandwidth.BAND_94_HZ
+mpu6050.sample_rate_divisor = 4
+
+# Inicia o carregamento das amostras na FIFO
+mpu6050_fifo = MPU6050FIFO(mpu6050, capacity=64)
+mpu6050_fifo.start()
+
+# Inicializa o filtro de Madgwick com a taxa de amostragem e a escala do giroscópio do sensor
+filtro = MadgwickFilter(mpu6050, beta=0.1)
+
+# Loop infinito
+while True:
+
+    # Copia as amostras da FIFO para o buffer circular e atualiza a orientação com todas elas
+    mpu6050_fifo.drain()
+    filtro.update_ring(mpu6050_fifo.ring)
+
+    # Exibe os ângulos em graus no console
+    print("Roll: {:.1f}, Pitch: {:.1f}, Yaw: {:.1f} graus".format(
+        degrees(filtro.roll), degrees(filtro.pitch), degrees(filtro.yaw)))
+
+    # Aguarda 100 ms antes de processar as próximas amostras
+    utime.sleep_ms(100)
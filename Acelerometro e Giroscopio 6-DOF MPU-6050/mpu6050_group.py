@@ -0,0 +1,417 @@
+"""
+`mpu6050_group`
+================================================================================
+
+Synchronized sampling of two or more MPU6050 6-DoF Accelerometers and Gyroscopes,
+such as the two addresses (0x68 and 0x69) of the same I2C bus.
+
+`MPU6050GroupFIFO` copies the sample rate, filter and range configuration of the
+first sensor (the leader) to the others. It then restarts the signal paths and the
+FIFOs of all the sensors back-to-back, with nothing in between, and streams all the
+FIFOs, pairing their samples by index. The sensors run from their own internal
+clocks, which differ by up to a few percent, so every drain polls the FIFO counts
+until each sensor loads a new sample and measures the phase of every follower from
+the times they arrived. Whenever a follower drifts more than half a sample period
+from the leader, whole samples are dropped to pair it with the nearest one again.
+
+`MPU6050Group` reads the 14-byte data blocks of all the sensors back-to-back on
+every DATA_RDY interrupt of the leader, into one paired sample with one timestamp,
+without the FIFOs. The sensors are not synchronized in that case: the samples of the
+followers are up to one sample period older than the leader sample.
+
+* Author(s): Rodrigo França
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* AD0 of the second module connected to 3.3 V (address 0x69)
+* The INT pin of the leader connected to a GPIO of the board, for :meth:`MPU6050Group.start`
+
+**Software and Dependencies:**
+
+* upy_adafruit_mpu6050.py, upy_i2c_register_tools.py, upy_sample_ring.py,
+  mpu6050_fifo.py and mpu6050_irq.py
+
+"""
+
+from ustruct import unpack_from
+from utime import ticks_add, ticks_diff, ticks_us
+
+from mpu6050_fifo import _FIFO_ACCEL_GYRO, _FIFO_OFLOW_INT, _FIFO_SIZE, _FRAME_SIZE
+from mpu6050_irq import MPU6050DataReady, _scale
+from upy_adafruit_mpu6050 import (
+    MPU6050,
+    _MPU6050_ACCEL_OUT,
+    _MPU6050_FIFO_R_W,
+    _MPU6050_SIG_PATH_RESET,
+    _MPU6050_USER_CTRL,
+)
+from upy_sample_ring import SampleRing
+
+try:
+    from typing import Sequence
+except ImportError:
+    pass
+
+_BURST_SIZE = 14  # ACCEL_OUT, TEMP_OUT and GYRO_OUT
+_SIGNAL_PATH_RESET = b"\x07"  # GYRO_RESET, ACCEL_RESET and TEMP_RESET
+_USER_CTRL_FIFO_START = 0x44  # USER_CTRL: FIFO_EN and FIFO_RESET
+
+
+def _copy_config(sensors) -> None:
+    # Copy the configuration of the leader to the other sensors, the sample rate
+    # divisors last
+    leader = sensors[0]
+    bandwidth = leader.filter_bandwidth
+    divisor = leader.sample_rate_divisor
+    accel_range, gyro_range = leader._ranges
+    for sensor in sensors[1:]:
+        sensor.filter_bandwidth = bandwidth
+        sensor.accelerometer_range = accel_range
+        sensor.gyro_range = gyro_range
+    for sensor in sensors:
+        sensor.sample_rate_divisor = divisor
+
+
+def _scale_frame(sensor: MPU6050, raw, base: int):
+    # Scales the 6 values of a FIFO frame starting at raw[base]
+    offsets = sensor._raw_offsets
+    accel_scale = sensor._accel_scale
+    gyro_scale = sensor._gyro_scale
+    return (
+        (
+            (raw[base] - offsets[0]) * accel_scale,
+            (raw[base + 1] - offsets[1]) * accel_scale,
+            (raw[base + 2] - offsets[2]) * accel_scale,
+        ),
+        (
+            (raw[base + 3] - offsets[4]) * gyro_scale,
+            (raw[base + 4] - offsets[5]) * gyro_scale,
+            (raw[base + 5] - offsets[6]) * gyro_scale,
+        ),
+    )
+
+
+class MPU6050GroupFIFO:
+    """Streams the samples of several `MPU6050` through their FIFOs, started together
+    and paired by index.
+
+    :param sensors: The configured sensors. The first one is the leader, whose
+        configuration is copied to the others by :meth:`start`
+    :param int capacity: The number of paired samples kept in :attr:`ring`. Defaults
+        to :const:`256`
+
+    Each sample in :attr:`ring` is ``(index, raw)``, where ``raw`` holds the 6 raw
+    counts ``(ax, ay, az, gx, gy, gz)`` of every sensor, in the order of ``sensors``,
+    and ``index`` counts the samples of the leader since :meth:`start`, as in
+    `mpu6050_fifo.MPU6050FIFO`. Use :meth:`scale` to convert them.
+
+    .. code-block:: python
+
+        group = MPU6050GroupFIFO((MPU6050(i2c, 0x68), MPU6050(i2c, 0x69)))
+        group.start()
+        while True:
+            group.drain()
+            print(group.phase_us)
+            for index, raw in group.ring.drain():
+                (accel_a, gyro_a), (accel_b, gyro_b) = group.scale(raw)
+            utime.sleep_ms(20)
+    """
+
+    def __init__(self, sensors: Sequence[MPU6050], capacity: int = 256) -> None:
+        if len(sensors) < 2:
+            raise ValueError("A group needs at least two sensors")
+        self.sensors = tuple(sensors)
+        count = len(self.sensors)
+        self.ring = SampleRing(capacity, ">%dh" % (6 * count))
+        self.sample_rate = self.sensors[0].sample_rate
+        self.period_us = 1000000 / self.sample_rate
+        """The sample period of the leader, in µs"""
+        self.start_skew_us = 0
+        """Time taken by the back-to-back signal path and FIFO resets of all the
+        sensors at the last start, in µs"""
+        self.start_phase_us = [0] * (count - 1)
+        """Time from the first sample of the leader to the first sample of each
+        follower after the last start, in µs"""
+        self.phase_us = [0] * (count - 1)
+        """Time from each leader sample to the follower sample paired with it by the
+        last :meth:`drain`, in µs. Measured to the time of one round of FIFO_COUNT
+        reads, and kept within half a sample period"""
+        self.slips = [0] * (count - 1)
+        """Whole samples each follower gained over the leader since :meth:`start`
+        (negative if it lost them), dropped to keep the pairs aligned"""
+        self.overflows = 0
+        """Number of times a FIFO filled up before being drained. All the FIFOs are
+        started together again and the samples lost are skipped in the sample
+        indices, estimated from the time since :meth:`start`"""
+        self.overflow_index = None
+        """Index of the first sample after the last overflow. :const:`None` before
+        any overflow"""
+        self._stage = memoryview(bytearray(_FIFO_SIZE))
+        self._controls = [None] * count
+        self._counts = [0] * count  # samples waiting in each FIFO
+        self._loaded = [0] * count  # samples read from each FIFO since the restart
+        self._frames = [0] * count  # samples loaded when the last new one arrived
+        self._arrival_us = [0] * count
+        self._drops = [0] * count
+        self._offsets = [0] * (count - 1)  # follower minus leader samples dropped
+        self._next_index = 0
+        self._start_us = ticks_us()
+
+    def start(self) -> None:
+        """Copy the configuration of the leader to the other sensors, start all the
+        FIFOs together and measure the phase of the followers. Blocks until every
+        sensor has loaded its first sample"""
+        _copy_config(self.sensors)
+        self.sample_rate = self.sensors[0].sample_rate
+        self.period_us = 1000000 / self.sample_rate
+        for i in range(len(self.slips)):
+            self.slips[i] = 0
+        self._next_index = 0
+        self.overflows = 0
+        self.overflow_index = None
+        self.ring.clear()
+        self._restart()
+        self._start_us = ticks_add(self._arrival_us[0], -int(self.period_us))
+
+    def _restart(self) -> None:
+        sensors = self.sensors
+        controls = self._controls
+        for i, sensor in enumerate(sensors):
+            sensor._fifo_enable = False
+            sensor._fifo_en = _FIFO_ACCEL_GYRO
+            sensor._int_status  # clear an overflow flag left from before the reset
+            user_ctrl = sensor._i2c.readfrom_mem(sensor._i2c_addr, _MPU6050_USER_CTRL, 1)[0]
+            controls[i] = bytes((user_ctrl | _USER_CTRL_FIFO_START,))
+            self._loaded[i] = 0
+        for i in range(len(self._offsets)):
+            self._offsets[i] = 0
+
+        # Restart the sample clocks and the FIFOs of all the sensors back-to-back
+        start = ticks_us()
+        for sensor, user_ctrl in zip(sensors, controls):
+            sensor._i2c.writeto_mem(sensor._i2c_addr, _MPU6050_SIG_PATH_RESET, _SIGNAL_PATH_RESET)
+            sensor._i2c.writeto_mem(sensor._i2c_addr, _MPU6050_USER_CTRL, user_ctrl)
+        self.start_skew_us = ticks_diff(ticks_us(), start)
+
+        self._measure()
+        for i in range(len(self.start_phase_us)):
+            self.start_phase_us[i] = ticks_diff(self._arrival_us[i + 1], self._arrival_us[0])
+
+    def _measure(self) -> bool:
+        # Poll the FIFO counts round-robin until every sensor loads a new sample,
+        # taking the time it arrived. Returns False if a FIFO is full
+        sensors = self.sensors
+        counts = self._counts
+        frames = self._frames
+        for i, sensor in enumerate(sensors):
+            counts[i] = sensor._fifo_count // _FRAME_SIZE
+            frames[i] = -1
+        waiting = len(sensors)
+        start = ticks_us()
+        timeout_us = 2 * self.period_us + 10000
+        while waiting:
+            for i, sensor in enumerate(sensors):
+                if frames[i] < 0:
+                    count = sensor._fifo_count
+                    if count > _FIFO_SIZE - 2 * _FRAME_SIZE:
+                        return False
+                    count //= _FRAME_SIZE
+                    if count > counts[i]:
+                        self._arrival_us[i] = ticks_us()
+                        counts[i] = count
+                        frames[i] = self._loaded[i] + count
+                        waiting -= 1
+            if waiting and ticks_diff(ticks_us(), start) > timeout_us:
+                raise RuntimeError("MPU6050 timed out waiting for a FIFO sample")
+        return True
+
+    def timestamp(self, index: int) -> int:
+        """The ``utime.ticks_us()`` time of the leader sample ``index``, from the time
+        of its first sample and the sample period"""
+        return ticks_add(self._start_us, int((index + 1) * self.period_us))
+
+    def stop(self) -> None:
+        """Stop loading samples into the FIFOs"""
+        for sensor in self.sensors:
+            sensor._fifo_enable = False
+            sensor._fifo_en = 0
+
+    def _overflow(self) -> int:
+        # The frames of a FIFO are no longer aligned, or are about to be: start all
+        # the FIFOs together again and skip the samples lost
+        self.overflows += 1
+        self._restart()
+        elapsed_us = ticks_diff(self._arrival_us[0], self._start_us)
+        self._next_index = max(self._next_index, round(elapsed_us / self.period_us) - 1)
+        self.overflow_index = self._next_index
+        return 0
+
+    def drain(self) -> int:
+        """Measure the phase of the followers, drop the samples that keep the pairs
+        more than half a sample period apart, and move the samples waiting in all the
+        FIFOs to :attr:`ring`, paired by index, with one bulk read per FIFO (two when
+        the ring wraps around). Blocks until every sensor loads a new sample, up to
+        one sample period. Returns the number of paired samples moved"""
+        sensors = self.sensors
+        for sensor in sensors:
+            if sensor._int_status & _FIFO_OFLOW_INT:
+                return self._overflow()
+        if not self._measure():
+            return self._overflow()
+
+        # Phase of the follower samples paired with the leader sample that arrived,
+        # and the whole samples to drop to bring it within half a sample period
+        counts = self._counts
+        frames = self._frames
+        arrival_us = self._arrival_us
+        period_us = self.period_us
+        drops = self._drops
+        lowest = 0
+        for i in range(1, len(sensors)):
+            phase = ticks_diff(arrival_us[i], arrival_us[0])
+            phase += (frames[0] + self._offsets[i - 1] - frames[i]) * period_us
+            shift = round(phase / period_us)
+            self.phase_us[i - 1] = int(phase - shift * period_us)
+            drops[i] = -shift
+            lowest = min(lowest, drops[i])
+        drops[0] = 0
+        nsamples = _FIFO_SIZE
+        for i in range(len(sensors)):
+            drops[i] -= lowest
+            nsamples = min(nsamples, counts[i] - drops[i])
+        if nsamples < 0:
+            # Not loaded yet, keep the pairs as they are until a later drain
+            for i in range(len(sensors)):
+                drops[i] = 0
+            for i in range(len(self.phase_us)):
+                self.phase_us[i] = int(
+                    ticks_diff(arrival_us[i + 1], arrival_us[0])
+                    + (frames[0] + self._offsets[i] - frames[i + 1]) * period_us
+                )
+            nsamples = min(counts)
+        for i in range(1, len(sensors)):
+            self._offsets[i - 1] += drops[i] - drops[0]
+            self.slips[i - 1] += drops[i] - drops[0]
+
+        loaded = self._loaded
+        stage = self._stage
+        for i, sensor in enumerate(sensors):
+            if drops[i]:
+                sensor._i2c.readfrom_mem_into(
+                    sensor._i2c_addr, _MPU6050_FIFO_R_W, stage[:drops[i] * _FRAME_SIZE]
+                )
+            loaded[i] += drops[i] + nsamples
+        self._next_index += drops[0]
+
+        ring = self.ring
+        sample_size = ring.sample_size
+        remaining = nsamples
+        while remaining:
+            view, count = ring.reserve(remaining)
+            for i, sensor in enumerate(sensors):
+                sensor._i2c.readfrom_mem_into(
+                    sensor._i2c_addr, _MPU6050_FIFO_R_W, stage[:count * _FRAME_SIZE]
+                )
+                src = 0
+                dst = i * _FRAME_SIZE
+                for _ in range(count):
+                    view[dst:dst + _FRAME_SIZE] = stage[src:src + _FRAME_SIZE]
+                    src += _FRAME_SIZE
+                    dst += sample_size
+            ring.commit(count, self._next_index)
+            self._next_index += count
+            remaining -= count
+        return nsamples
+
+    def scale(self, raw):
+        """Convert the raw counts of a paired sample to one ``(acceleration, gyro)``
+        tuple per sensor, in :math:`m/s^2` and :math:`rad/s`, using the ranges and
+        offsets cached by each sensor"""
+        return tuple(_scale_frame(sensor, raw, 6 * i) for i, sensor in enumerate(self.sensors))
+
+
+class MPU6050Group(MPU6050DataReady):
+    """Reads the samples of several `MPU6050` together, on the DATA_RDY interrupt of
+    the first one. Use `MPU6050GroupFIFO` for synchronized samples.
+
+    :param sensors: The configured sensors. The first one is the leader, whose
+        configuration is copied to the others by :meth:`copy_config`
+    :param ~machine.Pin pin: The input pin connected to the INT pin of the leader, for
+        :meth:`start`. Defaults to :const:`None`
+    :param int capacity: The number of paired samples kept in :attr:`ring`. Defaults
+        to :const:`256`
+
+    Each sample in :attr:`ring` and each :meth:`read` is ``(timestamp, raw)``, where
+    ``raw`` holds the 7 raw counts ``(ax, ay, az, temp, gx, gy, gz)`` of every sensor,
+    in the order of ``sensors``. Use :meth:`scale` to convert them.
+
+    .. code-block:: python
+
+        group = MPU6050Group((MPU6050(i2c, 0x68), MPU6050(i2c, 0x69)), Pin(15, Pin.IN))
+        group.copy_config()
+        group.start()
+        while True:
+            for timestamp, raw in group.ring.drain():
+                (accel_a, gyro_a, temp_a), (accel_b, gyro_b, temp_b) = group.scale(raw)
+            utime.sleep_ms(20)
+    """
+
+    def __init__(self, sensors: Sequence[MPU6050], pin=None, capacity: int = 256) -> None:
+        if len(sensors) < 2:
+            raise ValueError("A group needs at least two sensors")
+        super().__init__(sensors[0], pin, capacity)
+        self.sensors = tuple(sensors)
+        self._format = ">%dh" % (7 * len(sensors))
+        self.ring = SampleRing(capacity, self._format)
+        self.skew_us = 0
+        """Longest time between the start of the first and the last burst of a paired
+        sample, in µs"""
+        self._buffer = bytearray(_BURST_SIZE * len(sensors))
+
+    def copy_config(self) -> None:
+        """Copy the sample rate divisor, the filter bandwidth and the ranges of the
+        leader to the other sensors, so they sample at the same nominal rate. Their
+        sample instants are not aligned"""
+        _copy_config(self.sensors)
+
+    def _burst(self, buf) -> int:
+        # Back-to-back burst reads of all the sensors, returns the timestamp of the first one
+        first = last = ticks_us()
+        offset = 0
+        for sensor in self.sensors:
+            if offset:
+                last = ticks_us()
+            sensor._i2c.readfrom_mem_into(
+                sensor._i2c_addr, _MPU6050_ACCEL_OUT, buf[offset:offset + _BURST_SIZE]
+            )
+            offset += _BURST_SIZE
+        skew = ticks_diff(last, first)
+        if skew > self.skew_us:
+            self.skew_us = skew
+        return first
+
+    def read(self):
+        """Read a paired sample now, without the interrupt. Returns ``(timestamp, raw)``,
+        where ``timestamp`` is the ``utime.ticks_us()`` value at the first burst"""
+        timestamp = self._burst(memoryview(self._buffer))
+        return (timestamp, unpack_from(self._format, self._buffer))
+
+    def _read(self, _) -> None:
+        timestamp = self._timestamp
+        self._pending = False
+        view, nsamples = self.ring.reserve(1)
+        self._burst(view)
+        self.ring.commit(1, timestamp)
+        self.samples += 1
+        latency = ticks_diff(ticks_us(), timestamp)
+        if latency > self.max_latency_us:
+            self.max_latency_us = latency
+
+    def scale(self, raw):
+        """Convert the raw counts of a paired sample to one ``(acceleration, gyro,
+        temperature)`` tuple per sensor, in :math:`m/s^2`, :math:`rad/s` and º Celsius,
+        using the ranges and offsets cached by each sensor"""
+        return tuple(_scale(sensor, raw, 7 * i) for i, sensor in enumerate(self.sensors))
@@ -0,0 +1,79 @@
+"""!
+@file mpu6050_group_exemplo.py
+@brief Programa para ler dois IMUs MPU6050 sincronizados (endereços 0x68 e 0x69) usando o Raspberry Pi Pico.
+@details Este programa utiliza a biblioteca mpu6050_group para ler os dois MPU6050 do mesmo barramento I2C em pares
+         de amostras sincronizadas: os caminhos de sinal e as FIFOs dos dois sensores são reiniciados um logo após o
+         outro, as duas FIFOs são lidas a cada 20 ms e as amostras são pareadas pelo índice. A cada leitura é medida a
+         defasagem entre as amostras dos dois sensores, e as amostras a mais do sensor cujo relógio interno é mais
+         rápido são descartadas. A cada segundo são exibidos no console a diferença de aceleração entre os dois
+         sensores (vibração diferencial), a defasagem medida e o número de amostras descartadas.
+         O pino AD0 do segundo módulo deve ser ligado ao 3,3 V. As bibliotecas upy_adafruit_mpu6050.py,
+         upy_i2c_register_tools.py, upy_sample_ring.py, mpu6050_fifo.py e mpu6050_irq.py devem ser copiadas para o
+         Raspberry Pi Pico.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Importa as classes Pin e I2C da biblioteca machine para controlar o hardware do Raspberry Pi Pico
+from machine import Pin, I2C
+# Importa as classes MPU6050 e Bandwidth da biblioteca upy_adafruit_mpu6050.py
+from upy_adafruit_mpu6050 import MPU6050, Bandwidth
+# Importa a classe MPU6050GroupFIFO da biblioteca mpu6050_group.py
+from mpu6050_group import MPU6050GroupFIFO
+# Importa a biblioteca utime para usar funções relacionadas ao tempo
+import utime
+
+# Define os pinos do Raspberry Pi Pico conectados ao barramento I2C 0
+i2c0_slc_pin = 9
+i2c0_sda_pin = 8
+
+# Inicializa o I2C0 com os pinos GPIO9 (SCL) e GPIO8 (SDA) a 400 kHz
+i2c0 = I2C(0, scl=Pin(i2c0_slc_pin), sda=Pin(i2c0_sda_pin), freq=400000)
+
+# Inicializa os dois IMUs MPU6050, com AD0 em 0 V (0x68) e em 3,3 V (0x69)
+mpu6050_a = MPU6050(i2c0, 0x68)
+mpu6050_b = MPU6050(i2c0, 0x69)
+
+# Configura a taxa de amostragem do primeiro sensor em 200 Hz: filtro de 94 Hz (1 kHz) e divisor 4 (1 kHz / 5)
+mpu6050_a.filter_bandwidth = Bandwidth.BAND_94_HZ
+mpu6050_a.sample_rate_divisor = 4
+
+# Cria o grupo, copia a configuração do primeiro sensor para o segundo e inicia as duas FIFOs juntas
+grupo = MPU6050GroupFIFO((mpu6050_a, mpu6050_b), capacity=256)
+grupo.start()
+print("Início: reinício em {} us, defasagem do segundo sensor: {} us".format(
+    grupo.start_skew_us, grupo.start_phase_us[0]))
+
+# Loop infinito
+pares = 0
+maior_diferenca = 0.0
+maior_defasagem = 0
+ultimo_relatorio = utime.ticks_ms()
+while True:
+
+    # Move as amostras das duas FIFOs para o buffer circular, pareadas, e guarda a maior defasagem medida
+    grupo.drain()
+    if abs(grupo.phase_us[0]) > abs(maior_defasagem):
+        maior_defasagem = grupo.phase_us[0]
+
+    # Retira os pares do buffer circular e acumula a maior diferença de aceleração entre os sensores
+    for (indice, amostra) in grupo.ring.drain():
+        ((accel_a, gyro_a), (accel_b, gyro_b)) = grupo.scale(amostra)
+        for eixo in range(3):
+            diferenca = abs(accel_a[eixo] - accel_b[eixo])
+            if diferenca > maior_diferenca:
+                maior_diferenca = diferenca
+        pares += 1
+
+    # Exibe os resultados no console a cada segundo
+    if utime.ticks_diff(utime.ticks_ms(), ultimo_relatorio) >= 1000:
+        ultimo_relatorio = utime.ticks_add(ultimo_relatorio, 1000)
+        print("{} pares, maior diferença de aceleração: {:.3f} m/s^2, maior defasagem: {} us, "
+              "amostras descartadas: {}, estouros: {}".format(
+                  pares, maior_diferenca, maior_defasagem, grupo.slips[0], grupo.overflows))
+        pares = 0
+        maior_diferenca = 0.0
+        maior_defasagem = 0
+
+    # Aguarda 20 ms: a 200 Hz são 4 amostras, bem abaixo das 85 que cabem em cada FIFO
+    utime.sleep_ms(20)
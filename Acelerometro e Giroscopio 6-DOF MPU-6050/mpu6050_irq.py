@@ -0,0 +1,148 @@
+"""
+`mpu6050_irq`
+================================================================================
+
+Data-ready interrupt driven acquisition for the MPU6050 6-DoF Accelerometer and
+Gyroscope, built on top of upy_adafruit_mpu6050.py. The sensor pulses its INT pin
+every time a new sample is in the data registers. A hard `Pin.irq` handler takes a
+``ticks_us`` timestamp and defers the 14-byte burst read with `micropython.schedule`,
+which stores the sample and its timestamp in a preallocated
+`upy_sample_ring.SampleRing`. The samples are taken at the sensor rate with a
+timestamp of the moment they were ready, instead of whenever the main loop polls.
+
+* Author(s): Rodrigo França
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* The INT pin of the module connected to a GPIO of the board
+
+**Software and Dependencies:**
+
+* upy_adafruit_mpu6050.py, upy_i2c_register_tools.py and upy_sample_ring.py
+
+"""
+
+import micropython
+from utime import ticks_diff, ticks_us
+
+from upy_adafruit_mpu6050 import MPU6050, _MPU6050_ACCEL_OUT
+from upy_sample_ring import SampleRing
+
+# Report the exceptions raised inside the interrupt handler
+micropython.alloc_emergency_exception_buf(100)
+
+# INT_PIN_CFG: active high, push-pull, 50 us pulse, status cleared by any read
+_INT_PIN_PULSE = 0x10
+_SAMPLE_FORMAT = ">7h"  # ACCEL_OUT, TEMP_OUT and GYRO_OUT
+
+
+class MPU6050DataReady:
+    """Acquires the samples of a `MPU6050` on its DATA_RDY interrupt.
+
+    :param MPU6050 sensor: The configured sensor, which sets the sample rate
+    :param ~machine.Pin pin: The input pin connected to the INT pin of the sensor
+    :param int capacity: The number of samples kept in :attr:`ring`. Defaults to :const:`256`
+
+    Each sample in :attr:`ring` is ``(timestamp, (ax, ay, az, temp, gx, gy, gz))`` in raw
+    counts, where ``timestamp`` is the ``utime.ticks_us()`` value when the sample was
+    ready. Use :meth:`scale` to convert to :math:`m/s^2`, :math:`rad/s` and º Celsius.
+
+    .. code-block:: python
+
+        acquisition = MPU6050DataReady(mpu, Pin(15, Pin.IN))
+        acquisition.start()
+        while True:
+            for timestamp, raw in acquisition.ring.drain():
+                acceleration, gyro, temperature = acquisition.scale(raw)
+            utime.sleep_ms(20)
+    """
+
+    def __init__(self, sensor: MPU6050, pin, capacity: int = 256) -> None:
+        self.sensor = sensor
+        self.pin = pin
+        self.ring = SampleRing(capacity, _SAMPLE_FORMAT)
+        self.samples = 0
+        """Number of samples read since :meth:`start`"""
+        self.missed = 0
+        """Number of interrupts that came before the previous sample was read"""
+        self.max_latency_us = 0
+        """Longest time between an interrupt and the end of its burst read, in µs"""
+        self._timestamp = 0
+        self._pending = False
+        # Bound method allocated once, the hard interrupt handler cannot allocate memory
+        self._read_ref = self._read
+
+    def start(self) -> None:
+        """Enable the DATA_RDY interrupt of the sensor and attach the pin handler"""
+        self.samples = 0
+        self.missed = 0
+        self.max_latency_us = 0
+        self.ring.clear()
+        self._enable()
+
+    def _enable(self) -> None:
+        self._pending = False
+        self.pin.irq(trigger=self.pin.IRQ_RISING, handler=self._irq, hard=True)
+        self.sensor._int_pin_config = _INT_PIN_PULSE
+        self.sensor._data_ready_int = True
+
+    def stop(self) -> None:
+        """Disable the DATA_RDY interrupt and detach the pin handler"""
+        self.sensor._data_ready_int = False
+        self.pin.irq(handler=None)
+
+    def _irq(self, pin) -> None:
+        # Hard interrupt context: no memory allocation and no I2C access
+        self._timestamp = ticks_us()
+        if self._pending:
+            # The data registers will hold this newer sample when the read runs
+            self.missed += 1
+            return
+        self._pending = True
+        try:
+            micropython.schedule(self._read_ref, None)
+        except RuntimeError:
+            # Scheduler queue full
+            self._pending = False
+            self.missed += 1
+
+    def _read(self, _) -> None:
+        timestamp = self._timestamp
+        self._pending = False
+        sensor = self.sensor
+        view, nsamples = self.ring.reserve(1)
+        sensor._i2c.readfrom_mem_into(sensor._i2c_addr, _MPU6050_ACCEL_OUT, view)
+        self.ring.commit(1, timestamp)
+        self.samples += 1
+        latency = ticks_diff(ticks_us(), timestamp)
+        if latency > self.max_latency_us:
+            self.max_latency_us = latency
+
+    def scale(self, raw):
+        """Convert the raw counts of a sample to acceleration in :math:`m/s^2`,
+        gyroscope in :math:`rad/s` and temperature in º Celsius, using the ranges and
+        offsets cached by the sensor"""
+        return _scale(self.sensor, raw, 0)
+
+
+def _scale(sensor: MPU6050, raw, base: int):
+    # Scales the 7 values of a sample starting at raw[base]
+    offsets = sensor._raw_offsets
+    accel_scale = sensor._accel_scale
+    gyro_scale = sensor._gyro_scale
+    return (
+        (
+            (raw[base] - offsets[0]) * accel_scale,
+            (raw[base + 1] - offsets[1]) * accel_scale,
+            (raw[base + 2] - offsets[2]) * accel_scale,
+        ),
+        (
+            (raw[base + 4] - offsets[4]) * gyro_scale,
+            (raw[base + 5] - offsets[5]) * gyro_scale,
+            (raw[base + 6] - offsets[6]) * gyro_scale,
+        ),
+        (raw[base + 3] / 340.0) + 36.53,
+    )
@@ -0,0 +1,64 @@
+"""!
+@file mpu6050_irq_exemplo.py
+@brief Programa para amostrar o IMU MPU6050 pela interrupção de dado pronto (DATA_RDY) usando o Raspberry Pi Pico.
+@details Este programa utiliza a biblioteca mpu6050_irq para ler cada amostra do MPU6050 assim que ela fica pronta: o
+         pino INT do sensor gera uma interrupção no Raspberry Pi Pico, que registra o instante da amostra com
+         utime.ticks_us() e agenda a leitura I2C com micropython.schedule. A cada segundo são exibidos no console a
+         última amostra, o intervalo médio entre as amostras e a maior latência entre a interrupção e a leitura.
+         O pino INT do módulo deve ser ligado ao GPIO15. As bibliotecas upy_adafruit_mpu6050.py,
+         upy_i2c_register_tools.py e upy_sample_ring.py devem ser copiadas para o Raspberry Pi Pico.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Importa as classes Pin e I2C da biblioteca machine para controlar o hardware do Raspberry Pi Pico
+from machine import Pin, I2C
+# Importa as classes MPU6050 e Bandwidth da biblioteca upy_adafruit_mpu6050.py
+from upy_adafruit_mpu6050 import MPU6050, Bandwidth
+# Importa a classe MPU6050DataReady da biblioteca mpu6050_irq.py
+from mpu6050_irq import MPU6050DataReady
+# Importa a biblioteca utime para usar funções relacionadas ao tempo
+import utime
+
+# Define os pinos do Raspberry Pi Pico conectados ao barramento I2C 0 e ao pino INT do MPU6050
+i2c0_slc_pin = 9
+i2c0_sda_pin = 8
+mpu6050_int_pin = 15
+
+# Inicializa o I2C0 com os pinos GPIO9 (SCL) e GPIO8 (SDA) a 400 kHz
+i2c0 = I2C(0, scl=Pin(i2c0_slc_pin), sda=Pin(i2c0_sda_pin), freq=400000)
+
+# Inicializa o IMU MPU6050
+mpu6050 = MPU6050(i2c0)
+
+# Configura a taxa de amostragem em 100 Hz: filtro passa-baixas de 44 Hz (1 kHz) e divisor 9 (1 kHz / 10)
+mpu6050.filter_bandwidth = Bandwidth.BAND_44_HZ
+mpu6050.sample_rate_divisor = 9
+
+# Inicia a aquisição pela interrupção DATA_RDY, com um buffer circular de 128 amostras
+mpu6050_irq = MPU6050DataReady(mpu6050, Pin(mpu6050_int_pin, Pin.IN), capacity=128)
+mpu6050_irq.start()
+
+# Loop infinito
+while True:
+
+    # Aguarda 1 segundo enquanto as amostras são lidas pela interrupção
+    utime.sleep(1)
+
+    # Retira as amostras do buffer circular, guardando o instante da primeira e da última
+    amostras = 0
+    for (instante, amostra) in mpu6050_irq.ring.drain():
+        if amostras == 0:
+            primeiro_instante = instante
+        ultimo_instante = instante
+        ultima_amostra = amostra
+        amostras += 1
+
+    # Exibe a última amostra, o intervalo médio entre as amostras e a maior latência no console
+    if amostras > 1:
+        (accel, gyro, temp) = mpu6050_irq.scale(ultima_amostra)
+        intervalo = utime.ticks_diff(ultimo_instante, primeiro_instante) / (amostras - 1)
+        print("Aceleração X: {:.2f}, Y: {:.2f}, Z: {:.2f} m/s^2".format(accel[0], accel[1], accel[2]))
+        print("Rotação X: {:.2f}, Y: {:.2f}, Z: {:.2f} rad/s".format(gyro[0], gyro[1], gyro[2]))
+        print("{} amostras, intervalo médio: {:.0f} us, maior latência: {} us, perdidas: {}".format(
+            amostras, intervalo, mpu6050_irq.max_latency_us, mpu6050_irq.missed))
@@ -0,0 +1,168 @@
+"""
+`mpu6050_motion`
+================================================================================
+
+Wake-on-motion mode for the MPU6050 6-DoF Accelerometer and Gyroscope, built on top
+of mpu6050_irq.py. While the device is still, the sensor runs in the low-power
+accelerometer cycle mode (gyroscopes and temperature sensor in standby, one
+accelerometer sample at `cycle_rate`) and only raises its INT pin when the
+acceleration changes by more than the motion threshold. The board does no polling
+and no I2C traffic in this state. On motion, the `Pin.irq` handler switches the
+sensor back to full rate and the data-ready acquisition of
+`mpu6050_irq.MPU6050DataReady` fills the ring for `active_ms`. After that window the
+sensor returns to the low-power mode by itself.
+
+* Author(s): Rodrigo França
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* The INT pin of the module connected to a GPIO of the board
+
+**Software and Dependencies:**
+
+* upy_adafruit_mpu6050.py, upy_i2c_register_tools.py, upy_sample_ring.py and mpu6050_irq.py
+
+"""
+
+import micropython
+from utime import ticks_diff, ticks_us
+
+from mpu6050_irq import MPU6050DataReady
+from upy_adafruit_mpu6050 import MPU6050, ClockSource, Rate
+
+# INT_PIN_CFG: active high, push-pull, latched until any register read
+_INT_PIN_LATCHED = 0x30
+_MOT_EN = 0x40  # INT_ENABLE
+_ACCEL_HPF_5_HZ = 1  # high-pass filter in front of the motion detector
+_STBY_GYRO = 0x07  # PWR_MGMT_2: STBY_XG, STBY_YG and STBY_ZG
+_CYCLE_TEMP_DIS = 0x28  # PWR_MGMT_1: CYCLE, TEMP_DIS, internal 8 MHz clock
+
+
+class MPU6050WakeOnMotion(MPU6050DataReady):
+    """Keeps a `MPU6050` in low-power cycle mode until it moves, then acquires its
+    samples at full rate for a window.
+
+    :param MPU6050 sensor: The configured sensor. Its sample rate settings are used
+        during the active window
+    :param ~machine.Pin pin: The input pin connected to the INT pin of the sensor
+    :param int threshold_mg: The acceleration change that wakes the board, in mg
+        (2 mg steps). Defaults to :const:`40`
+    :param int duration_ms: How long the change must last, in ms. Defaults to :const:`1`
+    :param int cycle_rate: The accelerometer rate while still, a `Rate`. Defaults to
+        `Rate.CYCLE_5_HZ`
+    :param int active_ms: The length of the full-rate window after a wake, in ms.
+        Defaults to :const:`2000`
+    :param on_motion: Function called with the ``ticks_us`` timestamp of the motion
+        interrupt when the board wakes, from the scheduler. Defaults to :const:`None`
+    :param int capacity: The number of samples kept in :attr:`ring`. Defaults to :const:`256`
+
+    .. code-block:: python
+
+        monitor = MPU6050WakeOnMotion(mpu, Pin(15, Pin.IN), threshold_mg=60)
+        monitor.arm()
+        while True:
+            for timestamp, raw in monitor.ring.drain():
+                acceleration, gyro, temperature = monitor.scale(raw)
+            machine.lightsleep(100)
+    """
+
+    def __init__(
+        self,
+        sensor: MPU6050,
+        pin,
+        threshold_mg: int = 40,
+        duration_ms: int = 1,
+        cycle_rate: int = Rate.CYCLE_5_HZ,
+        active_ms: int = 2000,
+        on_motion=None,
+        capacity: int = 256,
+    ) -> None:
+        super().__init__(sensor, pin, capacity)
+        if not 0 <= threshold_mg <= 510:
+            raise ValueError("threshold_mg must be from 0 to 510")
+        if not 0 <= duration_ms <= 255:
+            raise ValueError("duration_ms must be from 0 to 255")
+        if (cycle_rate < 0) or (cycle_rate > 3):
+            raise ValueError("cycle_rate must be a Rate")
+        self.threshold_mg = threshold_mg
+        self.duration_ms = duration_ms
+        self.cycle_rate = cycle_rate
+        self.active_ms = active_ms
+        self.on_motion = on_motion
+        self.active = False
+        """:const:`True` during the full-rate window"""
+        self.wakeups = 0
+        """Number of motion interrupts since :meth:`arm`"""
+        self.motion_timestamp = 0
+        """``ticks_us`` timestamp of the last motion interrupt"""
+        self._active_us = active_ms * 1000
+        self._wake_ref = self._wake
+
+    def arm(self) -> None:
+        """Configure the motion detector and enter the low-power mode"""
+        self.samples = 0
+        self.missed = 0
+        self.wakeups = 0
+        self.max_latency_us = 0
+        self.ring.clear()
+        sensor = self.sensor
+        sensor._accel_hpf = _ACCEL_HPF_5_HZ
+        sensor.motion_threshold = self.threshold_mg // 2
+        sensor.motion_duration = self.duration_ms
+        self._sleep()
+
+    def stop(self) -> None:
+        """Leave the low-power mode and disable the interrupts"""
+        self.pin.irq(handler=None)
+        self.sensor._int_enable = 0
+        self._full_rate()
+        self.active = False
+
+    def _sleep(self) -> None:
+        # Low-power accelerometer cycle mode with only the motion interrupt, latched
+        # so the pin stays high until the board reads INT_STATUS
+        sensor = self.sensor
+        self.active = False
+        self.pin.irq(trigger=self.pin.IRQ_RISING, handler=self._motion_irq, hard=True)
+        sensor._int_pin_config = _INT_PIN_LATCHED
+        sensor._int_enable = _MOT_EN
+        sensor._pwr_mgmt_2 = (self.cycle_rate << 6) | _STBY_GYRO
+        sensor._pwr_mgmt_1 = _CYCLE_TEMP_DIS
+        sensor._int_status  # clear a motion flag raised while configuring
+
+    def _full_rate(self) -> None:
+        sensor = self.sensor
+        sensor._pwr_mgmt_2 = 0
+        sensor._pwr_mgmt_1 = ClockSource.CLKSEL_INTERNAL_X
+
+    def _motion_irq(self, pin) -> None:
+        # Hard interrupt context: no memory allocation and no I2C access
+        self.motion_timestamp = ticks_us()
+        if self._pending:
+            return
+        self._pending = True
+        try:
+            micropython.schedule(self._wake_ref, None)
+        except RuntimeError:
+            # Scheduler queue full, the latched pin is seen on the next arm
+            self._pending = False
+
+    def _wake(self, _) -> None:
+        self._pending = False
+        self.wakeups += 1
+        self.sensor._int_enable = 0
+        self.sensor._int_status  # release the latched pin
+        self._full_rate()
+        self.active = True
+        self._enable()
+        if self.on_motion is not None:
+            self.on_motion(self.motion_timestamp)
+
+    def _read(self, _) -> None:
+        super()._read(_)
+        if self.active and ticks_diff(self._timestamp, self.motion_timestamp) > self._active_us:
+            self.sensor._data_ready_int = False
+            self._sleep()
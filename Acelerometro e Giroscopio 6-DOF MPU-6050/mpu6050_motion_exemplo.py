@@ -0,0 +1,67 @@
+"""!
+@file mpu6050_motion_exemplo.py
+@brief Programa para acordar o Raspberry Pi Pico pelo detector de movimento do IMU MPU6050.
+@details Este programa utiliza a biblioteca mpu6050_motion para manter o MPU6050 no modo de baixo consumo (apenas o
+         acelerômetro ligado, com uma amostra a cada 200 ms) enquanto o sensor está parado. Quando a aceleração varia
+         mais que 60 mg, o pino INT do sensor gera uma interrupção no Raspberry Pi Pico, o sensor volta à taxa de
+         amostragem de 100 Hz e as amostras são lidas pela interrupção de dado pronto durante 2 segundos. Depois
+         disso o sensor volta sozinho ao modo de baixo consumo. Enquanto o sensor está parado o Raspberry Pi Pico
+         não faz nenhuma leitura I2C.
+         O pino INT do módulo deve ser ligado ao GPIO15. As bibliotecas upy_adafruit_mpu6050.py,
+         upy_i2c_register_tools.py, upy_sample_ring.py e mpu6050_irq.py devem ser copiadas para o Raspberry Pi Pico.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Importa as classes Pin e I2C da biblioteca machine para controlar o hardware do Raspberry Pi Pico
+from machine import Pin, I2C
+# Importa as classes MPU6050, Bandwidth e Rate da biblioteca upy_adafruit_mpu6050.py
+from upy_adafruit_mpu6050 import MPU6050, Bandwidth, Rate
+# Importa a classe MPU6050WakeOnMotion da biblioteca mpu6050_motion.py
+from mpu6050_motion import MPU6050WakeOnMotion
+# Importa a biblioteca utime para usar funções relacionadas ao tempo
+import utime
+
+# Define os pinos do Raspberry Pi Pico conectados ao barramento I2C 0 e ao pino INT do MPU6050
+i2c0_slc_pin = 9
+i2c0_sda_pin = 8
+mpu6050_int_pin = 15
+
+# Inicializa o I2C0 com os pinos GPIO9 (SCL) e GPIO8 (SDA) a 400 kHz
+i2c0 = I2C(0, scl=Pin(i2c0_slc_pin), sda=Pin(i2c0_sda_pin), freq=400000)
+
+# Inicializa o IMU MPU6050
+mpu6050 = MPU6050(i2c0)
+
+# Configura a taxa de amostragem da janela ativa em 100 Hz: filtro de 44 Hz (1 kHz) e divisor 9 (1 kHz / 10)
+mpu6050.filter_bandwidth = Bandwidth.BAND_44_HZ
+mpu6050.sample_rate_divisor = 9
+
+
+# Função chamada quando o movimento acorda o sensor
+def movimento(instante):
+    print("Movimento detectado em {} us".format(instante))
+
+
+# Arma o detector de movimento: limiar de 60 mg, acelerômetro a 5 Hz enquanto parado e janela ativa de 2 segundos
+monitor = MPU6050WakeOnMotion(mpu6050, Pin(mpu6050_int_pin, Pin.IN), threshold_mg=60,
+                              cycle_rate=Rate.CYCLE_5_HZ, active_ms=2000, on_motion=movimento)
+monitor.arm()
+
+# Loop infinito
+while True:
+
+    # Aguarda 500 ms enquanto as amostras são lidas pela interrupção
+    utime.sleep_ms(500)
+
+    # Retira as amostras do buffer circular e exibe a última delas no console
+    amostras = 0
+    for (instante, amostra) in monitor.ring.drain():
+        ultima_amostra = amostra
+        amostras += 1
+    if amostras > 0:
+        (accel, gyro, temp) = monitor.scale(ultima_amostra)
+        print("{} amostras, aceleração X: {:.2f}, Y: {:.2f}, Z: {:.2f} m/s^2".format(
+            amostras, accel[0], accel[1], accel[2]))
+    elif not monitor.active:
+        print("Sensor parado, {} despertares até agora".format(monitor.wakeups))
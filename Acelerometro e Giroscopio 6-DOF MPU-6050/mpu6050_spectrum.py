@@ -0,0 +1,296 @@
+"""
+`mpu6050_spectrum`
+================================================================================
+
+Vibration spectrum analysis of the MPU6050 6-DoF Accelerometer and Gyroscope on the
+board. `SpectrumAnalyzer` collects the raw counts of one accelerometer axis from
+the sample blocks of `mpu6050_fifo.MPU6050FIFO` or `mpu6050_irq.MPU6050DataReady`,
+or reads that axis alone with `SpectrumAnalyzer.sample`, and every ``hop`` samples computes the Hann windowed FFT of the last ``size``
+samples. Each spectrum is reduced to the amplitude of its peak frequency and to the
+power of a few frequency bands, which is all that has to leave the board instead
+of the raw samples.
+
+The FFT uses the vectorized ``ulab.numpy.fft`` when the firmware has ulab (or
+NumPy on the host), and an in-place radix-2 FFT over preallocated ``array('f')``
+buffers otherwise. The frequencies depend on the sample rate of the sensor, which is
+exact only when it comes from `MPU6050.sample_rate_divisor` and
+`MPU6050.filter_bandwidth`, as with the FIFO.
+
+* Author(s): Rodrigo França
+
+Implementation Notes
+--------------------
+
+**Software and Dependencies:**
+
+* upy_adafruit_mpu6050.py and upy_sample_ring.py
+* ulab (optional)
+
+"""
+
+from array import array
+from math import cos, pi, sin, sqrt
+
+import micropython
+
+from upy_adafruit_mpu6050 import MPU6050
+
+try:
+    from ulab import numpy as np
+except ImportError:
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+try:
+    from typing import Sequence, Tuple
+except ImportError:
+    pass
+
+
+@micropython.native
+def _fft(re, im, cos_table, sin_table, bit_reverse, n: int) -> None:
+    # In-place iterative radix-2 FFT
+    for i in range(n):
+        j = bit_reverse[i]
+        if j > i:
+            re[i], re[j] = re[j], re[i]
+            im[i], im[j] = im[j], im[i]
+    size = 2
+    while size <= n:
+        half = size >> 1
+        step = n // size
+        for start in range(0, n, size):
+            k = 0
+            for i in range(start, start + half):
+                c = cos_table[k]
+                s = sin_table[k]
+                j = i + half
+                t_re = re[j] * c + im[j] * s
+                t_im = im[j] * c - re[j] * s
+                re[j] = re[i] - t_re
+                im[j] = im[i] - t_im
+                re[i] += t_re
+                im[i] += t_im
+                k += step
+        size <<= 1
+
+
+class SpectrumAnalyzer:
+    """Overlapping windowed FFT spectra of one accelerometer axis of a `MPU6050`.
+
+    :param MPU6050 sensor: The configured sensor. The sample rate and the
+        accelerometer range are read from it. Call :meth:`configure` again if they change
+    :param int size: The number of samples of each FFT, a power of two. Defaults to :const:`256`
+    :param int hop: The number of new samples between two spectra. Defaults to half
+        of ``size`` (50 % overlap)
+    :param int axis: The accelerometer axis, 0 for X, 1 for Y and 2 for Z. Defaults to :const:`2`
+    :param bands: The ``(low, high)`` limits of the frequency bands, in Hz. Defaults to :const:`()`
+    :param on_spectrum: Function called with the analyzer after every new spectrum.
+        Defaults to :const:`None`
+
+    After each spectrum :attr:`magnitude` holds the amplitude of every frequency bin in
+    :math:`m/s^2`, :attr:`band_power` the mean square acceleration of every band in
+    :math:`(m/s^2)^2`, and :attr:`index` the sample index of the first sample of the
+    block. The mean of the block (gravity) is removed before the FFT.
+
+    .. code-block:: python
+
+        analyzer = SpectrumAnalyzer(mpu, 256, bands=((5, 50), (50, 200)))
+        stream.start()
+        while True:
+            stream.drain()
+            if analyzer.update_ring(stream.ring):
+                print(analyzer.peak(), analyzer.band_power)
+            utime.sleep_ms(50)
+    """
+
+    def __init__(
+        self,
+        sensor: MPU6050,
+        size: int = 256,
+        hop: int = None,
+        axis: int = 2,
+        bands: Sequence[Tuple[float, float]] = (),
+        on_spectrum=None,
+    ) -> None:
+        if size < 4 or size & (size - 1):
+            raise ValueError("size must be a power of two")
+        if hop is None:
+            hop = size // 2
+        if not 0 < hop <= size:
+            raise ValueError("hop must be from 1 to size")
+        if not 0 <= axis <= 2:
+            raise ValueError("axis must be 0, 1 or 2")
+        self.sensor = sensor
+        self.size = size
+        self.hop = hop
+        self.axis = axis
+        self.bands = tuple(bands)
+        self.on_spectrum = on_spectrum
+        self.spectra = 0
+        """Number of spectra computed"""
+        self.index = 0
+        """Sample index of the first sample of the last spectrum"""
+        self.magnitude = array("f", bytes(4 * (size // 2 + 1)))
+        """Amplitude of the bins 0 to ``size // 2`` of the last spectrum, in :math:`m/s^2`"""
+        self.band_power = array("f", bytes(4 * len(self.bands)))
+        """Mean square acceleration of each band of the last spectrum, in :math:`(m/s^2)^2`"""
+
+        self._block = array("f", bytes(4 * size))
+        self._fill = 0
+        self._next_index = 0
+        self._hann = array("f", (0.5 - 0.5 * cos(2 * pi * i / size) for i in range(size)))
+        window_sum = sum(self._hann)
+        window_square_sum = sum(w * w for w in self._hann)
+        self._amplitude_factor = 2.0 / window_sum
+        # Mean square of a one-sided bin from its amplitude (Parseval with the window)
+        self._power_factor = window_sum * window_sum / (2.0 * size * window_square_sum)
+        if np is None:
+            self._re = array("f", bytes(4 * size))
+            self._im = array("f", bytes(4 * size))
+            self._cos = array("f", (cos(2 * pi * k / size) for k in range(size // 2)))
+            self._sin = array("f", (sin(2 * pi * k / size) for k in range(size // 2)))
+            bits = size.bit_length() - 1
+            self._bit_reverse = array(
+                "H", (int("{:0{}b}".format(i, bits)[::-1], 2) for i in range(size))
+            )
+        self.configure()
+
+    def configure(self) -> None:
+        """Read the sample rate and the accelerometer scale again from the sensor"""
+        self.sample_rate = self.sensor.sample_rate
+        self.resolution = self.sample_rate / self.size
+        """Width of a frequency bin, in Hz"""
+        self._window = array("f", (w * self.sensor._accel_scale for w in self._hann))
+        if np is not None:
+            self._window_np = np.array(self._window)
+        nyquist = self.size // 2
+        self._band_bins = tuple(
+            (max(1, int(low / self.resolution + 0.5)), min(nyquist, int(high / self.resolution + 0.5)))
+            for low, high in self.bands
+        )
+
+    def reset(self) -> None:
+        """Forget the samples collected and restart the sample index from 0"""
+        self._fill = 0
+        self._next_index = 0
+
+    def push(self, value: int) -> bool:
+        """Add one raw count. Returns :const:`True` if a new spectrum was computed"""
+        self._block[self._fill] = value
+        self._fill += 1
+        self._next_index += 1
+        if self._fill < self.size:
+            return False
+        self._compute()
+        return True
+
+    def sample(self) -> bool:
+        """Read the analyzed axis alone from the data registers, with a 2-byte burst
+        instead of the whole sample, and add it. Returns :const:`True` if a new
+        spectrum was computed"""
+        return self.push(self.sensor.raw_acceleration[self.axis])
+
+    @micropython.native
+    def update_frames(self, buf, nframes: int, frame_size: int = 12) -> int:
+        """Add a block of raw big-endian samples, such as the 12-byte FIFO frames (the
+        default) or the 14-byte data register samples. Returns the number of new spectra"""
+        block = self._block
+        size = self.size
+        fill = self._fill
+        index = self._next_index
+        i = 2 * self.axis
+        spectra = 0
+        for _ in range(nframes):
+            value = buf[i] << 8 | buf[i + 1]
+            block[fill] = value - 0x10000 if value & 0x8000 else value
+            fill += 1
+            index += 1
+            i += frame_size
+            if fill == size:
+                self._next_index = index
+                self._compute()
+                fill = self._fill
+                spectra += 1
+        self._fill = fill
+        self._next_index = index
+        return spectra
+
+    def update_ring(self, ring) -> int:
+        """Add all the samples of a `upy_sample_ring.SampleRing` filled by
+        `mpu6050_fifo.MPU6050FIFO` or `mpu6050_irq.MPU6050DataReady`, and remove them
+        from the ring. Returns the number of new spectra"""
+        spectra = 0
+        total = 0
+        for view, nsamples in ring.regions():
+            spectra += self.update_frames(view, nsamples, ring.sample_size)
+            total += nsamples
+        ring.discard(total)
+        return spectra
+
+    def _compute(self) -> None:
+        size = self.size
+        block = self._block
+        mean = sum(block) / size
+        magnitude = self.magnitude
+        amplitude_factor = self._amplitude_factor
+        if np is not None:
+            spectrum = np.fft.fft((np.array(block) - mean) * self._window_np)
+            if isinstance(spectrum, tuple):
+                # ulab without complex support returns the real and imaginary parts
+                re, im = spectrum
+                spectrum = np.sqrt(re * re + im * im)
+            else:
+                spectrum = abs(spectrum)
+            for k in range(size // 2 + 1):
+                magnitude[k] = spectrum[k] * amplitude_factor
+        else:
+            re = self._re
+            im = self._im
+            window = self._window
+            for i in range(size):
+                re[i] = (block[i] - mean) * window[i]
+                im[i] = 0.0
+            _fft(re, im, self._cos, self._sin, self._bit_reverse, size)
+            for k in range(size // 2 + 1):
+                magnitude[k] = sqrt(re[k] * re[k] + im[k] * im[k]) * amplitude_factor
+        magnitude[0] *= 0.5
+        magnitude[size // 2] *= 0.5
+
+        power_factor = self._power_factor
+        for band, (low, high) in enumerate(self._band_bins):
+            power = 0.0
+            for k in range(low, high + 1):
+                power += magnitude[k] * magnitude[k]
+            self.band_power[band] = power * power_factor
+
+        # Keep the last size - hop samples for the next spectrum
+        hop = self.hop
+        for i in range(size - hop):
+            block[i] = block[i + hop]
+        self._fill = size - hop
+        self.index = self._next_index - size
+        self.spectra += 1
+        if self.on_spectrum is not None:
+            self.on_spectrum(self)
+
+    def peak(self) -> Tuple[float, float]:
+        """Frequency in Hz and amplitude in :math:`m/s^2` of the largest bin of the
+        last spectrum, other than DC, refined by a parabola through its neighbours"""
+        magnitude = self.magnitude
+        last = self.size // 2
+        best = 1
+        for k in range(2, last + 1):
+            if magnitude[k] > magnitude[best]:
+                best = k
+        offset = 0.0
+        if 1 < best < last:
+            left = magnitude[best - 1]
+            center = magnitude[best]
+            right = magnitude[best + 1]
+            denominator = left - 2 * center + right
+            if denominator:
+                offset = 0.5 * (left - right) / denominator
+        return ((best + offset) * self.resolution, magnitude[best])
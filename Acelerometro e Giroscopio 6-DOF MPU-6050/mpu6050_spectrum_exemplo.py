@@ -0,0 +1,68 @@
+"""!
+@file mpu6050_spectrum_exemplo.py
+@brief Programa para analisar o espectro de vibração do IMU MPU6050 a 1 kHz usando o Raspberry Pi Pico.
+@details Este programa utiliza a biblioteca mpu6050_spectrum para calcular, no próprio Raspberry Pi Pico, a FFT de
+         blocos de 256 amostras do eixo Z do acelerômetro lidas da FIFO do MPU6050 a 1 kHz, com janela de Hann e
+         sobreposição de 50 % (um espectro a cada 128 ms). Para cada espectro são exibidas no console apenas a
+         frequência e a amplitude do pico e a potência de três bandas de frequência, em vez das amostras.
+         A biblioteca usa o módulo ulab quando o firmware o possui, e uma FFT em Python puro caso contrário.
+         As bibliotecas upy_adafruit_mpu6050.py, upy_i2c_register_tools.py, upy_sample_ring.py e mpu6050_fifo.py
+         devem ser copiadas para o Raspberry Pi Pico.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Importa as classes Pin e I2C da biblioteca machine para controlar o hardware do Raspberry Pi Pico
+from machine import Pin, I2C
+# Importa as classes MPU6050 e Bandwidth da biblioteca upy_adafruit_mpu6050.py
+from upy_adafruit_mpu6050 import MPU6050, Bandwidth
+# Importa a classe MPU6050FIFO da biblioteca mpu6050_fifo.py
+from mpu6050_fifo import MPU6050FIFO
+# Importa a classe SpectrumAnalyzer da biblioteca mpu6050_spectrum.py
+from mpu6050_spectrum import SpectrumAnalyzer
+# Importa a biblioteca utime para usar funções relacionadas ao tempo
+import utime
+
+# Define os pinos do Raspberry Pi Pico conectados ao barramento I2C 0
+i2c0_slc_pin = 9
+i2c0_sda_pin = 8
+
+# Inicializa o I2C0 com os pinos GPIO9 (SCL) e GPIO8 (SDA) a 400 kHz
+i2c0 = I2C(0, scl=Pin(i2c0_slc_pin), sda=Pin(i2c0_sda_pin), freq=400000)
+
+# Inicializa o IMU MPU6050
+mpu6050 = MPU6050(i2c0)
+
+# Configura a taxa de amostragem em 1 kHz: filtro passa-baixas de 184 Hz (1 kHz) e divisor 0
+mpu6050.filter_bandwidth = Bandwidth.BAND_184_HZ
+mpu6050.sample_rate_divisor = 0
+
+# Cria o analisador de espectro do eixo Z com FFT de 256 amostras e três bandas de frequência, em Hz
+bandas = ((5, 50), (50, 150), (150, 500))
+analisador = SpectrumAnalyzer(mpu6050, size=256, axis=2, bands=bandas)
+print("Resolução em frequência: {:.2f} Hz".format(analisador.resolution))
+
+
+# Função chamada a cada novo espectro: exibe o pico e a potência das bandas no console
+def espectro(analisador):
+    (frequencia, amplitude) = analisador.peak()
+    print("Bloco {}: pico em {:.1f} Hz com {:.3f} m/s^2".format(analisador.index, frequencia, amplitude))
+    for (banda, potencia) in zip(bandas, analisador.band_power):
+        print("  Banda de {} a {} Hz: {:.5f} (m/s^2)^2".format(banda[0], banda[1], potencia))
+
+
+analisador.on_spectrum = espectro
+
+# Inicia o carregamento das amostras na FIFO, com um buffer circular de 256 amostras
+mpu6050_fifo = MPU6050FIFO(mpu6050, capacity=256)
+mpu6050_fifo.start()
+
+# Loop infinito
+while True:
+
+    # Copia as amostras da FIFO para o buffer circular e as entrega ao analisador
+    mpu6050_fifo.drain()
+    analisador.update_ring(mpu6050_fifo.ring)
+
+    # Aguarda 50 ms antes de esvaziar a FIFO novamente
+    utime.sleep_ms(50)
@@ -45,13 +45,16 @@ __version__ = "0.0.0+auto.0"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_MPU6050.git"
 
 from math import radians
-from utime import sleep
+from ustruct import unpack_from
+from utime import sleep, ticks_add, ticks_diff, ticks_ms
 
 # Import the RWBit, RWBits, UnaryStruct, ROUnaryStruct, and StructArray classes from the upy_i2c_register_tools.py library to work with I2C registers
 from upy_i2c_register_tools import RWBit, RWBits, UnaryStruct, ROUnaryStruct, StructArray
+from upy_i2c_register_tools import enable_register_cache, register_transaction
 
 try:
     from typing import Tuple
+    from machine import I2C
 except ImportError:
     pass
 
@@ -66,7 +69,12 @@ _MPU6050_SMPLRT_DIV = 0x19  # sample rate divisor register
 _MPU6050_CONFIG = 0x1A  # General configuration register
 _MPU6050_GYRO_CONFIG = 0x1B  # Gyro specfic configuration register
 _MPU6050_ACCEL_CONFIG = 0x1C  # Accelerometer specific configration register
+_MPU6050_MOT_THR = 0x1F  # Motion detection threshold register
+_MPU6050_MOT_DUR = 0x20  # Motion detection duration register
+_MPU6050_FIFO_EN = 0x23  # Selects the measurements loaded into the FIFO
 _MPU6050_INT_PIN_CONFIG = 0x37  # Interrupt pin configuration register
+_MPU6050_INT_ENABLE = 0x38  # Interrupt enable register
+_MPU6050_INT_STATUS = 0x3A  # Interrupt status register, cleared on read
 _MPU6050_ACCEL_OUT = 0x3B  # base address for sensor data reads
 _MPU6050_TEMP_OUT = 0x41  # Temperature data high byte register
 _MPU6050_GYRO_OUT = 0x43  # base address for sensor data reads
@@ -74,10 +82,21 @@ _MPU6050_SIG_PATH_RESET = 0x68  # register to reset sensor signal paths
 _MPU6050_USER_CTRL = 0x6A  # FIFO and I2C Master control register
 _MPU6050_PWR_MGMT_1 = 0x6B  # Primary power/sleep control register
 _MPU6050_PWR_MGMT_2 = 0x6C  # Secondary power/sleep control register
+_MPU6050_FIFO_COUNT = 0x72  # Number of bytes in the FIFO, high byte first
+_MPU6050_FIFO_R_W = 0x74  # FIFO data register, does not auto-increment
 _MPU6050_WHO_AM_I = 0x75  # Divice ID register
 
 STANDARD_GRAVITY = 9.80665
 
+# Sensitivity in LSB/g for each Range and in LSB/(deg/s) for each GyroRange
+_ACCEL_LSB = (16384, 8192, 4096, 2048)
+_GYRO_LSB = (131, 65.5, 32.8, 16.4)
+
+# Gyroscope bandwidth in Hz and the longer of the accelerometer and gyroscope delays
+# in ms for each Bandwidth, from the CONFIG register table of the register map
+_DLPF_BANDWIDTH = (256, 188, 98, 42, 20, 10, 5)
+_DLPF_DELAY_MS = (0.98, 2.0, 3.0, 4.9, 8.5, 13.8, 19.0)
+
 class ClockSource:  # pylint: disable=too-few-public-methods
     """Allowed values for :py:attr:`clock_source`.
 
@@ -176,6 +195,11 @@ class MPU6050:
 
     :param ~busio.I2C i2c_bus: The I2C bus the device is connected to
     :param int address: The I2C device address. Defaults to :const:`0x68`
+    :param bool cache_registers: Keep a shadow copy of the configuration registers so
+        field writes cost a single I2C transaction. Defaults to :const:`False`
+    :param bool warm_start: If the sensor is already awake and configured, e.g. after a
+        soft reboot of the board, keep its configuration instead of resetting it.
+        Defaults to :const:`False`
 
     **Quickstart: Importing and using the device**
 
@@ -204,60 +228,248 @@ class MPU6050:
             temperature = sensor.temperature
     """
 
-    def __init__(self, i2c: I2C, i2c_addr: int = _MPU6050_DEFAULT_ADDRESS) -> None:
+    # Registers with self-clearing bits, or cleared on read like INT_STATUS, never kept
+    # in the register cache nor read by the bursts of a transaction
+    _volatile_registers = (
+        _MPU6050_SIG_PATH_RESET,
+        _MPU6050_USER_CTRL,
+        _MPU6050_PWR_MGMT_1,
+        _MPU6050_INT_STATUS,
+    )
+
+    def __init__(
+        self,
+        i2c: I2C,
+        i2c_addr: int = _MPU6050_DEFAULT_ADDRESS,
+        cache_registers: bool = False,
+        warm_start: bool = False,
+    ) -> None:
+        self._setup(i2c, i2c_addr, cache_registers)
+        for delay in self._begin(warm_start):
+            sleep(delay)
+
+    def _setup(self, i2c: I2C, i2c_addr: int, cache_registers: bool) -> None:
+        """Bind the bus and check the device id, without touching the configuration"""
         self._i2c = i2c
         self._i2c_addr = i2c_addr
+        self._register_cache = None
+        self._register_transaction = None
+        self._burst = bytearray(14)  # ACCEL_OUT, TEMP_OUT and GYRO_OUT
+        self._ranges = [Range.RANGE_2_G, GyroRange.RANGE_250_DPS]
+        self._offsets = ((0, 0, 0), (0, 0, 0))
+        self.warm_started = False
+        self._set_scales(Range.RANGE_2_G, GyroRange.RANGE_250_DPS)
+        self.raw_acceleration = MPU6050._raw_accel_data.view(self)
+        """The raw accelerometer X, Y and Z counts, read on indexing:
+        ``raw_acceleration[2]`` reads only the Z axis with a 2-byte burst"""
+        self.raw_gyro = MPU6050._raw_gyro_data.view(self)
+        """The raw gyroscope X, Y and Z counts, read on indexing:
+        ``raw_gyro[0:2]`` reads only the X and Y axes with a 4-byte burst"""
 
         if self._device_id != _MPU6050_DEVICE_ID:
             raise RuntimeError("Failed to find MPU6050 - check your wiring!")
 
-        self.reset()
+        if cache_registers:
+            enable_register_cache(self)
+
+    def _begin(self, warm_start: bool = False):
+        """Reset and configure the sensor. This is a generator that yields the time in
+        seconds to wait before the next step, so the same sequence can be run by
+        sleeping (`__init__`) or by awaiting (`mpu6050_async.AsyncMPU6050.begin`).
+        Instead of sleeping the worst-case delays, it polls the reset bit and then the
+        first DATA_RDY of the running sensor"""
+        if warm_start and self._warm_start():
+            return
+        yield from self._reset_steps()
+
+        if self._register_cache is not None:
+            # fetch the whole configuration block in one burst read
+            self._register_cache.refresh(
+                self,
+                _MPU6050_SMPLRT_DIV,
+                _MPU6050_CONFIG,
+                _MPU6050_GYRO_CONFIG,
+                _MPU6050_ACCEL_CONFIG,
+            )
 
-        self._sample_rate_divisor = 0
+        self.sample_rate_divisor = 0
         self._filter_bandwidth = Bandwidth.BAND_260_HZ
         self._gyro_range = GyroRange.RANGE_500_DPS
         self._accel_range = Range.RANGE_2_G
-        sleep(0.100)
+        self._set_scales(Range.RANGE_2_G, GyroRange.RANGE_500_DPS)
         self.clock_source = (
             ClockSource.CLKSEL_INTERNAL_X
         )  # set to use gyro x-axis as reference
-        sleep(0.100)
         self.sleep = False
-        sleep(0.010)
+
+        # The sensor is ready when it latches its first sample. DATA_RDY only shows up
+        # in INT_STATUS while its interrupt is enabled
+        self._data_ready_int = True
+        yield from self._poll(self._data_ready, "first sample")
+        self._data_ready_int = False
+
+    def _warm_start(self) -> bool:
+        """Keep the configuration of a sensor that is already awake and running from
+        the gyro clock, as left by `_begin`. Returns :const:`False` if it is not"""
+        if self._pwr_mgmt_1 != ClockSource.CLKSEL_INTERNAL_X:
+            return False
+        # one burst read of GYRO_CONFIG and ACCEL_CONFIG
+        with self.transaction():
+            gyro_range = self._gyro_range
+            accel_range = self._accel_range
+        self._set_scales(accel_range, gyro_range)
+        self.warm_started = True
+        return True
+
+    def _data_ready(self) -> bool:
+        return bool(self._int_status & 0x01)
+
+    def _poll(self, ready, step: str, timeout_ms: int = 200):
+        """Yield 1 ms waits until ``ready()`` returns :const:`True`"""
+        deadline = ticks_add(ticks_ms(), timeout_ms)
+        while not ready():
+            if ticks_diff(deadline, ticks_ms()) < 0:
+                raise RuntimeError("MPU6050 timed out waiting for the " + step)
+            yield 0.001
 
     def reset(self) -> None:
         """Reinitialize the sensor"""
+        for delay in self._reset_steps():
+            sleep(delay)
+
+    def _reset_steps(self):
+        """Reset sequence, yielding the time in seconds to wait between steps"""
+        self.warm_started = False
         self._reset = True
-        while self._reset is True:
-            sleep(0.001)
-        sleep(0.100)
+        # the reset bit clears itself when the reset is done
+        yield from self._poll(lambda: not self._reset, "device reset")
+
+        if self._register_cache is not None:
+            # every register is back to its default value
+            self._register_cache.invalidate()
+        self._set_scales(Range.RANGE_2_G, GyroRange.RANGE_250_DPS)
+
+        self._signal_path_reset = 0b111  # reset all sensors
+
+    def _set_scales(self, accel_range: int = None, gyro_range: int = None) -> None:
+        """Cache the factors that convert the raw counts to :math:`m/s^2` and :math:`rad/s`
+        and the offsets in counts of the ranges. Called whenever the ranges are written, so
+        the reads never fetch the range registers"""
+        if accel_range is not None:
+            self._ranges[0] = accel_range
+            self._accel_scale = STANDARD_GRAVITY / _ACCEL_LSB[accel_range]
+        if gyro_range is not None:
+            self._ranges[1] = gyro_range
+            self._gyro_scale = radians(1) / _GYRO_LSB[gyro_range]
+
+        accel_offset, gyro_offset = self._offsets
+        accel_factor = _ACCEL_LSB[self._ranges[0]] / _ACCEL_LSB[0]
+        gyro_factor = _GYRO_LSB[self._ranges[1]] / _GYRO_LSB[0]
+        self._raw_offsets = tuple(round(offset * accel_factor) for offset in accel_offset) + (0,) + tuple(
+            round(offset * gyro_factor) for offset in gyro_offset
+        )
+
+    @property
+    def offsets(self) -> Tuple[Tuple[int, int, int], Tuple[int, int, int]]:
+        """The accelerometer and gyroscope X, Y and Z offsets subtracted from every reading,
+        in counts of the `Range.RANGE_2_G` and `GyroRange.RANGE_250_DPS` ranges. They are
+        converted to the counts of the current ranges once, when the ranges are set, so the
+        correction is a subtraction of integers. See `mpu6050_calibration`"""
+        return self._offsets
+
+    @offsets.setter
+    def offsets(self, value: Tuple[Tuple[int, int, int], Tuple[int, int, int]]) -> None:
+        accel_offset, gyro_offset = value
+        self._offsets = (tuple(accel_offset), tuple(gyro_offset))
+        self._set_scales()
+
+    def read_raw(self) -> Tuple[int, int, int, int, int, int, int]:
+        """Raw counts of the accelerometer X, Y and Z, temperature and gyroscope X, Y and Z,
+        fetched from ACCEL_OUT to GYRO_OUT (14 bytes) in a single I2C transaction and
+        corrected by the :attr:`offsets`"""
+        self._i2c.readfrom_mem_into(self._i2c_addr, _MPU6050_ACCEL_OUT, self._burst)
+        accel_x, accel_y, accel_z, raw_temperature, gyro_x, gyro_y, gyro_z = unpack_from(">7h", self._burst)
+        offsets = self._raw_offsets
+        return (
+            accel_x - offsets[0],
+            accel_y - offsets[1],
+            accel_z - offsets[2],
+            raw_temperature,
+            gyro_x - offsets[4],
+            gyro_y - offsets[5],
+            gyro_z - offsets[6],
+        )
+
+    def read_all(
+        self,
+    ) -> Tuple[Tuple[float, float, float], Tuple[float, float, float], float]:
+        """Acceleration in :math:`m/s^2`, gyroscope in :math:`rad/s` and temperature in
+        º Celsius from a single I2C transaction"""
+        accel_x, accel_y, accel_z, raw_temperature, gyro_x, gyro_y, gyro_z = self.read_raw()
+        accel_scale = self._accel_scale
+        gyro_scale = self._gyro_scale
+        return (
+            (accel_x * accel_scale, accel_y * accel_scale, accel_z * accel_scale),
+            (gyro_x * gyro_scale, gyro_y * gyro_scale, gyro_z * gyro_scale),
+            (raw_temperature / 340.0) + 36.53,
+        )
+
+    def transaction(self):
+        """Context manager that batches register accesses. Inside the block, fields that
+        share a register or sit in adjacent registers are fetched with one burst read and
+        writes are sent as the fewest contiguous writes when the block exits
 
-        _signal_path_reset = 0b111  # reset all sensors
-        sleep(0.100)
+        .. code-block:: python
+
+            with sensor.transaction():
+                acc_x, acc_y, acc_z = sensor.acceleration
+                gyro_x, gyro_y, gyro_z = sensor.gyro
+                temperature = sensor.temperature
+        """
+        return register_transaction(self)
 
+    _pwr_mgmt_1 = UnaryStruct(_MPU6050_PWR_MGMT_1, ">B")
     _clksel = RWBits(3, _MPU6050_PWR_MGMT_1, 0)
     _device_id = ROUnaryStruct(_MPU6050_WHO_AM_I, ">B")
 
     _reset = RWBit(_MPU6050_PWR_MGMT_1, 7)
-    _signal_path_reset = RWBits(3, _MPU6050_SIG_PATH_RESET, 3)
+    _signal_path_reset = RWBits(3, _MPU6050_SIG_PATH_RESET, 0)  # GYRO, ACCEL and TEMP_RESET
 
     _gyro_range = RWBits(2, _MPU6050_GYRO_CONFIG, 3)
     _accel_range = RWBits(2, _MPU6050_ACCEL_CONFIG, 3)
 
-    _filter_bandwidth = RWBits(2, _MPU6050_CONFIG, 3)
+    _filter_bandwidth = RWBits(3, _MPU6050_CONFIG, 0)  # DLPF_CFG
 
     _raw_accel_data = StructArray(_MPU6050_ACCEL_OUT, ">h", 3)
     _raw_gyro_data = StructArray(_MPU6050_GYRO_OUT, ">h", 3)
     _raw_temp_data = ROUnaryStruct(_MPU6050_TEMP_OUT, ">h")
 
+    _int_pin_config = UnaryStruct(_MPU6050_INT_PIN_CONFIG, ">B")
+    _int_enable = UnaryStruct(_MPU6050_INT_ENABLE, ">B")
+    _data_ready_int = RWBit(_MPU6050_INT_ENABLE, 0)
+    _int_status = ROUnaryStruct(_MPU6050_INT_STATUS, ">B")
+
+    _fifo_en = UnaryStruct(_MPU6050_FIFO_EN, ">B")
+    _fifo_enable = RWBit(_MPU6050_USER_CTRL, 6)
+    _fifo_reset = RWBit(_MPU6050_USER_CTRL, 2)
+    _fifo_count = ROUnaryStruct(_MPU6050_FIFO_COUNT, ">H")
+
     _cycle = RWBit(_MPU6050_PWR_MGMT_1, 5)
     _cycle_rate = RWBits(2, _MPU6050_PWR_MGMT_2, 6)
+    _pwr_mgmt_2 = UnaryStruct(_MPU6050_PWR_MGMT_2, ">B")
+    _accel_hpf = RWBits(3, _MPU6050_ACCEL_CONFIG, 0)
 
     sleep = RWBit(_MPU6050_PWR_MGMT_1, 6)
     """Shuts down the accelerometers and gyroscopes, saving power. No new data will
     be recorded until the sensor is taken out of sleep by setting to `False`"""
     sample_rate_divisor = UnaryStruct(_MPU6050_SMPLRT_DIV, ">B")
     """The sample rate divisor. See the datasheet for additional detail"""
+    motion_threshold = UnaryStruct(_MPU6050_MOT_THR, ">B")
+    """The acceleration change that raises the motion interrupt, 2 mg per count.
+    See `mpu6050_motion` for the wake-on-motion mode"""
+    motion_duration = UnaryStruct(_MPU6050_MOT_DUR, ">B")
+    """How long the acceleration change must last to raise the motion interrupt,
+    1 ms per count"""
 
     @property
     def temperature(self) -> float:
@@ -269,54 +481,30 @@ class MPU6050:
     @property
     def acceleration(self) -> Tuple[float, float, float]:
         """Acceleration X, Y, and Z axis data in :math:`m/s^2`"""
-        raw_data = self._raw_accel_data
-        raw_x = raw_data[0]
-        raw_y = raw_data[1]
-        raw_z = raw_data[2]
-
-        accel_range = self._accel_range
-        accel_scale = 1
-        if accel_range == Range.RANGE_16_G:
-            accel_scale = 2048
-        if accel_range == Range.RANGE_8_G:
-            accel_scale = 4096
-        if accel_range == Range.RANGE_4_G:
-            accel_scale = 8192
-        if accel_range == Range.RANGE_2_G:
-            accel_scale = 16384
-
-        # setup range dependant scaling
-        accel_x = (raw_x / accel_scale) * STANDARD_GRAVITY
-        accel_y = (raw_y / accel_scale) * STANDARD_GRAVITY
-        accel_z = (raw_z / accel_scale) * STANDARD_GRAVITY
-
-        return (accel_x, accel_y, accel_z)
+        raw_x, raw_y, raw_z = self._raw_accel_data  # one burst read of the three axes
+
+        # range dependant offsets and scaling, cached when the range is set
+        offsets = self._raw_offsets
+        accel_scale = self._accel_scale
+        return (
+            (raw_x - offsets[0]) * accel_scale,
+            (raw_y - offsets[1]) * accel_scale,
+            (raw_z - offsets[2]) * accel_scale,
+        )
 
     @property
     def gyro(self) -> Tuple[float, float, float]:
         """Gyroscope X, Y, and Z axis data in :math:`º/s`"""
-        raw_data = self._raw_gyro_data
-        raw_x = raw_data[0]
-        raw_y = raw_data[1]
-        raw_z = raw_data[2]
-
-        gyro_scale = 1
-        gyro_range = self._gyro_range
-        if gyro_range == GyroRange.RANGE_250_DPS:
-            gyro_scale = 131
-        if gyro_range == GyroRange.RANGE_500_DPS:
-            gyro_scale = 65.5
-        if gyro_range == GyroRange.RANGE_1000_DPS:
-            gyro_scale = 32.8
-        if gyro_range == GyroRange.RANGE_2000_DPS:
-            gyro_scale = 16.4
-
-        # setup range dependant scaling
-        gyro_x = radians(raw_x / gyro_scale)
-        gyro_y = radians(raw_y / gyro_scale)
-        gyro_z = radians(raw_z / gyro_scale)
-
-        return (gyro_x, gyro_y, gyro_z)
+        raw_x, raw_y, raw_z = self._raw_gyro_data  # one burst read of the three axes
+
+        # range dependant offsets and scaling, cached when the range is set
+        offsets = self._raw_offsets
+        gyro_scale = self._gyro_scale
+        return (
+            (raw_x - offsets[4]) * gyro_scale,
+            (raw_y - offsets[5]) * gyro_scale,
+            (raw_z - offsets[6]) * gyro_scale,
+        )
 
     @property
     def cycle(self) -> bool:
@@ -336,10 +524,15 @@ class MPU6050:
 
     @gyro_range.setter
     def gyro_range(self, value: int) -> None:
+        self._write_gyro_range(value)
+        sleep(0.01)
+
+    def _write_gyro_range(self, value: int) -> None:
+        """Check and write the gyroscope range without waiting for it to settle"""
         if (value < 0) or (value > 3):
             raise ValueError("gyro_range must be a GyroRange")
         self._gyro_range = value
-        sleep(0.01)
+        self._set_scales(gyro_range=value)
 
     @property
     def accelerometer_range(self) -> int:
@@ -348,10 +541,15 @@ class MPU6050:
 
     @accelerometer_range.setter
     def accelerometer_range(self, value: int) -> None:
+        self._write_accelerometer_range(value)
+        sleep(0.01)
+
+    def _write_accelerometer_range(self, value: int) -> None:
+        """Check and write the accelerometer range without waiting for it to settle"""
         if (value < 0) or (value > 3):
             raise ValueError("accelerometer_range must be a Range")
         self._accel_range = value
-        sleep(0.01)
+        self._set_scales(accel_range=value)
 
     @property
     def filter_bandwidth(self) -> int:
@@ -360,10 +558,61 @@ class MPU6050:
 
     @filter_bandwidth.setter
     def filter_bandwidth(self, value: int) -> None:
+        self._write_filter_bandwidth(value)
+        sleep(0.01)
+
+    def _write_filter_bandwidth(self, value: int) -> None:
+        """Check and write the filter bandwidth without waiting for it to settle"""
         if (value < 0) or (value > 6):
             raise ValueError("filter_bandwidth must be a Bandwidth")
         self._filter_bandwidth = value
-        sleep(0.01)
+
+    @property
+    def sample_rate(self) -> float:
+        """The sample rate in Hz, at which the data registers and the FIFO are updated.
+        The gyroscope output rate is 8 kHz with the DLPF disabled (`Bandwidth.BAND_260_HZ`)
+        and 1 kHz otherwise, divided by 1 + :attr:`sample_rate_divisor`"""
+        with self.transaction():
+            filter_bandwidth = self._filter_bandwidth
+            divisor = self.sample_rate_divisor
+        gyro_rate = 8000.0 if filter_bandwidth in (0, 7) else 1000.0
+        return gyro_rate / (1 + divisor)
+
+    def configure_rate(self, target_hz: float, max_latency: float = None) -> float:
+        """Set :attr:`sample_rate_divisor` and :attr:`filter_bandwidth` for the sample
+        rate closest to ``target_hz`` and return the exact rate achieved, in Hz.
+
+        Among the settings that reach the same rate, the widest filter bandwidth below
+        half the sample rate is chosen, so the samples are not aliased, or the narrowest
+        one if none is below it. Rates above 1 kHz need the filter disabled
+        (`Bandwidth.BAND_260_HZ`), which samples the gyroscope at 8 kHz while the
+        accelerometer output is still updated at 1 kHz.
+
+        :param float target_hz: The wanted sample rate, from 3.9 Hz to 8 kHz
+        :param float max_latency: The longest filter delay allowed, in ms. Defaults to
+            :const:`None`, any delay
+        """
+        if not 3.9 <= target_hz <= 8000:
+            raise ValueError("target_hz must be from 3.9 to 8000")
+        best = None
+        for bandwidth in range(7):
+            if max_latency is not None and _DLPF_DELAY_MS[bandwidth] > max_latency:
+                continue
+            gyro_rate = 8000.0 if bandwidth == 0 else 1000.0
+            divisor = min(255, max(0, round(gyro_rate / target_hz) - 1))
+            rate = gyro_rate / (1 + divisor)
+            aliased = _DLPF_BANDWIDTH[bandwidth] > rate / 2
+            # Closest rate first, then no aliasing, then the least filter delay
+            # without aliasing or the narrowest filter with it
+            key = (round(abs(rate - target_hz) / target_hz, 4), aliased, -bandwidth if aliased else bandwidth)
+            if best is None or key < best[0]:
+                best = (key, bandwidth, divisor, rate)
+        if best is None:
+            raise ValueError("max_latency must be at least %.2f ms" % _DLPF_DELAY_MS[0])
+        _, bandwidth, divisor, rate = best
+        self.filter_bandwidth = bandwidth
+        self.sample_rate_divisor = divisor
+        return rate
 
     @property
     def cycle_rate(self) -> int:
@@ -372,10 +621,14 @@ class MPU6050:
 
     @cycle_rate.setter
     def cycle_rate(self, value: int) -> None:
+        self._write_cycle_rate(value)
+        sleep(0.01)
+
+    def _write_cycle_rate(self, value: int) -> None:
+        """Check and write the cycle rate without waiting for it to settle"""
         if (value < 0) or (value > 3):
             raise ValueError("cycle_rate must be a Rate")
         self._cycle_rate = value
-        sleep(0.01)
 
     @property
     def clock_source(self) -> int:
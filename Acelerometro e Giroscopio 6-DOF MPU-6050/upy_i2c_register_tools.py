@@ -3,7 +3,9 @@
 @brief MicroPython I2C Register Tools for handling I2C registers
 @details This library provides classes for handling single and multiple bit fields, structures, and arrays of structures in 
          I2C registers. It supports read-only and read-write access for the I2C registers. The library uses the ustruct library 
-         for packing and unpacking data and is compatible with MicroPython.
+         for packing and unpacking data and is compatible with MicroPython. An optional per-device shadow-register cache
+         (RegisterCache) removes the read-modify-write round trips of the field setters, and a RegisterTransaction
+         batches the descriptor accesses of a block of code into burst reads and writes.
 @author Rodrigo França
 @date 2023-03-28
 """
@@ -11,15 +13,177 @@
 # Import ustruct library to work with primitive data functions
 import ustruct
 
+## @brief Splits a sorted sequence of register addresses into contiguous runs.
+#  @param reg_addrs: Sorted sequence of register addresses without duplicates.
+#  @return: A list of (first register address, number of registers) tuples.
+def _contiguous_runs(reg_addrs):
+
+    runs = []
+    for reg_addr in reg_addrs:
+        if runs and runs[-1][0] + runs[-1][1] == reg_addr:
+            runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+        else:
+            runs.append((reg_addr, 1))
+    return runs
+
+## @brief A per-device shadow copy of the writable configuration registers of an I2C device.
+#  @details Once attached to a device instance with enable_register_cache(), the RWBit, RWBits and UnaryStruct
+#           descriptors serve their reads from this cache and every write goes through to the device and updates the
+#           cache. A field write on a cached register then costs a single I2C transaction instead of a
+#           read-modify-write pair. Registers that the device changes by itself (self-clearing reset bits, status
+#           flags, data registers) must be marked as volatile so they are always accessed on the bus.
+class RegisterCache:
+
+    ## @brief Constructor for the RegisterCache class.
+    #  @param volatile: Addresses of the registers that must never be cached.
+    def __init__(self, volatile=()):
+
+        self._values = {}
+        self._volatile = set(volatile)
+
+    ## @brief Marks a register as volatile and drops its cached value, if any.
+    #  @param reg_addr: The address of the register.
+    def mark_volatile(self, reg_addr: int):
+
+        self._volatile.add(reg_addr)
+        self._values.pop(reg_addr, None)
+
+    ## @brief Checks if a register is allowed to be cached.
+    #  @param reg_addr: The address of the register.
+    #  @return: False if the register was marked as volatile, True otherwise.
+    def is_cacheable(self, reg_addr: int) -> bool:
+
+        return reg_addr not in self._volatile
+
+    ## @brief Drops cached register values so the next access reads them again from the device.
+    #  @param reg_addrs: Addresses of the registers to drop. The whole cache is cleared when none is given.
+    def invalidate(self, *reg_addrs):
+
+        if not reg_addrs:
+            self._values.clear()
+        for reg_addr in reg_addrs:
+            self._values.pop(reg_addr, None)
+
+    ## @brief Loads register values from the device into the cache, using one burst read per contiguous run.
+    #  @param instance: The instance of the class that contains the I2C device and address.
+    #  @param reg_addrs: Addresses of the registers to load. All currently cached registers are reloaded when none is given.
+    def refresh(self, instance, *reg_addrs):
+
+        if not reg_addrs:
+            reg_addrs = list(self._values)
+
+        reg_addrs = sorted(set(reg_addr for reg_addr in reg_addrs if reg_addr not in self._volatile))
+        for first_addr, length in _contiguous_runs(reg_addrs):
+            reg_data = instance._i2c.readfrom_mem(instance._i2c_addr, first_addr, length)
+            for i in range(length):
+                self._values[first_addr + i] = reg_data[i]
+
+    ## @brief Reads a block of registers, from the cache when possible.
+    #  @param instance: The instance of the class that contains the I2C device and address.
+    #  @param reg_addr: The address of the first register.
+    #  @param nbytes: The number of registers to read.
+    #  @return: The register values as bytes.
+    def read(self, instance, reg_addr: int, nbytes: int) -> bytes:
+
+        values = self._values
+        volatile = self._volatile
+        hit = True
+        for addr in range(reg_addr, reg_addr + nbytes):
+            if addr in volatile:
+                # Volatile registers are always read from the device and never stored
+                return instance._i2c.readfrom_mem(instance._i2c_addr, reg_addr, nbytes)
+            if addr not in values:
+                hit = False
+
+        if hit:
+            return bytes([values[addr] for addr in range(reg_addr, reg_addr + nbytes)])
+
+        reg_data = instance._i2c.readfrom_mem(instance._i2c_addr, reg_addr, nbytes)
+        for i in range(nbytes):
+            values[reg_addr + i] = reg_data[i]
+        return reg_data
+
+    ## @brief Updates the cache after a block of registers was written to the device.
+    #  @param reg_addr: The address of the first register written.
+    #  @param reg_data: The bytes written to the device.
+    #  @param insert: If True, registers not yet cached are added, otherwise only the already cached ones are updated.
+    def store(self, reg_addr: int, reg_data, insert: bool = True):
+
+        values = self._values
+        volatile = self._volatile
+        for i in range(len(reg_data)):
+            addr = reg_addr + i
+            if addr not in volatile and (insert or addr in values):
+                values[addr] = reg_data[i]
+
+## @brief Attaches a new RegisterCache to a device instance, enabling the shadow-register cache for its descriptors.
+#  @param instance: The instance of the class that contains the I2C device and address.
+#  @param volatile: Addresses of the registers that must never be cached. If None, the _volatile_registers class
+#                   attribute of the device is used, when present.
+#  @return: The RegisterCache attached to the device.
+def enable_register_cache(instance, volatile=None) -> RegisterCache:
+
+    if volatile is None:
+        volatile = getattr(instance, "_volatile_registers", ())
+
+    cache = RegisterCache(volatile)
+    instance._register_cache = cache
+    return cache
+
+## @brief Detaches the RegisterCache from a device instance, so every descriptor access goes to the bus again.
+#  @param instance: The instance of the class that contains the I2C device and address.
+def disable_register_cache(instance):
+
+    instance._register_cache = None
+
+## @brief Reads a block of registers from a device, going through its open RegisterTransaction or RegisterCache.
+#  @param instance: The instance of the class that contains the I2C device and address.
+#  @param reg_addr: The address of the first register.
+#  @param nbytes: The number of registers to read.
+#  @param cacheable: False to bypass the cache, used for read-only (status and data) registers.
+#  @return: The register values as bytes.
+def _read_registers(instance, reg_addr: int, nbytes: int, cacheable: bool) -> bytes:
+
+    transaction = getattr(instance, "_register_transaction", None)
+    if transaction is not None:
+        return transaction.read(reg_addr, nbytes, cacheable)
+
+    cache = getattr(instance, "_register_cache", None)
+    if cacheable and cache is not None:
+        return cache.read(instance, reg_addr, nbytes)
+    return instance._i2c.readfrom_mem(instance._i2c_addr, reg_addr, nbytes)
+
+## @brief Writes a block of registers to a device and keeps its RegisterCache, if any, up to date (write-through).
+#  @details Inside an open RegisterTransaction the write is deferred until the transaction is committed.
+#  @param instance: The instance of the class that contains the I2C device and address.
+#  @param reg_addr: The address of the first register.
+#  @param reg_data: The bytes to be written.
+#  @param cacheable: False to only update registers that are already cached.
+def _write_registers(instance, reg_addr: int, reg_data, cacheable: bool):
+
+    transaction = getattr(instance, "_register_transaction", None)
+    if transaction is not None and transaction.write(reg_addr, reg_data, cacheable):
+        return
+
+    instance._i2c.writeto_mem(instance._i2c_addr, reg_addr, reg_data)
+
+    cache = getattr(instance, "_register_cache", None)
+    if cache is not None:
+        cache.store(reg_addr, reg_data, cacheable)
+
 ## @brief A class for managing a single read-write bit in an I2C register.
 class RWBit:
 
+    # Read-write fields can be served from the register cache of the device
+    _cacheable = True
+
     ## @brief Constructor for the RWBit class.
     #  @param reg_addr: The address of the I2C register that contains the bit.
     #  @param bit_offset: The bit position within the register, from 0 to 7.
     def __init__(self, reg_addr: int, bit_offset: int):
     
         self._reg_addr = reg_addr
+        self._reg_size = 1
         self._bit_offset = bit_offset
         self._bit_mask = 1 << bit_offset
 
@@ -28,9 +192,13 @@ class RWBit:
     #  @param owner: The class that owns the descriptor.
     #  @return The value of the bit as a boolean.
     def __get__(self, instance, owner):
-    
-        # Read the register value from the I2C device
-        reg_value = instance._i2c.readfrom_mem(instance._i2c_addr, self._reg_addr, 1)[0]
+
+        # Accessed on the class itself, return the descriptor
+        if instance is None:
+            return self
+
+        # Read the register value from the I2C device (or from its register cache)
+        reg_value = _read_registers(instance, self._reg_addr, 1, self._cacheable)[0]
 
         # Extract the value of the bit using the private constant mask
         return (reg_value & self._bit_mask) >> self._bit_offset
@@ -40,8 +208,8 @@ class RWBit:
     #  @param value: The new value of the bit as a boolean.
     def __set__(self, instance, value):
 
-        # Read the current register value from the I2C device
-        reg_value = instance._i2c.readfrom_mem(instance._i2c_addr, self._reg_addr, 1)[0]
+        # Read the current register value from the I2C device (or from its register cache)
+        reg_value = _read_registers(instance, self._reg_addr, 1, self._cacheable)[0]
 
         # Update the bit value
         if value:
@@ -50,11 +218,14 @@ class RWBit:
             reg_value &= ~self._bit_mask
 
         # Write the updated register value to the I2C device
-        instance._i2c.writeto_mem(instance._i2c_addr, self._reg_addr, bytes([reg_value]))
+        _write_registers(instance, self._reg_addr, bytes([reg_value]), self._cacheable)
 
 ## @brief A class for managing a single read-only bit in an I2C register.
 class ROBit(RWBit):
 
+    # Read-only fields usually hold status flags, so they always bypass the register cache
+    _cacheable = False
+
     ## @brief Setter method for the ROBit class. Raises an AttributeError since the bit is read-only.
     #  @param instance: The instance of the class that contains the I2C device and address.
     #  @param value: The new value of the bit as a boolean.
@@ -65,6 +236,9 @@ class ROBit(RWBit):
 ## @brief A class for managing a single read-write bit field in an I2C register.
 class RWBits:
 
+    # Read-write fields can be served from the register cache of the device
+    _cacheable = True
+
     ## @brief Constructor for RWBits class.
     #  @param bits_width: The width of the bit field.
     #  @param reg_addr: The address of the register containing the bit field.
@@ -73,6 +247,7 @@ class RWBits:
         
         self._bits_width = bits_width
         self._reg_addr = reg_addr
+        self._reg_size = 1
         self._bits_offset = bits_offset
         self._bits_mask = ((1 << bits_width) - 1) << bits_offset
         self._value_mask = (1 << bits_width) - 1
@@ -83,8 +258,12 @@ class RWBits:
     #  @return: The value of the bit field.
     def __get__(self, instance, owner):
 
-        # Read the register value from the I2C device
-        reg_value = instance._i2c.readfrom_mem(instance._i2c_addr, self._reg_addr, 1)[0]
+        # Accessed on the class itself, return the descriptor
+        if instance is None:
+            return self
+
+        # Read the register value from the I2C device (or from its register cache)
+        reg_value = _read_registers(instance, self._reg_addr, 1, self._cacheable)[0]
 
         # Extract the value of the bit field using the private constant mask
         return (reg_value & self._bits_mask) >> self._bits_offset
@@ -94,8 +273,8 @@ class RWBits:
     #  @param value: The new value to be set for the bit field.
     def __set__(self, instance, value):
 
-        # Read the current register value from the I2C device
-        reg_value = instance._i2c.readfrom_mem(instance._i2c_addr, self._reg_addr, 1)[0]
+        # Read the current register value from the I2C device (or from its register cache)
+        reg_value = _read_registers(instance, self._reg_addr, 1, self._cacheable)[0]
 
         # Calculate the value to write to the bit field
         value &= self._value_mask
@@ -104,11 +283,14 @@ class RWBits:
         # Clear the bits corresponding to the bit field and write the new value to the register
         reg_value &= ~self._bits_mask
         reg_value |= value
-        instance._i2c.writeto_mem(instance._i2c_addr, self._reg_addr, bytes([reg_value]))
+        _write_registers(instance, self._reg_addr, bytes([reg_value]), self._cacheable)
 
 ## @brief A class for managing a single read-only bit field in an I2C register.
 class ROBits(RWBits):
 
+    # Read-only fields usually hold status flags, so they always bypass the register cache
+    _cacheable = False
+
     ## @brief Setter method for the ROBits class.
     #  @param instance: The instance of the class.
     #  @param value: The new value to be set for the bit field.
@@ -119,6 +301,9 @@ class ROBits(RWBits):
 ## @brief A class for managing a single read-write register access using struct packing and unpacking in an I2C device.
 class UnaryStruct:
 
+    # Read-write registers can be served from the register cache of the device
+    _cacheable = True
+
     ## @brief Constructor for UnaryStruct class.
     #  @param reg_addr: The address of the register to be accessed.
     #  @param struct_format: The struct format to be used for packing and unpacking data.
@@ -126,6 +311,7 @@ class UnaryStruct:
 
         self._reg_addr = reg_addr
         self._struct_format = struct_format
+        self._reg_size = ustruct.calcsize(struct_format)
 
     ## @brief Getter method for the UnaryStruct class.
     #  @param instance: The instance of the class.
@@ -133,8 +319,12 @@ class UnaryStruct:
     #  @return: The unpacked data from the register.
     def __get__(self, instance, owner):
 
-        # Read the register data from the I2C device
-        reg_data = instance._i2c.readfrom_mem(instance._i2c_addr, self._reg_addr, ustruct.calcsize(self._struct_format))
+        # Accessed on the class itself, return the descriptor
+        if instance is None:
+            return self
+
+        # Read the register data from the I2C device (or from its register cache)
+        reg_data = _read_registers(instance, self._reg_addr, self._reg_size, self._cacheable)
 
         # Unpack the register data using the specified struct format
         return ustruct.unpack(self._struct_format, reg_data)[0]
@@ -148,11 +338,14 @@ class UnaryStruct:
         reg_data = ustruct.pack(self._struct_format, new_data)
 
         # Write the packed data to the I2C register
-        instance._i2c.writeto_mem(instance._i2c_addr, self._reg_addr, reg_data)
+        _write_registers(instance, self._reg_addr, reg_data, self._cacheable)
 
 ## @brief A class for managing a single read-only register access using struct packing and unpacking in an I2C device.
 class ROUnaryStruct(UnaryStruct):
 
+    # Read-only registers usually hold sensor data, so they always bypass the register cache
+    _cacheable = False
+
     ## @brief Setter method for the ROUnaryStruct class.
     #  @param instance: The instance of the class.
     #  @param new_data: The new data to be written to the register.
@@ -160,6 +353,53 @@ class ROUnaryStruct(UnaryStruct):
 
         raise AttributeError("This register is read-only")
 
+## @brief A view of a StructArray bound to a device instance.
+#  @details Returned by StructArray.view(), usually bound once to an attribute of the device, e.g.
+#           self.values = type(self).array.view(self). It supports arr[i], arr[a:b] and arr[i] = v, each mapped to a
+#           single burst access over just the requested elements, and iterating over it reads the whole array in one
+#           burst read.
+class StructArrayView:
+
+    ## @brief Constructor for StructArrayView class.
+    #  @param array: The StructArray descriptor.
+    #  @param instance: The instance of the class that contains the I2C device and address.
+    def __init__(self, array, instance):
+
+        self._array = array
+        self._instance = instance
+
+    ## @brief Number of elements in the array.
+    #  @return: The size of the array.
+    def __len__(self):
+
+        return self._array._array_size
+
+    ## @brief Reads one element or a slice of elements of the array.
+    #  @param index: The index of the element, or a slice with a positive step.
+    #  @return: The unpacked element, or a tuple of elements for a slice.
+    def __getitem__(self, index):
+
+        return self._array.read_items(self._instance, index)
+
+    ## @brief Writes one element or a slice of contiguous elements of the array.
+    #  @param index: The index of the element, or a slice with step 1.
+    #  @param value: The new element, or a sequence of elements for a slice.
+    def __setitem__(self, index, value):
+
+        self._array.write_items(self._instance, index, value)
+
+    ## @brief Iterates over the elements of the whole array, read in a single burst.
+    #  @return: An iterator over the unpacked elements.
+    def __iter__(self):
+
+        return iter(self._array.read(self._instance))
+
+    ## @brief Reads the whole array in a single burst.
+    #  @return: A tuple with the unpacked elements.
+    def read(self):
+
+        return self._array.read(self._instance)
+
 ## @brief A class for managing a multiple read-write array-based registers access using struct packing and unpacking in an I2C device.
 class StructArray:
 
@@ -173,57 +413,122 @@ class StructArray:
         self._struct_format = struct_format
         self._array_size = array_size
         self._element_size = ustruct.calcsize(self._struct_format)
+        self._reg_size = self._element_size * array_size
+
+        # Formats for runs of elements, compiled once per element count
+        self._formats = {1: struct_format}
+        self._array_format = self._format(array_size)
+
+    ## @brief Gets the struct format for a run of elements, building it on first use.
+    #  @param count: The number of elements in the run.
+    #  @return: The struct format for the run.
+    def _format(self, count: int) -> str:
+
+        struct_format = self._formats.get(count)
+        if struct_format is None:
+            struct_format = self._struct_format[0] + str(count) + self._struct_format[1:]
+            self._formats[count] = struct_format
+        return struct_format
+
+    ## @brief Converts an index or a slice into a run of elements.
+    #  @param index: The index of the element, or a slice with a positive step.
+    #  @return: A (first element, number of elements, step) tuple. The step is None for a single index.
+    def _run(self, index):
+
+        size = self._array_size
+        if isinstance(index, slice):
+            step = 1 if index.step is None else index.step
+            if step <= 0:
+                raise ValueError("Slice step must be positive")
+            start = 0 if index.start is None else index.start
+            stop = size if index.stop is None else index.stop
+            if start < 0:
+                start += size
+            if stop < 0:
+                stop += size
+            start = min(max(start, 0), size)
+            stop = min(max(stop, start), size)
+            return (start, stop - start, step)
+
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("Index out of range")
+        return (index, 1, None)
 
-    ## @brief Getter method for the StructArray class.
-    #  @param index: The index of the element to be accessed.
+    ## @brief Reads the whole array in a single burst.
     #  @param instance: The instance of the class.
-    #  @return: The unpacked data from the register.
-    def __getitem__(self, index, instance):
+    #  @return: A tuple with the unpacked elements.
+    def read(self, instance):
 
-        if 0 <= index < self._array_size:
-            # Calculate the address for the requested index
-            addr = self._reg_addr + index * self._element_size
-
-            # Read the register value from the I2C device
-            reg_data = instance._i2c.readfrom_mem(instance._i2c_addr, addr, self._element_size)
+        # Read the entire array from the I2C device
+        reg_data = _read_registers(instance, self._reg_addr, self._reg_size, False)
 
-            # Unpack the register data using the specified struct format
-            return ustruct.unpack(self._struct_format, reg_data)[0]
-        else:
-            raise IndexError("Index out of range")
+        # Unpack the register data using the format compiled for the entire array
+        return ustruct.unpack(self._array_format, reg_data)
 
-    ## @brief Setter method for the StructArray class.
-    #  @param index: The index of the element to be set.
+    ## @brief Reads one element or a slice of elements with a single burst over just the requested range.
     #  @param instance: The instance of the class.
-    #  @param value: The new value to be written to the register.
-    def __setitem__(self, index, instance, value):
-    
-        if 0 <= index < self._array_size:
-            # Calculate the address for the requested index
-            addr = self._reg_addr + index * self._element_size
+    #  @param index: The index of the element, or a slice with a positive step.
+    #  @return: The unpacked element, or a tuple of elements for a slice.
+    def read_items(self, instance, index):
+
+        first, count, step = self._run(index)
+        if count == 0:
+            return ()
+
+        # Read the requested run of elements from the I2C device
+        addr = self._reg_addr + first * self._element_size
+        reg_data = _read_registers(instance, addr, count * self._element_size, False)
+        values = ustruct.unpack(self._format(count), reg_data)
+
+        if step is None:
+            return values[0]
+        if step != 1:
+            return values[::step]
+        return values
+
+    ## @brief Writes one element or a slice of contiguous elements with a single burst.
+    #  @param instance: The instance of the class.
+    #  @param index: The index of the element, or a slice with step 1.
+    #  @param value: The new element, or a sequence of elements for a slice.
+    def write_items(self, instance, index, value):
 
-            # Pack the new value using the specified struct format
+        first, count, step = self._run(index)
+        if step is None:
             reg_data = ustruct.pack(self._struct_format, value)
-
-            # Write the packed data to the I2C register
-            instance._i2c.writeto_mem(instance._i2c_addr, addr, reg_data)
         else:
-            raise IndexError("Index out of range")
+            if step != 1:
+                raise ValueError("Slice assignment requires a step of 1")
+            if len(value) != count:
+                raise ValueError("Wrong number of elements in the input array")
+            if count == 0:
+                return
+            reg_data = ustruct.pack(self._format(count), *value)
+
+        # Write the packed data to the requested run of elements
+        _write_registers(instance, self._reg_addr + first * self._element_size, reg_data, False)
+
+    ## @brief Gets a StructArrayView bound to an instance, for element and slice access.
+    #  @details Each index or slice of the view is one I2C transaction, so read the whole array
+    #           through the attribute when all the elements are needed.
+    #  @param instance: The instance of the class.
+    #  @return: A StructArrayView bound to the instance.
+    def view(self, instance):
+
+        return StructArrayView(self, instance)
 
     ## @brief Getter method for the entire StructArray class.
     #  @param instance: The instance of the class.
     #  @param owner: The class that owns the instance.
-    #  @return: The unpacked data for the entire array from the register.
+    #  @return: A tuple with the unpacked data from the entire array.
     def __get__(self, instance, owner):
 
-        # Calculate the address for the entire array
-        addr = self._reg_addr
+        # Accessed on the class itself, return the descriptor
+        if instance is None:
+            return self
 
-        # Read the entire array from the I2C device
-        reg_data = instance._i2c.readfrom_mem(instance._i2c_addr, addr, self._array_size * self._element_size)
-
-        # Unpack the register data using the specified struct format for the entire array
-        return ustruct.unpack_from(self._struct_format[0] + str(self._array_size) + self._struct_format[1:], reg_data)
+        return self.read(instance)
 
     ## @brief Setter method for the entire StructArray class.
     #  @param instance: The instance of the class.
@@ -233,8 +538,196 @@ class StructArray:
         if len(value) != self._array_size:
             raise ValueError("Wrong number of elements in the input array")
 
-        # Pack the entire new value tuple using the specified struct format
-        reg_data = ustruct.pack(self._struct_format[0] + str(self._array_size) + self._struct_format[1:], *value)
+        # Pack the entire new value tuple using the format compiled for the entire array
+        reg_data = ustruct.pack(self._array_format, *value)
 
         # Write the packed data to the entire array in the I2C register
-        instance._i2c.writeto_mem(instance._i2c_addr, self._reg_addr, reg_data)
+        _write_registers(instance, self._reg_addr, reg_data, False)
+
+# Register layouts of the device classes, built on first use by _register_runs()
+_register_layouts = {}
+
+## @brief Builds the list of contiguous register runs covered by the descriptors of a device class.
+#  @details Registers listed in the _volatile_registers class attribute are left out of the runs.
+#  @param owner: The device class.
+#  @return: A list of (first register address, number of registers) tuples.
+def _register_runs(owner):
+
+    runs = _register_layouts.get(owner)
+    if runs is None:
+        volatile = getattr(owner, "_volatile_registers", ())
+        reg_addrs = set()
+        for name in dir(owner):
+            try:
+                attr = getattr(owner, name)
+            except AttributeError:
+                continue
+            if isinstance(attr, (RWBit, RWBits, UnaryStruct, StructArray)):
+                for reg_addr in range(attr._reg_addr, attr._reg_addr + attr._reg_size):
+                    if reg_addr not in volatile:
+                        reg_addrs.add(reg_addr)
+        runs = _contiguous_runs(sorted(reg_addrs))
+        _register_layouts[owner] = runs
+    return runs
+
+## @brief A snapshot context that batches the descriptor reads and writes of a device.
+#  @details While the transaction is open, the first read of a register fetches, in a single burst, the whole run of
+#           adjacent registers declared by the descriptors of the device class, and later reads of any field in that
+#           run are served from the snapshot. Writes are collected and, when the block exits without an exception,
+#           sent as the fewest contiguous writeto_mem calls, in ascending register order. Volatile registers bypass
+#           the transaction and are accessed immediately. Use it through register_transaction() or a device method:
+#
+#               with mpu.transaction():
+#                   mpu.gyro_range = GyroRange.RANGE_1000_DPS
+#                   mpu.accelerometer_range = Range.RANGE_8_G
+class RegisterTransaction:
+
+    ## @brief Constructor for the RegisterTransaction class.
+    #  @param instance: The instance of the class that contains the I2C device and address.
+    #  @param merge_writes: If True, pending writes to adjacent registers are sent as a single burst write. Set it to
+    #                       False for devices that do not auto-increment the register address on writes.
+    def __init__(self, instance, merge_writes: bool = True):
+
+        self._instance = instance
+        self._merge_writes = merge_writes
+        self._depth = 0
+        self._values = {}
+        self._pending = {}
+        self._uncached = set()
+        self._volatile = set(getattr(instance, "_volatile_registers", ()))
+
+    ## @brief Opens the transaction. Nested blocks on the same transaction are joined to the outermost one.
+    #  @return: The RegisterTransaction itself.
+    def __enter__(self):
+
+        if self._depth == 0:
+            cache = getattr(self._instance, "_register_cache", None)
+            if cache is not None:
+                self._volatile.update(cache._volatile)
+            self._instance._register_transaction = self
+        self._depth += 1
+        return self
+
+    ## @brief Closes the transaction, committing the pending writes unless an exception was raised in the block.
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self._depth -= 1
+        if self._depth == 0:
+            self._instance._register_transaction = None
+            try:
+                if exc_type is None:
+                    self.commit()
+            finally:
+                self._values.clear()
+                self._pending.clear()
+                self._uncached.clear()
+        return False
+
+    ## @brief Reads a block of registers from the snapshot, fetching the missing register runs with burst reads.
+    #  @param reg_addr: The address of the first register.
+    #  @param nbytes: The number of registers to read.
+    #  @param cacheable: False if the registers must not be served from the register cache.
+    #  @return: The register values as bytes.
+    def read(self, reg_addr: int, nbytes: int, cacheable: bool) -> bytes:
+
+        instance = self._instance
+        values = self._values
+        volatile = self._volatile
+        missing = []
+        for addr in range(reg_addr, reg_addr + nbytes):
+            if addr in volatile:
+                # Volatile registers are always read from the device
+                return instance._i2c.readfrom_mem(instance._i2c_addr, reg_addr, nbytes)
+            if addr not in values:
+                missing.append(addr)
+
+        if missing:
+            cache = getattr(instance, "_register_cache", None)
+            if cacheable and cache is not None and all(addr in cache._values for addr in missing):
+                # Every missing register is already in the shadow-register cache
+                for addr in missing:
+                    values[addr] = cache._values[addr]
+            else:
+                for first_addr, length in self._runs_covering(missing):
+                    reg_data = instance._i2c.readfrom_mem(instance._i2c_addr, first_addr, length)
+                    for i in range(length):
+                        addr = first_addr + i
+                        if addr not in values:
+                            values[addr] = reg_data[i]
+                    if cache is not None:
+                        cache.store(first_addr, reg_data, False)
+
+        return bytes([values[addr] for addr in range(reg_addr, reg_addr + nbytes)])
+
+    ## @brief Queues a block of registers to be written when the transaction is committed.
+    #  @param reg_addr: The address of the first register.
+    #  @param reg_data: The bytes to be written.
+    #  @param cacheable: False if the written registers must not be added to the register cache.
+    #  @return: True if the write was queued, False if it touches a volatile register and must be sent immediately.
+    def write(self, reg_addr: int, reg_data, cacheable: bool) -> bool:
+
+        for addr in range(reg_addr, reg_addr + len(reg_data)):
+            if addr in self._volatile:
+                return False
+
+        for i in range(len(reg_data)):
+            addr = reg_addr + i
+            self._values[addr] = reg_data[i]
+            self._pending[addr] = reg_data[i]
+            if cacheable:
+                self._uncached.discard(addr)
+            else:
+                self._uncached.add(addr)
+        return True
+
+    ## @brief Sends the pending writes to the device and clears them.
+    def commit(self):
+
+        instance = self._instance
+        pending = self._pending
+        reg_addrs = sorted(pending)
+        if self._merge_writes:
+            runs = _contiguous_runs(reg_addrs)
+        else:
+            runs = [(addr, 1) for addr in reg_addrs]
+
+        cache = getattr(instance, "_register_cache", None)
+        for first_addr, length in runs:
+            reg_data = bytes([pending[addr] for addr in range(first_addr, first_addr + length)])
+            instance._i2c.writeto_mem(instance._i2c_addr, first_addr, reg_data)
+            if cache is not None:
+                for i in range(length):
+                    addr = first_addr + i
+                    cache.store(addr, reg_data[i:i + 1], addr not in self._uncached)
+
+        pending.clear()
+        self._uncached.clear()
+
+    ## @brief Finds the register runs to be fetched in order to read a set of registers.
+    #  @param reg_addrs: Sorted addresses of the registers missing from the snapshot.
+    #  @return: A list of (first register address, number of registers) tuples.
+    def _runs_covering(self, reg_addrs):
+
+        layout = _register_runs(type(self._instance))
+        runs = []
+        uncovered = []
+        for addr in reg_addrs:
+            for run in layout:
+                if run[0] <= addr < run[0] + run[1]:
+                    if run not in runs:
+                        runs.append(run)
+                    break
+            else:
+                uncovered.append(addr)
+        return runs + _contiguous_runs(uncovered)
+
+## @brief Returns the open RegisterTransaction of a device, or a new one if there is none.
+#  @param instance: The instance of the class that contains the I2C device and address.
+#  @param merge_writes: See RegisterTransaction. Ignored when joining an already open transaction.
+#  @return: A RegisterTransaction to be used in a with statement.
+def register_transaction(instance, merge_writes: bool = True) -> RegisterTransaction:
+
+    transaction = getattr(instance, "_register_transaction", None)
+    if transaction is None:
+        transaction = RegisterTransaction(instance, merge_writes)
+    return transaction
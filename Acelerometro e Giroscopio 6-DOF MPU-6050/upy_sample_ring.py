@@ -0,0 +1,146 @@
+"""!
+@file upy_sample_ring.py
+@brief MicroPython preallocated ring buffer of fixed-size sensor samples
+@details This library provides the SampleRing class, a ring buffer whose storage is allocated once: the samples are
+         kept as raw bytes in a bytearray (in the byte order of the sensor) and the sample index of each slot in an
+         array. A driver can read a burst of samples straight into the free slots with readfrom_mem_into, without
+         allocating or decoding anything, and the samples are only unpacked when the application pops them. The
+         index can also be a timestamp, e.g. the utime.ticks_us() value of an interrupt:
+
+             ring = SampleRing(256, ">6h")
+             view, nframes = ring.reserve(count)
+             i2c.readfrom_mem_into(addr, reg, view)
+             ring.commit(nframes, first_index)
+             for index, (ax, ay, az, gx, gy, gz) in ring.drain():
+                 ...
+
+         When the ring is full, the newest samples overwrite the oldest ones and the overruns counter is incremented.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Import array library for the sample index storage
+from array import array
+# Import ustruct library to unpack the samples
+import ustruct
+
+## @brief A ring buffer of fixed-size samples, each with its sample index (or timestamp).
+class SampleRing:
+
+    ## @brief Constructor for the SampleRing class.
+    #  @param capacity: The number of samples the ring holds.
+    #  @param sample_format: The ustruct format of one sample, e.g. ">6h" for the MPU6050 FIFO frames.
+    def __init__(self, capacity: int, sample_format: str = ">6h"):
+
+        self.capacity = capacity
+        self.sample_format = sample_format
+        self.sample_size = ustruct.calcsize(sample_format)
+        self._data = bytearray(capacity * self.sample_size)
+        self._view = memoryview(self._data)
+        self._index = array("L", range(capacity))
+        self._head = 0  # slot of the next sample written
+        self._count = 0
+        ## Number of samples overwritten before they were read
+        self.overruns = 0
+
+    ## @brief Number of samples in the ring.
+    def __len__(self) -> int:
+
+        return self._count
+
+    ## @brief Discards all the samples.
+    def clear(self):
+
+        self._head = 0
+        self._count = 0
+
+    ## @brief Gets the contiguous free slots after the newest sample, where the next samples are written.
+    #  @details The region stops at the end of the storage, so up to two reserve/commit rounds are needed to write
+    #           a burst that wraps around. Slots of unread samples are included when the ring is full.
+    #  @param nsamples: The number of samples to be written.
+    #  @return: A (writable memoryview, number of samples) tuple, the number of samples being at most nsamples.
+    def reserve(self, nsamples: int):
+
+        nsamples = min(nsamples, self.capacity - self._head)
+        start = self._head * self.sample_size
+        return self._view[start:start + nsamples * self.sample_size], nsamples
+
+    ## @brief Adds the samples written to the region returned by reserve().
+    #  @param nsamples: The number of samples written.
+    #  @param first_index: The sample index of the first of them. The next ones get consecutive indices.
+    def commit(self, nsamples: int, first_index: int):
+
+        head = self._head
+        index = self._index
+        for i in range(nsamples):
+            index[head + i] = (first_index + i) & 0xFFFFFFFF
+        self._head = (head + nsamples) % self.capacity
+        count = self._count + nsamples
+        if count > self.capacity:
+            self.overruns += count - self.capacity
+            count = self.capacity
+        self._count = count
+
+    ## @brief Adds one sample.
+    #  @param data: The raw sample, sample_size bytes.
+    #  @param index: The sample index or timestamp.
+    def push(self, data, index: int):
+
+        view, nsamples = self.reserve(1)
+        view[:] = data
+        self.commit(1, index)
+
+    ## @brief Slot of the oldest sample plus an offset.
+    def _slot(self, offset: int) -> int:
+
+        return (self._head - self._count + offset) % self.capacity
+
+    ## @brief Reads a sample without removing it.
+    #  @param offset: 0 for the oldest sample, -1 for the newest one.
+    #  @return: A (sample index, unpacked values) tuple.
+    def peek(self, offset: int = 0):
+
+        if offset < 0:
+            offset += self._count
+        if not 0 <= offset < self._count:
+            raise IndexError("SampleRing index out of range")
+        slot = self._slot(offset)
+        return self._index[slot], ustruct.unpack_from(self.sample_format, self._data, slot * self.sample_size)
+
+    ## @brief Removes the oldest sample.
+    #  @return: A (sample index, unpacked values) tuple, or None if the ring is empty.
+    def pop(self):
+
+        if self._count == 0:
+            return None
+        sample = self.peek(0)
+        self._count -= 1
+        return sample
+
+    ## @brief Gets the unread samples as raw bytes, without unpacking them.
+    #  @return: A list of up to two (memoryview, number of samples) tuples, oldest samples first.
+    def regions(self):
+
+        first = self._slot(0)
+        size = self.sample_size
+        nsamples = min(self._count, self.capacity - first)
+        regions = [(self._view[first * size:(first + nsamples) * size], nsamples)]
+        if nsamples < self._count:
+            regions.append((self._view[:(self._count - nsamples) * size], self._count - nsamples))
+        return regions
+
+    ## @brief Removes the oldest samples without reading them.
+    #  @param nsamples: The number of samples removed.
+    def discard(self, nsamples: int):
+
+        self._count -= min(nsamples, self._count)
+
+    ## @brief Removes the samples, oldest first.
+    #  @param nsamples: The maximum number of samples removed, all of them if None.
+    #  @return: A generator of (sample index, unpacked values) tuples.
+    def drain(self, nsamples: int = None):
+
+        if nsamples is None or nsamples > self._count:
+            nsamples = self._count
+        for _ in range(nsamples):
+            yield self.pop()
@@ -0,0 +1,177 @@
+"""!
+@file bmp280_compensacao_exemplo.py
+@brief Programa para validar no computador os caminhos de compensação do driver BMP280, sem hardware.
+@details Este programa utiliza a biblioteca upy_i2c_sim para simular o BMP280 e compara os caminhos de compensação
+         de 32 bits e de ponto flutuante do driver bmp280 com o caminho de 64 bits do datasheet, com os dados de teste
+         do driver e em uma varredura das leituras brutas do BMP280 simulado de -40 a 85 C e de 300 a 1100 hPa. São
+         verificadas as tolerâncias declaradas no driver: o caminho de 32 bits fica a até 7 Pa do de 64 bits, sem
+         valores intermediários fora dos inteiros pequenos do MicroPython (30 bits), e o de ponto flutuante a até
+         0,1 Pa e 0,01 C, inclusive em precisão simples (float32), como no Raspberry Pi Pico. Se o NumPy estiver
+         instalado, verifica também se bmp280_numpy.compensate dá os mesmos resultados do caminho de 64 bits.
+         O programa termina com um AssertionError se alguma tolerância não for atendida.
+         Execução: python3 bmp280_compensacao_exemplo.py
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Importa a biblioteca struct para arredondar os valores para float32
+import struct
+
+# Importa a biblioteca upy_i2c_sim com o barramento I2C e os dispositivos simulados
+import upy_i2c_sim
+
+# Registra os módulos do MicroPython (machine, utime, ustruct, ...) para executar os drivers no computador
+upy_i2c_sim.install()
+
+# Importa a classe e as constantes do driver (após a instalação dos módulos do MicroPython)
+from bmp280 import BMP280, BMP280_COMP_64BIT, BMP280_COMP_32BIT, BMP280_COMP_FLOAT
+
+# Importa a compensação vetorizada, se o NumPy estiver instalado
+try:
+    import bmp280_numpy
+except ImportError:
+    bmp280_numpy = None
+
+# Tolerâncias declaradas no driver, em relação ao caminho de 64 bits
+TOLERANCIA_32BIT_PA = 7
+TOLERANCIA_FLOAT_PA = 0.1
+TOLERANCIA_FLOAT_C = 0.01
+# Maior valor de um inteiro pequeno do MicroPython no RP2040 (30 bits)
+LIMITE_INTEIRO_PEQUENO = 1 << 30
+
+# Nomes dos atributos dos coeficientes de calibração no driver, na ordem de BMP280.calibration
+COEFICIENTES = ("_T1", "_T2", "_T3", "_P1", "_P2", "_P3", "_P4", "_P5", "_P6", "_P7", "_P8", "_P9")
+
+
+# Inteiro que guarda o maior valor absoluto de todas as operações feitas com ele
+class InteiroMonitorado(int):
+
+    maior = 0
+
+    def _novo(self, valor):
+        valor = int(valor)
+        InteiroMonitorado.maior = max(InteiroMonitorado.maior, abs(valor))
+        return InteiroMonitorado(valor)
+
+    def __divmod__(self, outro):
+        return tuple(self._novo(valor) for valor in divmod(int(self), int(outro)))
+
+    def __neg__(self):
+        return self._novo(-int(self))
+
+
+# Float que arredonda o resultado de todas as operações para precisão simples, como o MicroPython no RP2040
+class Float32(float):
+
+    def __new__(cls, valor):
+        return float.__new__(cls, struct.unpack("f", struct.pack("f", valor))[0])
+
+    def __neg__(self):
+        return Float32(-float(self))
+
+
+# Cria os operadores das duas classes a partir das operações de int e float
+def operador(classe, base, nome):
+    funcao = getattr(base, nome)
+    if classe is InteiroMonitorado:
+        return lambda self, outro: self._novo(funcao(int(self), int(outro)))
+    return lambda self, outro: Float32(funcao(float(self), float(outro)))
+
+
+for operacao in ("add", "sub", "mul", "lshift", "rshift", "and", "floordiv", "mod"):
+    for nome in ("__%s__" % operacao, "__r%s__" % operacao):
+        setattr(InteiroMonitorado, nome, operador(InteiroMonitorado, int, nome))
+for operacao in ("add", "sub", "mul", "truediv"):
+    for nome in ("__%s__" % operacao, "__r%s__" % operacao):
+        setattr(Float32, nome, operador(Float32, float, nome))
+
+
+# Compensa uma leitura bruta com o caminho de compensação do driver, com os coeficientes convertidos por tipo
+def compensar(bmp280, t_raw, p_raw, tipo):
+    calibracao = bmp280.calibration
+    for nome, valor in zip(COEFICIENTES, calibracao):
+        setattr(bmp280, nome, tipo(valor))
+    try:
+        t_fine = bmp280._t_fine_of(tipo(t_raw))
+        return bmp280._temperature_of(t_fine), bmp280._pressure_of(tipo(p_raw), t_fine)
+    finally:
+        for nome, valor in zip(COEFICIENTES, calibracao):
+            setattr(bmp280, nome, valor)
+
+
+# Compara uma leitura dos caminhos de 32 bits e de ponto flutuante com a do caminho de 64 bits
+def verificar(drivers, referencia, t_raw, p_raw, leituras, piores):
+    temp_64, press_64 = referencia
+    temp_32, press_32 = leituras[BMP280_COMP_32BIT]
+    temp_float, press_float = leituras[BMP280_COMP_FLOAT]
+    temp_f32, press_f32 = compensar(drivers[BMP280_COMP_FLOAT], t_raw, p_raw, Float32)
+    compensar(drivers[BMP280_COMP_32BIT], t_raw, p_raw, InteiroMonitorado)
+    piores["32 bits (Pa)"] = max(piores["32 bits (Pa)"], abs(press_32 - press_64))
+    piores["32 bits (C)"] = max(piores["32 bits (C)"], abs(temp_32 - temp_64))
+    piores["float (Pa)"] = max(piores["float (Pa)"], abs(press_float - press_64), abs(press_f32 - press_64))
+    piores["float (C)"] = max(piores["float (C)"], abs(temp_float - temp_64), abs(temp_f32 - temp_64))
+    assert abs(press_32 - press_64) <= TOLERANCIA_32BIT_PA, (t_raw, p_raw, press_32, press_64)
+    assert temp_32 == temp_64, (t_raw, p_raw, temp_32, temp_64)
+    assert abs(press_float - press_64) <= TOLERANCIA_FLOAT_PA, (t_raw, p_raw, press_float, press_64)
+    assert abs(press_f32 - press_64) <= TOLERANCIA_FLOAT_PA, (t_raw, p_raw, press_f32, press_64)
+    assert abs(temp_float - temp_64) <= TOLERANCIA_FLOAT_C, (t_raw, p_raw, temp_float, temp_64)
+    assert abs(temp_f32 - temp_64) <= TOLERANCIA_FLOAT_C, (t_raw, p_raw, temp_f32, temp_64)
+    assert InteiroMonitorado.maior < LIMITE_INTEIRO_PEQUENO, (t_raw, p_raw, InteiroMonitorado.maior)
+
+
+# Inicializa o barramento I2C simulado, conecta o BMP280 e cria um driver para cada caminho de compensação, com o
+# BMP280 em modo normal (caso de uso padrão), em que cada leitura do barramento traz as leituras brutas atuais
+i2c0 = upy_i2c_sim.SimI2C(0, freq=400000)
+bmp280_sim = i2c0.attach(upy_i2c_sim.SimBMP280())
+drivers = {}
+for compensacao in (BMP280_COMP_64BIT, BMP280_COMP_32BIT, BMP280_COMP_FLOAT):
+    drivers[compensacao] = BMP280(i2c0, compensation=compensacao)
+piores = {"32 bits (Pa)": 0, "32 bits (C)": 0, "float (Pa)": 0, "float (C)": 0}
+
+# Verifica os dados de teste do driver: 25,08 C e 100653,25 Pa no caminho de 64 bits
+leituras = {}
+for compensacao, bmp280 in drivers.items():
+    bmp280.load_test_calibration()
+    bmp280.load_test_data()
+    leituras[compensacao] = bmp280.read()
+    # Volta a ler o BMP280 simulado, em vez dos dados de teste
+    bmp280._test_data = False
+for nome, compensacao in (("64 bits", BMP280_COMP_64BIT), ("32 bits", BMP280_COMP_32BIT), ("float", BMP280_COMP_FLOAT)):
+    print("Dados de teste, caminho de {}: {:.4f} C, {:.4f} Pa".format(nome, *leituras[compensacao]))
+temp_64, press_64 = leituras[BMP280_COMP_64BIT]
+assert temp_64 == 25.08 and round(press_64, 2) == 100653.25, leituras[BMP280_COMP_64BIT]
+verificar(drivers, leituras[BMP280_COMP_64BIT], 519888, 415148, leituras, piores)
+
+# Varre as leituras brutas do BMP280 simulado, lendo-as pelo barramento com os três caminhos de compensação
+amostras_t = []
+amostras_p = []
+referencias = []
+for t_raw in range(300000, 800001, 5000):
+    for p_raw in range(150000, 750001, 5000):
+        bmp280_sim.t_raw = t_raw
+        bmp280_sim.p_raw = p_raw
+        leituras = {compensacao: bmp280.read() for compensacao, bmp280 in drivers.items()}
+        referencia = leituras[BMP280_COMP_64BIT]
+        if not (-40 <= referencia[0] <= 85 and 30000 <= referencia[1] <= 110000):
+            continue
+        verificar(drivers, referencia, t_raw, p_raw, leituras, piores)
+        amostras_t.append(t_raw)
+        amostras_p.append(p_raw)
+        referencias.append(referencia)
+
+print("Varredura: {} leituras de -40 a 85 C e de 300 a 1100 hPa".format(len(referencias)))
+for nome, pior in piores.items():
+    print("Maior diferença do caminho de {} para o de 64 bits: {:.4f}".format(nome, pior))
+print("Maior valor intermediário do caminho de 32 bits: {} (limite {})".format(
+    InteiroMonitorado.maior, LIMITE_INTEIRO_PEQUENO))
+
+# Compara a compensação vetorizada do NumPy com o caminho de 64 bits, que devem ser iguais
+if bmp280_numpy is None:
+    print("NumPy não instalado, bmp280_numpy não verificado")
+else:
+    temperaturas, pressoes = bmp280_numpy.compensate(drivers[BMP280_COMP_64BIT].calibration, amostras_p, amostras_t)
+    for i, (temp_64, press_64) in enumerate(referencias):
+        assert temperaturas[i] == temp_64 and pressoes[i] == press_64, (amostras_t[i], amostras_p[i])
+    print("bmp280_numpy.compensate igual ao caminho de 64 bits em {} leituras".format(len(referencias)))
+
+print("Todas as tolerâncias foram atendidas")
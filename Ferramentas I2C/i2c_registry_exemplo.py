@@ -0,0 +1,56 @@
+"""!
+@file i2c_registry_exemplo.py
+@brief Programa para identificar os dispositivos do barramento I2C e criar os drivers automaticamente no Raspberry Pi Pico.
+@details Este programa utiliza a biblioteca upy_i2c_registry para identificar os dispositivos ligados ao barramento
+         I2C0 (IMU MPU6050, sensor BMP280, módulo Tiny RTC com o DS1307 e a EEPROM AT24C32N, display OLED SSD1306) e
+         criar os seus drivers sem endereços fixos no código. Na primeira execução o barramento é varrido e a
+         topologia é salva no arquivo i2c_devices.json; nas próximas execuções o arquivo é usado e a varredura é
+         pulada. Os valores de cada sensor encontrado são exibidos no console a cada segundo.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Importa as classes Pin e I2C da biblioteca machine para controlar o hardware do Raspberry Pi Pico
+from machine import Pin, I2C
+# Importa a classe DeviceRegistry da biblioteca upy_i2c_registry.py
+from upy_i2c_registry import DeviceRegistry
+# Importa a biblioteca utime para usar funções relacionadas ao tempo
+import utime
+
+# Define os pinos do Raspberry Pi Pico conectados ao barramento I2C 0
+i2c0_slc_pin = 9
+i2c0_sda_pin = 8
+
+# Inicializa o I2C0 com os pinos GPIO9 (SCL) e GPIO8 (SDA)
+i2c0 = I2C(0, scl=Pin(i2c0_slc_pin), sda=Pin(i2c0_sda_pin), freq=100000)
+
+# Identifica os dispositivos do barramento, usando a topologia salva na flash quando existir
+start_time_ms = utime.ticks_ms()
+registry = DeviceRegistry(i2c0)
+devices = registry.discover()
+print("Descoberta em {} ms ({})".format(utime.ticks_diff(utime.ticks_ms(), start_time_ms),
+                                        "cache" if registry.from_cache else "varredura"))
+for addr in sorted(devices):
+    print("  0x{:02X}: {}".format(addr, devices[addr]))
+
+# Cria os drivers dos sensores encontrados
+mpu6050 = registry.get("mpu6050") if registry.find("mpu6050") else None
+bmp280 = registry.get("bmp280") if registry.find("bmp280") else None
+rtc_ds1307 = registry.get("ds1307") if registry.find("ds1307") else None
+
+# Loop infinito
+while True:
+
+    # Exibe os valores dos sensores encontrados no console
+    if mpu6050 is not None:
+        print("Aceleração X: {:.2f}, Y: {:.2f}, Z: {:.2f} m/s^2".format(*mpu6050.acceleration))
+    if bmp280 is not None:
+        print("Temperatura: {:.2f} C, Pressão: {:.2f} Pa".format(bmp280.temperature, bmp280.pressure))
+    if rtc_ds1307 is not None:
+        current_time_rtc = rtc_ds1307.datetime()
+        print("Data e hora atual do RTC: {:02d}/{:02d}/{:04d} {:02d}:{:02d}:{:02d}".format(
+            current_time_rtc[2], current_time_rtc[1], current_time_rtc[0],
+            current_time_rtc[4], current_time_rtc[5], current_time_rtc[6]))
+
+    # Aguarda 1 segundo antes de ler novamente
+    utime.sleep(1)
@@ -0,0 +1,66 @@
+"""!
+@file i2c_replay_exemplo.py
+@brief Programa para gravar o tráfego I2C dos drivers e reproduzi-lo no computador como teste de regressão.
+@details Este programa utiliza a biblioteca upy_i2c_replay para gravar em um arquivo de trace todas as transações do
+         barramento I2C e os valores retornados pelos drivers MPU6050, BMP280, DS1307 e AT24C32N. Em seguida o trace é
+         reproduzido com os mesmos drivers e o console exibe o número de transações e de bytes da reprodução e da
+         gravação. No Raspberry Pi Pico a gravação é feita com o barramento real (machine.I2C) e o arquivo é copiado
+         para o computador; aqui a gravação usa o barramento simulado da biblioteca upy_i2c_sim.
+         Execução: python3 i2c_replay_exemplo.py
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Importa a biblioteca upy_i2c_sim com o barramento I2C e os dispositivos simulados
+import upy_i2c_sim
+# Importa as classes I2CRecorder e I2CReplayer da biblioteca upy_i2c_replay.py
+from upy_i2c_replay import I2CRecorder, I2CReplayer
+
+# Registra os módulos do MicroPython (machine, utime, ustruct, ...) para executar os drivers no computador
+upy_i2c_sim.install()
+
+# Importa as classes dos drivers (após a instalação dos módulos do MicroPython)
+from upy_adafruit_mpu6050 import MPU6050
+from bmp280 import BMP280
+from ds1307 import DS1307
+from at24c32n import AT24C32N
+
+# Nome do arquivo de trace
+trace_file = "i2c_trace.bin"
+
+# Executa os drivers no barramento indicado, marcando os valores retornados
+def run_drivers(i2c):
+    # O MPU6050 usa o endereço 0x69 (pino AD0 em nível alto), pois o DS1307 usa o endereço 0x68
+    mpu6050 = MPU6050(i2c, i2c_addr=0x69)
+    bmp280 = BMP280(i2c)
+    rtc_ds1307 = DS1307(i2c)
+    eeprom_at24c32n = AT24C32N(i2c)
+
+    for sample in range(3):
+        i2c.mark("acceleration", mpu6050.acceleration)
+        i2c.mark("gyro", mpu6050.gyro)
+        i2c.mark("pressure", bmp280.pressure)
+    i2c.mark("datetime", rtc_ds1307.datetime())
+    eeprom_at24c32n.write(0, b"EEN251")
+    i2c.mark("eeprom", eeprom_at24c32n.read(0, 6))
+
+# Inicializa o barramento I2C simulado e conecta os dispositivos
+i2c0 = upy_i2c_sim.SimI2C(0, freq=100000)
+mpu6050_sim = i2c0.attach(upy_i2c_sim.SimMPU6050(addr=0x69))
+i2c0.attach(upy_i2c_sim.SimBMP280())
+i2c0.attach(upy_i2c_sim.SimDS1307())
+i2c0.attach(upy_i2c_sim.SimAT24C32N())
+
+# Define o estado físico simulado do IMU: 1 g no eixo Z e rotação de 10 graus/s no eixo X
+mpu6050_sim.accel_g = [0.0, 0.0, 1.0]
+mpu6050_sim.gyro_dps = [10.0, 0.0, 0.0]
+
+# Grava o trace
+with open(trace_file, "wb") as trace:
+    run_drivers(I2CRecorder(i2c0, trace, freq=100000))
+
+# Reproduz o trace com os mesmos drivers, exigindo as mesmas transações na mesma ordem
+replayer = I2CReplayer(trace_file)
+run_drivers(replayer)
+replayer.assert_consumed()
+replayer.report()
@@ -0,0 +1,61 @@
+"""!
+@file i2c_tracer_exemplo.py
+@brief Programa para medir a ocupação do barramento I2C pelo IMU MPU6050 e pelo display OLED usando o Raspberry Pi Pico.
+@details Este programa utiliza a biblioteca upy_i2c_tracer para registrar todas as transações do barramento I2C0,
+         compartilhado pelo IMU MPU6050 e pelo display OLED SSD1306 de 128x64. A cada 5 segundos são exibidas no
+         console as estatísticas por dispositivo e por registrador e a ocupação estimada do barramento.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Importa as classes Pin e I2C da biblioteca machine para controlar o hardware do Raspberry Pi Pico
+from machine import Pin, I2C
+# Importa a classe I2CTracer da biblioteca upy_i2c_tracer.py
+from upy_i2c_tracer import I2CTracer
+# Importa a classe MPU6050 da biblioteca upy_adafruit_mpu6050.py
+from upy_adafruit_mpu6050 import MPU6050
+# Importa a classe SSD1306_I2C da biblioteca ssd1306.py
+from ssd1306 import SSD1306_I2C
+# Importa a biblioteca utime para usar funções relacionadas ao tempo
+import utime
+
+# Define os pinos do Raspberry Pi Pico conectados ao barramento I2C 0
+i2c0_slc_pin = 9
+i2c0_sda_pin = 8
+
+# Define a frequência do barramento I2C 0
+i2c0_freq = 100000
+
+# Inicializa o I2C0 com os pinos GPIO9 (SCL) e GPIO8 (SDA)
+i2c0 = I2C(0, scl=Pin(i2c0_slc_pin), sda=Pin(i2c0_sda_pin), freq=i2c0_freq)
+
+# Envolve o I2C0 com o tracer, que é passado para os drivers no lugar do barramento
+i2c0_tracer = I2CTracer(i2c0, freq=i2c0_freq)
+
+# Inicializa o IMU MPU6050 e o display OLED I2C de 128x64
+mpu6050 = MPU6050(i2c0_tracer)
+display = SSD1306_I2C(128, 64, i2c0_tracer)
+
+# Descarta as transações da inicialização
+i2c0_tracer.reset()
+
+# Loop infinito
+while True:
+
+    # Lê a aceleração do IMU e escreve os valores no display
+    (mpu6050_accel_x, mpu6050_accel_y, mpu6050_accel_z) = mpu6050.acceleration
+    display.fill(0)
+    display.text("X: {:.2f}".format(mpu6050_accel_x), 0, 0, 1)
+    display.text("Y: {:.2f}".format(mpu6050_accel_y), 0, 12, 1)
+    display.text("Z: {:.2f}".format(mpu6050_accel_z), 0, 24, 1)
+    display.show()
+
+    # A cada 5 segundos exibe as estatísticas do barramento e reinicia a medição
+    if i2c0_tracer.elapsed_us() >= 5000000:
+        i2c0_tracer.report()
+        print("Ocupação do barramento pelo MPU6050: {:.1f} %".format(100 * i2c0_tracer.utilization(0x68)))
+        print("Ocupação do barramento pelo display: {:.1f} %".format(100 * i2c0_tracer.utilization(0x3C)))
+        i2c0_tracer.reset()
+
+    # Aguarda 10 ms antes de ler novamente
+    utime.sleep_ms(10)
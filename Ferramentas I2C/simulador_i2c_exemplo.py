@@ -0,0 +1,72 @@
+"""!
+@file simulador_i2c_exemplo.py
+@brief Programa para executar os drivers I2C do repositório em um computador, sem hardware.
+@details Este programa utiliza a biblioteca upy_i2c_sim para simular o barramento I2C e os dispositivos MPU6050, BMP280
+         e DS1307. Os drivers upy_adafruit_mpu6050, bmp280 e ds1307 são executados sem modificações com o CPython e o
+         tempo estimado de barramento de cada leitura é exibido no console para os clocks de 100 kHz e 400 kHz.
+         Execução: python3 simulador_i2c_exemplo.py
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Importa a biblioteca upy_i2c_sim com o barramento I2C e os dispositivos simulados
+import upy_i2c_sim
+
+# Registra os módulos do MicroPython (machine, utime, ustruct, ...) para executar os drivers no computador
+upy_i2c_sim.install()
+
+# Importa as classes dos drivers (após a instalação dos módulos do MicroPython)
+from upy_adafruit_mpu6050 import MPU6050
+from bmp280 import BMP280
+from ds1307 import DS1307
+
+# Mede as transações e o tempo de barramento de uma função executada no barramento simulado
+def benchmark(i2c, name, func):
+    i2c.reset_stats()
+    result = func()
+    print("{:<24} {:>3d} transações, {:>4d} bytes, {:>8.1f} us".format(
+        name, i2c.transactions, i2c.bytes_read + i2c.bytes_written, i2c.bus_time_us))
+    return result
+
+# Executa as leituras para cada frequência de clock do barramento I2C
+for freq in (100000, 400000):
+
+    print()
+    print("Barramento I2C a {} kHz".format(freq // 1000))
+
+    # Inicializa o barramento I2C simulado e conecta o MPU6050 e o BMP280
+    i2c0 = upy_i2c_sim.SimI2C(0, freq=freq)
+    mpu6050_sim = i2c0.attach(upy_i2c_sim.SimMPU6050())
+    bmp280_sim = i2c0.attach(upy_i2c_sim.SimBMP280())
+
+    # Define o estado físico simulado do IMU: 1 g no eixo Z e rotação de 10 graus/s no eixo X
+    mpu6050_sim.accel_g = [0.0, 0.0, 1.0]
+    mpu6050_sim.gyro_dps = [10.0, 0.0, 0.0]
+
+    # Inicializa os drivers
+    mpu6050 = benchmark(i2c0, "MPU6050()", lambda: MPU6050(i2c0))
+    bmp280 = benchmark(i2c0, "BMP280()", lambda: BMP280(i2c0))
+
+    # Lê os sensores
+    accel = benchmark(i2c0, "MPU6050.acceleration", lambda: mpu6050.acceleration)
+    gyro = benchmark(i2c0, "MPU6050.gyro", lambda: mpu6050.gyro)
+    temp = benchmark(i2c0, "MPU6050.temperature", lambda: mpu6050.temperature)
+    bmp280_temp = benchmark(i2c0, "BMP280.temperature", lambda: bmp280.temperature)
+    bmp280_press = benchmark(i2c0, "BMP280.pressure", lambda: bmp280.pressure)
+
+    # O DS1307 usa o mesmo endereço 0x68 do MPU6050, então substitui o IMU no barramento
+    i2c0.detach(0x68)
+    i2c0.attach(upy_i2c_sim.SimDS1307())
+    rtc_ds1307 = DS1307(i2c0)
+    rtc_ds1307.halt(False)
+    rtc_ds1307.datetime((2026, 10, 17, 5, 12, 0, 0))
+    current_time_rtc = benchmark(i2c0, "DS1307.datetime()", rtc_ds1307.datetime)
+
+    # Exibe os valores lidos no console
+    print("Aceleração X: {:.2f}, Y: {:.2f}, Z: {:.2f} m/s^2".format(*accel))
+    print("Rotação X: {:.2f}, Y: {:.2f}, Z: {:.2f} rad/s".format(*gyro))
+    print("Temperatura MPU6050: {:.2f} C".format(temp))
+    print("Temperatura BMP280: {:.2f} C, Pressão: {:.2f} Pa".format(bmp280_temp, bmp280_press))
+    print("Data e hora atual do RTC: {:02d}/{:02d}/{:04d} {:02d}:{:02d}:{:02d}".format(
+        current_time_rtc[2], current_time_rtc[1], current_time_rtc[0],
+        current_time_rtc[4], current_time_rtc[5], current_time_rtc[6]))
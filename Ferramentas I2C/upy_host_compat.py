@@ -0,0 +1,163 @@
+"""!
+@file upy_host_compat.py
+@brief Host (CPython) replacements for the MicroPython modules used by the drivers of this repository
+@details This module registers host implementations of the micropython, utime and ustruct modules (and a machine
+         module supplied by the caller) so the drivers of this repository can be imported unmodified on a Linux
+         computer. Modules that can already be imported, like on the MicroPython unix port, are left untouched.
+         It also adds the missing MicroPython functions (sleep_ms, ticks_ms, ...) to the standard time module and
+         puts the driver folders of the repository on sys.path.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+import os
+import struct
+import sys
+import time
+import types
+
+# MicroPython ticks wrap around at 2^30, ticks_diff() and ticks_add() handle the wrap-around
+_TICKS_PERIOD = 1 << 30
+_TICKS_MASK = _TICKS_PERIOD - 1
+_TICKS_HALFPERIOD = _TICKS_PERIOD >> 1
+
+## @brief Current value of the millisecond counter, like utime.ticks_ms().
+#  @return: The counter value, wrapping around at 2^30.
+def ticks_ms():
+
+    return (time.monotonic_ns() // 1000000) & _TICKS_MASK
+
+## @brief Current value of the microsecond counter, like utime.ticks_us().
+#  @return: The counter value, wrapping around at 2^30.
+def ticks_us():
+
+    return (time.monotonic_ns() // 1000) & _TICKS_MASK
+
+## @brief Current value of the high resolution counter, like utime.ticks_cpu().
+#  @return: The counter value (nanoseconds), wrapping around at 2^30.
+def ticks_cpu():
+
+    return time.monotonic_ns() & _TICKS_MASK
+
+## @brief Signed difference between two tick values, like utime.ticks_diff().
+#  @param ticks1: The later tick value.
+#  @param ticks2: The earlier tick value.
+#  @return: ticks1 - ticks2, taking the wrap-around into account.
+def ticks_diff(ticks1, ticks2):
+
+    return ((ticks1 - ticks2 + _TICKS_HALFPERIOD) & _TICKS_MASK) - _TICKS_HALFPERIOD
+
+## @brief Offsets a tick value, like utime.ticks_add().
+#  @param ticks: The tick value.
+#  @param delta: The offset, positive or negative.
+#  @return: The new tick value, wrapping around at 2^30.
+def ticks_add(ticks, delta):
+
+    return (ticks + delta) & _TICKS_MASK
+
+## @brief Sleeps for a number of milliseconds, like utime.sleep_ms().
+#  @param ms: The delay in milliseconds.
+def sleep_ms(ms):
+
+    time.sleep(ms / 1000)
+
+## @brief Sleeps for a number of microseconds, like utime.sleep_us().
+#  @param us: The delay in microseconds.
+def sleep_us(us):
+
+    time.sleep(us / 1000000)
+
+## @brief Decorator used in place of micropython.native and micropython.viper, returns the function unchanged.
+#  @param func: The decorated function.
+#  @return: The same function.
+def _passthrough(func):
+
+    return func
+
+## @brief Builds the host micropython module.
+#  @return: The module.
+def _micropython_module():
+
+    module = types.ModuleType("micropython")
+    module.const = lambda value: value
+    # There are no hard interrupts on the host, so scheduled callbacks run right away
+    module.schedule = lambda func, arg: func(arg)
+    module.native = _passthrough
+    module.viper = _passthrough
+    module.alloc_emergency_exception_buf = lambda size: None
+    module.mem_info = lambda *args: None
+    return module
+
+## @brief Builds the host utime module, on top of the standard time module.
+#  @return: The module.
+def _utime_module():
+
+    module = types.ModuleType("utime")
+    for name in ("sleep", "time", "localtime", "gmtime", "mktime"):
+        setattr(module, name, getattr(time, name))
+    module.sleep_ms = sleep_ms
+    module.sleep_us = sleep_us
+    module.ticks_ms = ticks_ms
+    module.ticks_us = ticks_us
+    module.ticks_cpu = ticks_cpu
+    module.ticks_diff = ticks_diff
+    module.ticks_add = ticks_add
+    return module
+
+## @brief Checks if a module can be imported.
+#  @param name: The module name.
+#  @return: True if the module is already loaded or can be found.
+def _importable(name):
+
+    if name in sys.modules:
+        return True
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+## @brief Registers the host replacements of the MicroPython modules that cannot be imported.
+#  @param machine: Module or object to be registered as the machine module, for example a namespace with the I2C
+#                  class of upy_i2c_sim or upy_i2c_linux. If None, no machine module is registered.
+#  @param driver_paths: If True, the driver folders of the repository are added to sys.path.
+def install(machine=None, driver_paths=True):
+
+    if not _importable("micropython"):
+        sys.modules["micropython"] = _micropython_module()
+    if not _importable("utime"):
+        sys.modules["utime"] = _utime_module()
+    if not _importable("ustruct"):
+        sys.modules["ustruct"] = struct
+
+    # Drivers that import time directly use the MicroPython extensions of the module
+    for name, func in (("sleep_ms", sleep_ms), ("sleep_us", sleep_us), ("ticks_ms", ticks_ms),
+                       ("ticks_us", ticks_us), ("ticks_cpu", ticks_cpu), ("ticks_diff", ticks_diff),
+                       ("ticks_add", ticks_add)):
+        if not hasattr(time, name):
+            setattr(time, name, func)
+
+    if machine is not None:
+        if isinstance(machine, dict):
+            module = types.ModuleType("machine")
+            module.__dict__.update(machine)
+            machine = module
+        sys.modules["machine"] = machine
+
+    if driver_paths:
+        add_driver_paths()
+
+## @brief Adds every folder of the repository that contains Python modules to sys.path.
+#  @return: The list of folders added.
+def add_driver_paths():
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    added = []
+    for name in sorted(os.listdir(root)):
+        folder = os.path.join(root, name)
+        if name.startswith(".") or not os.path.isdir(folder):
+            continue
+        if folder not in sys.path and any(entry.endswith(".py") for entry in os.listdir(folder)):
+            sys.path.append(folder)
+            added.append(folder)
+    return added
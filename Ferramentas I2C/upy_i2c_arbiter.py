@@ -0,0 +1,372 @@
+"""!
+@file upy_i2c_arbiter.py
+@brief MicroPython priority-aware arbiter for an I2C bus shared by several drivers
+@details This library provides the I2CArbiter class, which gives each driver of a shared bus its own client object
+         with the methods of machine.I2C, a priority and a queueing deadline. The uasyncio tasks hold the bus with
+         "async with client:". Inside the block, writes are queued and sent when the block exits, and writes longer
+         than the client chunk size (an SSD1306 frame, for example) are split into bounded transactions. Between two
+         chunks the bus is handed over to any waiting client with a higher priority, or whose deadline would expire
+         before the next chunk ends, so a 1 KB display refresh no longer delays the IMU reads by 100 ms.
+
+             arbiter = I2CArbiter(i2c0, freq=100000)
+             imu_bus = arbiter.client("imu", priority=10, deadline_ms=2)
+             oled_bus = arbiter.client("oled", chunk_size=64)
+             mpu = MPU6050(imu_bus)
+             display = SSD1306_I2C(128, 64, oled_bus)
+
+             async with oled_bus:
+                 display.show()
+
+         Outside an "async with" block the clients forward every transaction to the bus at once, so the drivers can
+         be initialized before the event loop starts. The arbiter keeps queueing-delay statistics per client.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Import utime library to measure the queueing delays
+import utime
+
+# Import uasyncio library to wait for the bus
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+# The bus time model is shared with the tracer
+from upy_i2c_tracer import transfer_time_us
+
+# Kinds of queued writes
+_WRITETO = 0
+_WRITETO_MEM = 1
+_WRITEVTO = 2
+
+## @brief A client of the shared bus, with the methods of machine.I2C.
+#  @details Reads are always sent at once; if the client holds the bus, its queued writes are sent first so the
+#           transactions keep their order. Buffers longer than chunk_size are queued without a copy and must not be
+#           modified until the "async with" block ends.
+class I2CClient:
+
+    ## @brief Constructor for the I2CClient class, use I2CArbiter.client() instead.
+    def __init__(self, arbiter, name: str, priority: int, deadline_ms, chunk_size: int, write_cycle_ms: int):
+
+        self._arbiter = arbiter
+        self._i2c = arbiter._i2c
+        self.name = name
+        self.priority = priority
+        self.deadline_us = None if deadline_ms is None else int(deadline_ms * 1000)
+        self.chunk_size = chunk_size
+        self.write_cycle_ms = write_cycle_ms
+        self._queue = []
+        self._holding = False
+        self._grant = asyncio.Event()
+        self.reset_stats()
+
+    ## @brief Clears the statistics of the client.
+    def reset_stats(self):
+
+        self.grants = 0
+        self.wait_us = 0
+        self.max_wait_us = 0
+        self.deadline_misses = 0
+        self.preemptions = 0
+        self.transactions = 0
+        self.chunks = 0
+        self.bytes = 0
+        self.max_block_us = 0
+
+    ## @brief Forwards any other attribute (scan, init, ...) to the shared bus.
+    def __getattr__(self, name):
+
+        return getattr(self._i2c, name)
+
+    async def __aenter__(self):
+
+        await self._arbiter._acquire(self)
+        self._holding = True
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+
+        try:
+            if exc_type is None:
+                await self.flush()
+            else:
+                self._queue.clear()
+        finally:
+            self._holding = False
+            self._arbiter._release(self)
+
+    ## @brief Queues a write if the client holds the bus, or sends it at once.
+    #  @param kind: _WRITETO, _WRITETO_MEM or _WRITEVTO.
+    #  @param addr: The device address.
+    #  @param prefix: The memory address for _WRITETO_MEM, the first buffer (control byte) for _WRITEVTO.
+    #  @param data: The bytes to write.
+    #  @param addrsize: The memory address size for _WRITETO_MEM.
+    def _write(self, kind, addr, prefix, data, addrsize=8):
+
+        self.transactions += 1
+        self.bytes += len(data)
+        if kind == _WRITETO or len(data) <= self.chunk_size:
+            chunks = ((prefix, bytes(data) if self._holding else data),)
+        else:
+            chunks = self._split(kind, prefix, memoryview(data))
+
+        if self._holding:
+            for chunk_prefix, chunk in chunks:
+                self._queue.append((kind, addr, chunk_prefix, chunk, addrsize))
+            return
+
+        first = True
+        for chunk_prefix, chunk in chunks:
+            if not first and self.write_cycle_ms:
+                utime.sleep_ms(self.write_cycle_ms)
+            self._send(kind, addr, chunk_prefix, chunk, addrsize)
+            first = False
+
+    ## @brief Splits a long write in chunks of at most chunk_size bytes.
+    #  @details Memory writes are split on multiples of chunk_size, so a chunk size equal to the EEPROM page size
+    #           never crosses a page. The first buffer of a writevto (the SSD1306 control byte) is repeated in every
+    #           chunk.
+    #  @return: A list of (prefix, data) tuples.
+    def _split(self, kind, prefix, data):
+
+        chunks = []
+        offset = 0
+        if kind == _WRITETO_MEM:
+            offset = min(len(data), self.chunk_size - prefix % self.chunk_size)
+            chunks.append((prefix, data[:offset]))
+        while offset < len(data):
+            chunk = data[offset:offset + self.chunk_size]
+            chunks.append((prefix + offset if kind == _WRITETO_MEM else prefix, chunk))
+            offset += len(chunk)
+        return chunks
+
+    ## @brief Updates the longest time the client blocked the bus (and the event loop) in one transaction.
+    #  @param start_us: Value of utime.ticks_us() when the transaction started.
+    def _blocked(self, start_us):
+
+        block_us = utime.ticks_diff(utime.ticks_us(), start_us)
+        if block_us > self.max_block_us:
+            self.max_block_us = block_us
+
+    ## @brief Sends one write transaction to the bus.
+    def _send(self, kind, addr, prefix, data, addrsize):
+
+        self.chunks += 1
+        start_us = utime.ticks_us()
+        if kind == _WRITETO_MEM:
+            self._i2c.writeto_mem(addr, prefix, data, addrsize=addrsize)
+        elif kind == _WRITEVTO:
+            self._i2c.writevto(addr, (prefix, data))
+        else:
+            self._i2c.writeto(addr, data)
+        self._blocked(start_us)
+
+    ## @brief Sends the queued writes, yielding the bus between chunks to the clients that must not wait.
+    async def flush(self):
+
+        arbiter = self._arbiter
+        first = True
+        while self._queue:
+            kind, addr, prefix, data, addrsize = self._queue.pop(0)
+            if not first:
+                # Let the other tasks run and ask for the bus
+                await asyncio.sleep(0)
+            first = False
+            if arbiter._must_yield(self, len(data)):
+                self.preemptions += 1
+                arbiter._release(self)
+                await arbiter._acquire(self)
+            self._send(kind, addr, prefix, data, addrsize)
+            if self.write_cycle_ms and kind == _WRITETO_MEM and self._queue:
+                # The bus is free during the EEPROM internal write cycle
+                arbiter._release(self)
+                await asyncio.sleep(self.write_cycle_ms / 1000)
+                await arbiter._acquire(self)
+
+    ## @brief Sends the queued writes without yielding, before a read.
+    def _flush_now(self):
+
+        while self._queue:
+            self._send(*self._queue.pop(0))
+
+    def readfrom_mem(self, addr: int, memaddr: int, nbytes: int, addrsize: int = 8):
+
+        self._flush_now()
+        self.transactions += 1
+        self.bytes += nbytes
+        start_us = utime.ticks_us()
+        data = self._i2c.readfrom_mem(addr, memaddr, nbytes, addrsize=addrsize)
+        self._blocked(start_us)
+        return data
+
+    def readfrom_mem_into(self, addr: int, memaddr: int, buf, addrsize: int = 8):
+
+        self._flush_now()
+        self.transactions += 1
+        self.bytes += len(buf)
+        start_us = utime.ticks_us()
+        self._i2c.readfrom_mem_into(addr, memaddr, buf, addrsize=addrsize)
+        self._blocked(start_us)
+
+    def readfrom(self, addr: int, nbytes: int, stop: bool = True):
+
+        self._flush_now()
+        self.transactions += 1
+        self.bytes += nbytes
+        start_us = utime.ticks_us()
+        data = self._i2c.readfrom(addr, nbytes, stop)
+        self._blocked(start_us)
+        return data
+
+    def readfrom_into(self, addr: int, buf, stop: bool = True):
+
+        self._flush_now()
+        self.transactions += 1
+        self.bytes += len(buf)
+        start_us = utime.ticks_us()
+        self._i2c.readfrom_into(addr, buf, stop)
+        self._blocked(start_us)
+
+    def writeto_mem(self, addr: int, memaddr: int, buf, addrsize: int = 8):
+
+        self._write(_WRITETO_MEM, addr, memaddr, buf, addrsize)
+
+    def writeto(self, addr: int, buf, stop: bool = True) -> int:
+
+        self._write(_WRITETO, addr, None, buf)
+        return len(buf)
+
+    def writevto(self, addr: int, vector, stop: bool = True) -> int:
+
+        if len(vector) == 2:
+            prefix, data = bytes(vector[0]), vector[1]
+        else:
+            prefix, data = b"", b"".join(bytes(buf) for buf in vector)
+        self._write(_WRITEVTO, addr, prefix, data)
+        return len(prefix) + len(data)
+
+## @brief Arbiter of an I2C bus shared by several clients.
+#  @details The waiting clients are granted the bus by priority (highest first), then by deadline (earliest first),
+#           then in arrival order.
+class I2CArbiter:
+
+    ## @brief Constructor for the I2CArbiter class.
+    #  @param i2c: The shared I2C bus.
+    #  @param freq: The bus clock frequency in Hz, used to estimate the chunk times. If None, the freq attribute of
+    #               the bus is used when present, or the standard mode 100 kHz.
+    #  @param chunk_size: Default chunk size of the clients in bytes.
+    def __init__(self, i2c, freq: int = None, chunk_size: int = 64):
+
+        if freq is None:
+            freq = getattr(i2c, "freq", 100000)
+
+        self._i2c = i2c
+        self.freq = freq
+        self.chunk_size = chunk_size
+        self._clients = []
+        self._owner = None
+        self._waiting = []
+        self._sequence = 0
+
+    ## @brief Creates a client of the bus.
+    #  @param name: The client name, used in the statistics.
+    #  @param priority: The client priority, higher values are served first.
+    #  @param deadline_ms: Maximum queueing delay in milliseconds, or None for no deadline.
+    #  @param chunk_size: Maximum bytes per write transaction, or None for the arbiter default.
+    #  @param write_cycle_ms: Time to release the bus after each memory write chunk (5 ms for the AT24C32N).
+    #  @return: The I2CClient, to be passed to the driver in place of the bus.
+    def client(self, name: str, priority: int = 0, deadline_ms: float = None, chunk_size: int = None,
+               write_cycle_ms: int = 0):
+
+        client = I2CClient(self, name, priority, deadline_ms, chunk_size or self.chunk_size, write_cycle_ms)
+        self._clients.append(client)
+        return client
+
+    ## @brief Waits until the client is granted the bus.
+    async def _acquire(self, client):
+
+        start_us = utime.ticks_us()
+        if self._owner is None and not self._waiting:
+            self._owner = client
+        else:
+            client._grant.clear()
+            self._sequence += 1
+            self._waiting.append((client, start_us, self._sequence))
+            while self._owner is not client:
+                await client._grant.wait()
+
+        wait_us = utime.ticks_diff(utime.ticks_us(), start_us)
+        client.grants += 1
+        client.wait_us += wait_us
+        if wait_us > client.max_wait_us:
+            client.max_wait_us = wait_us
+        if client.deadline_us is not None and wait_us > client.deadline_us:
+            client.deadline_misses += 1
+
+    ## @brief Releases the bus and grants it to the next waiting client.
+    def _release(self, client):
+
+        if self._owner is not client:
+            return
+        self._owner = None
+        if self._waiting:
+            entry = min(self._waiting, key=self._rank)
+            self._waiting.remove(entry)
+            self._owner = entry[0]
+            entry[0]._grant.set()
+
+    ## @brief Ordering key of a waiting client.
+    def _rank(self, entry):
+
+        client, start_us, sequence = entry
+        return (-client.priority, self._slack_us(entry), sequence)
+
+    ## @brief Time left before the deadline of a waiting client expires.
+    #  @return: The slack in microseconds, or a large value if the client has no deadline.
+    def _slack_us(self, entry):
+
+        client, start_us, _ = entry
+        if client.deadline_us is None:
+            return 1 << 29
+        return client.deadline_us - utime.ticks_diff(utime.ticks_us(), start_us)
+
+    ## @brief Checks if the owner of the bus must hand it over before sending the next chunk.
+    #  @param client: The owner of the bus.
+    #  @param nbytes: The size of the next chunk.
+    #  @return: True if a waiting client has a higher priority or would miss its deadline.
+    def _must_yield(self, client, nbytes):
+
+        if not self._waiting:
+            return False
+        chunk_us = transfer_time_us(self.freq, nbytes + 3)
+        for entry in self._waiting:
+            if entry[0].priority > client.priority or self._slack_us(entry) < chunk_us:
+                return True
+        return False
+
+    ## @brief Queueing-delay statistics per client.
+    #  @return: A dict mapping the client name to (grants, average wait in us, max wait in us, deadline misses,
+    #           preemptions, transactions, chunks, bytes, longest transaction in us).
+    def stats(self):
+
+        return {client.name: (client.grants, client.wait_us // client.grants if client.grants else 0,
+                              client.max_wait_us, client.deadline_misses, client.preemptions,
+                              client.transactions, client.chunks, client.bytes, client.max_block_us)
+                for client in self._clients}
+
+    ## @brief Clears the statistics of every client.
+    def reset_stats(self):
+
+        for client in self._clients:
+            client.reset_stats()
+
+    ## @brief Prints the queueing-delay statistics per client.
+    def report(self):
+
+        print("{:<10} {:>4} {:>6} {:>8} {:>8} {:>6} {:>6} {:>7} {:>7} {:>7} {:>9}".format(
+            "client", "prio", "grants", "avg us", "max us", "missed", "yield", "trans", "chunks", "bytes", "block us"))
+        stats = self.stats()
+        for client in self._clients:
+            print("{:<10} {:>4d} {:>6d} {:>8d} {:>8d} {:>6d} {:>6d} {:>7d} {:>7d} {:>7d} {:>9d}".format(
+                client.name, client.priority, *stats[client.name]))
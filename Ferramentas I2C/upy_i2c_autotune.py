@@ -0,0 +1,204 @@
+"""!
+@file upy_i2c_autotune.py
+@brief MicroPython I2C clock frequency auto-tuning, with per-device validation and the result saved in flash
+@details This library provides the I2CAutotuner class, which steps the I2C bus clock up from 100 kHz and runs a
+         validation of every device of the bus at each frequency: repeated MPU6050 WHO_AM_I reads, two reads of the
+         BMP280 calibration block that must be identical, SSD1306 command writes that must be acknowledged, DS1307
+         time reads with valid BCD digits and AT24C32N reads of the same bytes. The fastest frequency at which all the
+         devices pass is saved to a JSON file, so the next boots create the bus at that frequency directly:
+
+             def make_i2c(freq):
+                 return I2C(0, scl=Pin(9), sda=Pin(8), freq=freq)
+
+             tuner = I2CAutotuner(make_i2c, {0x68: "mpu6050", 0x76: "bmp280", 0x3C: "ssd1306"})
+             i2c0 = make_i2c(tuner.tune())
+
+         Frequencies above the datasheet limit of a device are not tried unless ignore_spec is True. The DS1307 is
+         a 100 kHz device, so a bus with the Tiny RTC module stays at 100 kHz.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Import json library to save the tuned frequency
+import json
+
+# Version of the cache file format
+_CACHE_VERSION = 1
+
+# Frequencies tried, in Hz
+FREQUENCIES = (100000, 200000, 400000, 1000000)
+
+# Maximum clock frequency of each device in its datasheet, in Hz
+SPEC_MAX_FREQ = {
+    "mpu6050": 400000,
+    "bmp280": 3400000,
+    "ssd1306": 400000,
+    "ds1307": 100000,
+    "at24c32n": 400000,
+}
+
+## @brief Validation of the MPU6050: WHO_AM_I (0x75) reads 0x68 and a burst read of the sensor data.
+def _validate_mpu6050(i2c, addr):
+
+    if i2c.readfrom_mem(addr, 0x75, 1)[0] != 0x68:
+        return False
+    i2c.readfrom_mem(addr, 0x3B, 14)
+    return True
+
+## @brief Validation of the BMP280: chip_id (0xD0) reads 0x58 and two reads of the 24-byte calibration block match.
+def _validate_bmp280(i2c, addr):
+
+    if i2c.readfrom_mem(addr, 0xD0, 1)[0] != 0x58:
+        return False
+    calibration = i2c.readfrom_mem(addr, 0x88, 24)
+    return calibration == i2c.readfrom_mem(addr, 0x88, 24) and calibration[:2] not in (b"\x00\x00", b"\xff\xff")
+
+## @brief Validation of the SSD1306: NOP commands (0xE3) are acknowledged.
+def _validate_ssd1306(i2c, addr):
+
+    i2c.writeto(addr, b"\x80\xe3\x80\xe3")
+    return True
+
+## @brief Validation of the DS1307: the time registers hold valid BCD digits.
+def _validate_ds1307(i2c, addr):
+
+    data = i2c.readfrom_mem(addr, 0x00, 7)
+    for value in data:
+        if (value & 0x0F) > 9:
+            return False
+    return (data[0] & 0x7F) < 0x60 and (data[1] & 0x7F) < 0x60
+
+## @brief Validation of the AT24C32N: two reads of the first 32 bytes match.
+def _validate_at24c32n(i2c, addr):
+
+    return i2c.readfrom_mem(addr, 0, 32, addrsize=16) == i2c.readfrom_mem(addr, 0, 32, addrsize=16)
+
+# Validation of each device type
+VALIDATORS = {
+    "mpu6050": _validate_mpu6050,
+    "bmp280": _validate_bmp280,
+    "ssd1306": _validate_ssd1306,
+    "ds1307": _validate_ds1307,
+    "at24c32n": _validate_at24c32n,
+}
+
+## @brief Finds the fastest reliable clock frequency of an I2C bus.
+class I2CAutotuner:
+
+    ## @brief Constructor for the I2CAutotuner class.
+    #  @param make_i2c: Function that creates the I2C bus at a frequency in Hz, or an I2C bus with an init(freq=)
+    #                   method.
+    #  @param devices: A dict mapping the address to the device name (see DeviceRegistry.devices).
+    #  @param frequencies: The frequencies to try, in Hz, in increasing order.
+    #  @param repeats: The number of times each validation runs at each frequency.
+    #  @param ignore_spec: If True, also tries the frequencies above the datasheet limits.
+    #  @param cache_path: Path of the JSON file with the tuned frequency, or None to disable the cache.
+    def __init__(self, make_i2c, devices, frequencies=FREQUENCIES, repeats: int = 20, ignore_spec: bool = False,
+                 cache_path: str = "i2c_freq.json"):
+
+        self._make_i2c = make_i2c
+        self.devices = devices
+        self.frequencies = frequencies
+        self.repeats = repeats
+        self.ignore_spec = ignore_spec
+        self.cache_path = cache_path
+        ## Highest validated frequency of each device, a dict mapping the address to the frequency in Hz
+        self.device_freq = {}
+        ## Validation results, a list of (frequency, address, passed) tuples
+        self.results = []
+
+    ## @brief Gets the bus at a frequency.
+    def _bus(self, freq):
+
+        if callable(self._make_i2c):
+            return self._make_i2c(freq)
+        self._make_i2c.init(freq=freq)
+        return self._make_i2c
+
+    ## @brief Runs the validation of a device.
+    #  @return: True if all the repetitions pass.
+    def validate(self, i2c, addr: int, name: str) -> bool:
+
+        validator = VALIDATORS.get(name)
+        for _ in range(self.repeats):
+            try:
+                if validator is None:
+                    i2c.readfrom(addr, 1)
+                elif not validator(i2c, addr):
+                    return False
+            except OSError:
+                return False
+        return True
+
+    ## @brief Steps the frequency up while every device passes its validation.
+    #  @return: The fastest frequency at which all the devices pass, in Hz, or None if they fail at the lowest one.
+    def run(self):
+
+        self.results = []
+        self.device_freq = {}
+        best = None
+        for freq in self.frequencies:
+            if not self.ignore_spec and any(freq > SPEC_MAX_FREQ.get(name, freq) for name in self.devices.values()):
+                break
+            i2c = self._bus(freq)
+            passed_all = True
+            for addr, name in self.devices.items():
+                passed = self.validate(i2c, addr, name)
+                self.results.append((freq, addr, passed))
+                if passed:
+                    self.device_freq[addr] = freq
+                else:
+                    passed_all = False
+            if not passed_all:
+                break
+            best = freq
+        return best
+
+    ## @brief Loads the tuned frequency saved for the same devices.
+    #  @return: The frequency in Hz, or None if there is no valid cache.
+    def load(self):
+
+        if self.cache_path is None:
+            return None
+        try:
+            with open(self.cache_path) as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        devices = {int(addr): name for addr, name in cache.get("devices", {}).items()}
+        if cache.get("version") != _CACHE_VERSION or devices != dict(self.devices):
+            return None
+        return cache["freq"]
+
+    ## @brief Saves the tuned frequency to the cache file.
+    def save(self, freq: int):
+
+        if self.cache_path is None:
+            return
+        with open(self.cache_path, "w") as cache_file:
+            json.dump({"version": _CACHE_VERSION, "freq": freq,
+                       "devices": {str(addr): name for addr, name in self.devices.items()}}, cache_file)
+
+    ## @brief Gets the fastest reliable frequency, from the cache when possible.
+    #  @param force: If True, ignores the cache and runs the tuning.
+    #  @details A bus passed in place of make_i2c is left at the returned frequency.
+    #  @return: The frequency in Hz (the lowest frequency if the devices fail at every frequency).
+    def tune(self, force: bool = False) -> int:
+
+        freq = None if force else self.load()
+        if freq is None:
+            freq = self.run()
+            if freq is None:
+                freq = self.frequencies[0]
+            else:
+                self.save(freq)
+        if not callable(self._make_i2c):
+            self._make_i2c.init(freq=freq)
+        return freq
+
+    ## @brief Prints the validation results.
+    def report(self):
+
+        for freq, addr, passed in self.results:
+            print("{:>5} kHz  0x{:02X} {:<10} {}".format(freq // 1000, addr, self.devices[addr],
+                                                       "ok" if passed else "FAIL"))
@@ -0,0 +1,217 @@
+"""!
+@file upy_i2c_linux.py
+@brief machine.I2C replacement for Linux computers, on top of the i2c-dev interface (/dev/i2c-N)
+@details This module provides LinuxI2C, a class with the machine.I2C methods used by the drivers of this repository
+         (readfrom_mem, readfrom_mem_into, writeto_mem, readfrom, readfrom_into, writeto, writevto and scan,
+         including addrsize=16 for the AT24C32N), so they run unmodified with CPython on a Raspberry Pi or any other
+         Linux board. Every method is a single I2C_RDWR ioctl: a register read is one combined write-then-read
+         transaction with a repeated START, as on MicroPython, and costs one kernel call. The message structures are
+         allocated once per bus and reused.
+
+             import upy_i2c_linux
+             upy_i2c_linux.install()
+             from machine import I2C
+             from upy_adafruit_mpu6050 import MPU6050
+
+             mpu = MPU6050(I2C(1))
+
+         The file operations are delegated to a device object (open, ioctl and close), so the adapter can be tested
+         with upy_i2c_sim.SimI2CDev instead of a real /dev/i2c-N.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+import ctypes
+import errno
+import os
+
+import upy_host_compat
+
+# ioctl requests and message flags from linux/i2c-dev.h and linux/i2c.h
+I2C_RDWR = 0x0707
+I2C_M_RD = 0x0001
+
+# errno values returned by the adapters when a device does not acknowledge
+_NACK_ERRNOS = (errno.ENXIO, errno.EREMOTEIO, errno.EIO)
+
+## @brief struct i2c_msg of linux/i2c.h.
+class I2CMsg(ctypes.Structure):
+
+    _fields_ = [("addr", ctypes.c_uint16), ("flags", ctypes.c_uint16), ("len", ctypes.c_uint16),
+                ("buf", ctypes.POINTER(ctypes.c_uint8))]
+
+## @brief struct i2c_rdwr_ioctl_data of linux/i2c-dev.h.
+class I2CRdwrIoctlData(ctypes.Structure):
+
+    _fields_ = [("msgs", ctypes.POINTER(I2CMsg)), ("nmsgs", ctypes.c_uint32)]
+
+## @brief File operations on the real /dev/i2c-N character devices.
+class OSDevice:
+
+    def open(self, path: str) -> int:
+
+        return os.open(path, os.O_RDWR)
+
+    def ioctl(self, fd: int, request: int, arg):
+
+        import fcntl
+        return fcntl.ioctl(fd, request, arg)
+
+    def close(self, fd: int):
+
+        os.close(fd)
+
+## @brief Pointer to the contents of a buffer, without a copy when the buffer is writable.
+#  @details Read buffers must be writable (bytearray, memoryview of a bytearray, array), as on MicroPython, since the
+#           kernel fills them in place. Write buffers that are not writable (bytes) are copied.
+#  @param buf: A bytearray, writable memoryview, bytes or any other buffer.
+#  @param read: True if the kernel writes into the buffer.
+#  @return: A (pointer, keep-alive object) tuple.
+def _pointer(buf, read=False):
+
+    try:
+        array = (ctypes.c_uint8 * len(buf)).from_buffer(buf)
+    except TypeError:
+        if read:
+            raise TypeError("The read buffer must be writable")
+        array = (ctypes.c_uint8 * len(buf)).from_buffer_copy(buf)
+    return ctypes.cast(array, ctypes.POINTER(ctypes.c_uint8)), array
+
+## @brief I2C bus on a Linux i2c-dev device, with the same methods as machine.I2C.
+class LinuxI2C:
+
+    ## @brief Constructor for the LinuxI2C class, with the same signature as machine.I2C.
+    #  @param id: The bus number N of /dev/i2c-N.
+    #  @param scl: The SCL pin, ignored (the pins are set by the device tree).
+    #  @param sda: The SDA pin, ignored.
+    #  @param freq: The bus clock frequency in Hz. It is set by the device tree on Linux and only kept for the tools
+    #               that estimate the bus time (upy_i2c_tracer, upy_i2c_arbiter).
+    #  @param timeout: The clock stretching timeout, ignored.
+    #  @param device: Object with the open, ioctl and close file operations, OSDevice by default.
+    def __init__(self, id=1, scl=None, sda=None, freq: int = 100000, timeout=None, device=None):
+
+        self.id = id
+        self.freq = freq
+        self._device = device if device is not None else OSDevice()
+        self._fd = self._device.open("/dev/i2c-{}".format(id))
+
+        # Message structures reused by every transaction
+        self._msgs = (I2CMsg * 2)()
+        self._rdwr = I2CRdwrIoctlData(ctypes.cast(self._msgs, ctypes.POINTER(I2CMsg)), 0)
+        self._memaddr = (ctypes.c_uint8 * 2)()
+        self._memaddr_ptr = ctypes.cast(self._memaddr, ctypes.POINTER(ctypes.c_uint8))
+
+    ## @brief Changes the bus clock frequency attribute, like machine.I2C.init().
+    def init(self, scl=None, sda=None, freq: int = None, timeout=None):
+
+        if freq is not None:
+            self.freq = freq
+
+    ## @brief Closes the i2c-dev device.
+    def deinit(self):
+
+        if self._fd is not None:
+            self._device.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+
+        self.deinit()
+
+    ## @brief Fills one message of the reusable message array.
+    def _message(self, index, addr, flags, length, pointer):
+
+        msg = self._msgs[index]
+        msg.addr = addr
+        msg.flags = flags
+        msg.len = length
+        msg.buf = pointer
+
+    ## @brief Runs the first nmsgs messages as one combined transaction, with a single I2C_RDWR ioctl.
+    #  @details A NACK raises OSError(EIO), like machine.I2C on MicroPython.
+    def _transfer(self, nmsgs):
+
+        self._rdwr.nmsgs = nmsgs
+        try:
+            self._device.ioctl(self._fd, I2C_RDWR, self._rdwr)
+        except OSError as error:
+            if error.errno in _NACK_ERRNOS:
+                raise OSError(errno.EIO) from None
+            raise
+
+    ## @brief Writes the memory address of a register access to the reusable buffer.
+    #  @return: The number of address bytes.
+    def _set_memaddr(self, memaddr, addrsize):
+
+        nbytes = addrsize // 8
+        for i in range(nbytes):
+            self._memaddr[i] = (memaddr >> (8 * (nbytes - 1 - i))) & 0xFF
+        return nbytes
+
+    def readfrom_mem_into(self, addr: int, memaddr: int, buf, addrsize: int = 8):
+
+        pointer, array = _pointer(buf, True)
+        self._message(0, addr, 0, self._set_memaddr(memaddr, addrsize), self._memaddr_ptr)
+        self._message(1, addr, I2C_M_RD, len(buf), pointer)
+        self._transfer(2)
+
+    def readfrom_mem(self, addr: int, memaddr: int, nbytes: int, addrsize: int = 8) -> bytes:
+
+        buf = bytearray(nbytes)
+        self.readfrom_mem_into(addr, memaddr, buf, addrsize)
+        return bytes(buf)
+
+    def writeto_mem(self, addr: int, memaddr: int, buf, addrsize: int = 8):
+
+        nbytes = addrsize // 8
+        data = bytearray(nbytes + len(buf))
+        data[:nbytes] = memaddr.to_bytes(nbytes, "big")
+        data[nbytes:] = buf
+        self.writeto(addr, data)
+
+    def readfrom_into(self, addr: int, buf, stop: bool = True):
+
+        pointer, array = _pointer(buf, True)
+        self._message(0, addr, I2C_M_RD, len(buf), pointer)
+        self._transfer(1)
+
+    def readfrom(self, addr: int, nbytes: int, stop: bool = True) -> bytes:
+
+        buf = bytearray(nbytes)
+        self.readfrom_into(addr, buf, stop)
+        return bytes(buf)
+
+    def writeto(self, addr: int, buf, stop: bool = True) -> int:
+
+        pointer, array = _pointer(buf)
+        self._message(0, addr, 0, len(buf), pointer)
+        self._transfer(1)
+        return len(buf)
+
+    def writevto(self, addr: int, vector, stop: bool = True) -> int:
+
+        return self.writeto(addr, b"".join(bytes(buf) for buf in vector), stop)
+
+    ## @brief Lists the addresses of the devices that acknowledge a zero-length write, like machine.I2C.scan().
+    #  @return: A sorted list of addresses.
+    def scan(self):
+
+        found = []
+        for addr in range(0x08, 0x78):
+            self._message(0, addr, 0, 0, self._memaddr_ptr)
+            try:
+                self._transfer(1)
+            except OSError:
+                continue
+            found.append(addr)
+        return found
+
+## @brief Registers the host replacements of the MicroPython modules, with LinuxI2C as machine.I2C.
+#  @details Call it before importing the drivers. See upy_host_compat.install().
+def install():
+
+    upy_host_compat.install(machine={"I2C": LinuxI2C})
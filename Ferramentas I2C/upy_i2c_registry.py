@@ -0,0 +1,219 @@
+"""!
+@file upy_i2c_registry.py
+@brief MicroPython I2C device discovery and driver binding registry, with the bus topology cached in flash
+@details This library provides the DeviceRegistry class, which scans an I2C bus once, identifies each device by
+         probing its identification registers (MPU6050 WHO_AM_I 0x75, BMP280 chip_id 0xD0, DS1307 control register)
+         or by its address (AT24C32N EEPROM 0x50 to 0x57, SSD1306 0x3C and 0x3D) and creates the matching driver on
+         demand. The discovered topology is saved to a JSON file in the flash, so on the next boots the registry only
+         checks that the cached devices still acknowledge (one short read per device) instead of scanning and
+         probing the whole bus.
+
+             registry = DeviceRegistry(i2c0)
+             registry.discover()
+             mpu6050 = registry.get("mpu6050")
+             rtc = registry.get("ds1307")
+
+         The MPU6050 and the DS1307 of the Tiny RTC module share the address 0x68, so they are told apart by the
+         WHO_AM_I register instead of by the address.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Import json library to save the discovered topology
+import json
+# Import os library to remove the cache file
+import os
+
+# Version of the cache file format
+_CACHE_VERSION = 1
+
+## @brief Probe of the MPU6050: WHO_AM_I (0x75) reads 0x68 at both addresses 0x68 and 0x69.
+def _probe_mpu6050(i2c, addr):
+
+    return i2c.readfrom_mem(addr, 0x75, 1)[0] == 0x68
+
+## @brief Probe of the BMP280: chip_id (0xD0) reads 0x58.
+def _probe_bmp280(i2c, addr):
+
+    return i2c.readfrom_mem(addr, 0xD0, 1)[0] == 0x58
+
+## @brief Probe of the DS1307: the bits 2, 3, 5 and 6 of the control register (0x07) always read 0.
+def _probe_ds1307(i2c, addr):
+
+    return i2c.readfrom_mem(addr, 0x07, 1)[0] & 0x6C == 0
+
+## @brief Probe of the devices without identification registers, identified by their address.
+def _probe_ack(i2c, addr):
+
+    return True
+
+## @brief Creates the MPU6050 driver.
+def _make_mpu6050(i2c, addr, **kwargs):
+
+    from upy_adafruit_mpu6050 import MPU6050
+    return MPU6050(i2c, i2c_addr=addr, **kwargs)
+
+## @brief Creates the BMP280 driver.
+def _make_bmp280(i2c, addr, **kwargs):
+
+    from bmp280 import BMP280
+    return BMP280(i2c, addr=addr, **kwargs)
+
+## @brief Creates the DS1307 driver.
+def _make_ds1307(i2c, addr, **kwargs):
+
+    from ds1307 import DS1307
+    return DS1307(i2c, addr=addr, **kwargs)
+
+## @brief Creates the AT24C32N driver.
+def _make_at24c32n(i2c, addr, **kwargs):
+
+    from at24c32n import AT24C32N
+    return AT24C32N(i2c, i2c_addr=addr, **kwargs)
+
+## @brief Creates the SSD1306 driver, for a 128x64 display by default.
+def _make_ssd1306(i2c, addr, width=128, height=64, **kwargs):
+
+    from ssd1306 import SSD1306_I2C
+    return SSD1306_I2C(width, height, i2c, addr=addr, **kwargs)
+
+## @brief Registry of the devices of an I2C bus and of their drivers.
+class DeviceRegistry:
+
+    ## @brief Constructor for the DeviceRegistry class.
+    #  @param i2c: The I2C bus.
+    #  @param cache_path: Path of the JSON file with the cached topology, or None to disable the cache.
+    def __init__(self, i2c, cache_path: str = "i2c_devices.json"):
+
+        self._i2c = i2c
+        self.cache_path = cache_path
+        ## Discovered devices, a dict mapping the address to the device name
+        self.devices = {}
+        self._drivers = {}
+        self._instances = {}
+        ## True if the last discover() used the cached topology
+        self.from_cache = False
+
+        # Known devices, probed in this order. The MPU6050 comes before the DS1307 that shares its address.
+        self._known = []
+        self.register("mpu6050", (0x68, 0x69), _probe_mpu6050, _make_mpu6050)
+        self.register("ds1307", (0x68,), _probe_ds1307, _make_ds1307)
+        self.register("bmp280", (0x76, 0x77), _probe_bmp280, _make_bmp280)
+        self.register("at24c32n", tuple(range(0x50, 0x58)), _probe_ack, _make_at24c32n)
+        self.register("ssd1306", (0x3C, 0x3D), _probe_ack, _make_ssd1306)
+
+    ## @brief Adds a device type to the registry.
+    #  @param name: The device name.
+    #  @param addresses: The addresses the device can have.
+    #  @param probe: Function (i2c, addr) returning True if the device at the address is of this type.
+    #  @param factory: Function (i2c, addr, **kwargs) returning the driver of the device.
+    def register(self, name: str, addresses, probe, factory):
+
+        self._known.append((name, addresses, probe))
+        self._drivers[name] = factory
+
+    ## @brief Identifies the device at an address.
+    #  @return: The device name, or None if the device is unknown.
+    def _identify(self, addr):
+
+        for name, addresses, probe in self._known:
+            if addr not in addresses:
+                continue
+            try:
+                if probe(self._i2c, addr):
+                    return name
+            except OSError:
+                pass
+        return None
+
+    ## @brief Scans the bus and probes every device that acknowledges.
+    #  @return: A dict mapping the address to the device name (None for unknown devices).
+    def probe(self):
+
+        return {addr: self._identify(addr) for addr in self._i2c.scan()}
+
+    ## @brief Loads the cached topology.
+    #  @return: A dict mapping the address to the device name, or None if there is no valid cache.
+    def _load_cache(self):
+
+        if self.cache_path is None:
+            return None
+        try:
+            with open(self.cache_path) as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        if cache.get("version") != _CACHE_VERSION:
+            return None
+        return {int(addr): name for addr, name in cache["devices"].items()}
+
+    ## @brief Saves the topology to the cache file.
+    def _save_cache(self):
+
+        if self.cache_path is None:
+            return
+        with open(self.cache_path, "w") as cache_file:
+            json.dump({"version": _CACHE_VERSION,
+                       "devices": {str(addr): name for addr, name in self.devices.items()}}, cache_file)
+
+    ## @brief Checks that every cached device still acknowledges, with a one byte read.
+    #  @return: True if all the devices acknowledge.
+    def _verify(self, devices):
+
+        for addr in devices:
+            try:
+                self._i2c.readfrom(addr, 1)
+            except OSError:
+                return False
+        return True
+
+    ## @brief Discovers the devices of the bus, from the cache when possible.
+    #  @param force: If True, ignores the cache and probes the bus.
+    #  @param verify: If True, checks that the cached devices still acknowledge before using the cache.
+    #  @return: A dict mapping the address to the device name (None for unknown devices).
+    def discover(self, force: bool = False, verify: bool = True):
+
+        devices = None if force else self._load_cache()
+        if devices is not None and (not verify or self._verify(devices)):
+            self.devices = devices
+            self.from_cache = True
+        else:
+            self.devices = self.probe()
+            self.from_cache = False
+            self._save_cache()
+        self._instances = {}
+        return self.devices
+
+    ## @brief Forgets the cached topology, so the next discover() probes the bus.
+    def invalidate(self):
+
+        if self.cache_path is None:
+            return
+        try:
+            os.remove(self.cache_path)
+        except OSError:
+            pass
+
+    ## @brief Addresses of the discovered devices of a type.
+    #  @param name: The device name.
+    #  @return: A sorted list of addresses.
+    def find(self, name: str):
+
+        return sorted(addr for addr, device in self.devices.items() if device == name)
+
+    ## @brief Gets the driver of a discovered device, creating it on the first call.
+    #  @param name: The device name.
+    #  @param index: Which of the devices of this type, by address order.
+    #  @param kwargs: Extra arguments of the driver constructor, used on the first call.
+    #  @return: The driver instance.
+    def get(self, name: str, index: int = 0, **kwargs):
+
+        addresses = self.find(name)
+        if index >= len(addresses):
+            raise RuntimeError("Failed to find {} on the I2C bus".format(name))
+        addr = addresses[index]
+        driver = self._instances.get(addr)
+        if driver is None:
+            driver = self._drivers[name](self._i2c, addr, **kwargs)
+            self._instances[addr] = driver
+        return driver
@@ -0,0 +1,455 @@
+"""!
+@file upy_i2c_replay.py
+@brief MicroPython I2C traffic recorder and host-side replayer for driver regression tests
+@details This library provides the I2CRecorder class, a wrapper around an I2C object that stores every transaction
+         (and the values returned by the drivers, with mark()) in a compact binary trace file, and the I2CReplayer
+         class, a fake I2C bus that plays a trace back to the same driver code on the host. The replay checks that
+         the driver returns the same results and counts the transactions and bytes it issues, so a driver change that
+         silently increases the bus traffic is caught before it ships.
+
+         Trace format (little-endian): a 9-byte header with the magic b"I2CR", the format version and the bus
+         frequency (uint32), followed by records made of a 7-byte header (op, device address, memory address,
+         address size, length) and the payload. The payload holds the bytes read or written, the errno of a failed
+         transaction, or the label and the repr() of the value of a mark.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Import ustruct library to pack and unpack the trace records
+import ustruct
+
+_MAGIC = b"I2CR"
+_VERSION = 1
+_FILE_HEADER = "<4sBI"
+_RECORD_HEADER = "<BBHBH"
+_RECORD_HEADER_SIZE = ustruct.calcsize(_RECORD_HEADER)
+
+# Record types
+OP_READ_MEM = 0x01  # readfrom_mem, readfrom_mem_into
+OP_WRITE_MEM = 0x02  # writeto_mem
+OP_READ = 0x03  # readfrom, readfrom_into
+OP_WRITE = 0x04  # writeto, writevto
+OP_MARK = 0x10  # value returned by a driver, see I2CRecorder.mark()
+OP_ERROR = 0x80  # flag of transactions that raised OSError, the payload is the errno
+
+_OP_NAMES = {OP_READ_MEM: "readfrom_mem", OP_WRITE_MEM: "writeto_mem", OP_READ: "readfrom", OP_WRITE: "writeto"}
+
+## @brief Exception raised when the driver under test does not issue the traffic or return the values of the trace.
+class ReplayMismatch(Exception):
+
+    pass
+
+## @brief A wrapper around an I2C object that records every transaction to a binary trace file.
+#  @details Pass the recorder to the drivers in place of the bus, and call mark() with the values they return so the
+#           replay can check them:
+#
+#               with open("trace.bin", "wb") as trace:
+#                   recorder = I2CRecorder(i2c0, trace, freq=100000)
+#                   mpu = MPU6050(recorder)
+#                   recorder.mark("acceleration", mpu.acceleration)
+class I2CRecorder:
+
+    ## @brief Constructor for the I2CRecorder class. Writes the trace file header.
+    #  @param i2c: The I2C bus to be recorded.
+    #  @param stream: A file (or any object with a write method) opened in binary mode.
+    #  @param freq: The bus clock frequency in Hz, stored in the header.
+    def __init__(self, i2c, stream, freq: int = 100000):
+
+        self._i2c = i2c
+        self._stream = stream
+        self._header = bytearray(_RECORD_HEADER_SIZE)
+        self.transactions = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        stream.write(ustruct.pack(_FILE_HEADER, _MAGIC, _VERSION, freq))
+
+    ## @brief Forwards any other attribute (init, scan, ...) to the recorded bus.
+    def __getattr__(self, name):
+
+        return getattr(self._i2c, name)
+
+    ## @brief Writes one record to the trace.
+    def _write_record(self, op, addr, memaddr, addrsize, payload):
+
+        ustruct.pack_into(_RECORD_HEADER, self._header, 0, op, addr, memaddr, addrsize, len(payload))
+        self._stream.write(self._header)
+        self._stream.write(payload)
+
+    ## @brief Records a transaction that raised OSError, keeping its errno.
+    def _write_error(self, op, addr, memaddr, addrsize, error):
+
+        code = error.args[0] if error.args and isinstance(error.args[0], int) else 0
+        self._write_record(op | OP_ERROR, addr, memaddr, addrsize, bytes([code & 0xFF]))
+        self.transactions += 1
+
+    ## @brief Records a completed transaction.
+    def _record(self, op, addr, memaddr, addrsize, data):
+
+        self._write_record(op, addr, memaddr, addrsize, data)
+        self.transactions += 1
+        if op in (OP_READ_MEM, OP_READ):
+            self.bytes_read += len(data)
+        else:
+            self.bytes_written += len(data)
+
+    def readfrom_mem(self, addr: int, memaddr: int, nbytes: int, addrsize: int = 8):
+
+        try:
+            data = self._i2c.readfrom_mem(addr, memaddr, nbytes, addrsize=addrsize)
+        except OSError as error:
+            self._write_error(OP_READ_MEM, addr, memaddr, addrsize, error)
+            raise
+        self._record(OP_READ_MEM, addr, memaddr, addrsize, data)
+        return data
+
+    def readfrom_mem_into(self, addr: int, memaddr: int, buf, addrsize: int = 8):
+
+        try:
+            self._i2c.readfrom_mem_into(addr, memaddr, buf, addrsize=addrsize)
+        except OSError as error:
+            self._write_error(OP_READ_MEM, addr, memaddr, addrsize, error)
+            raise
+        self._record(OP_READ_MEM, addr, memaddr, addrsize, buf)
+
+    def writeto_mem(self, addr: int, memaddr: int, buf, addrsize: int = 8):
+
+        try:
+            self._i2c.writeto_mem(addr, memaddr, buf, addrsize=addrsize)
+        except OSError as error:
+            self._write_error(OP_WRITE_MEM, addr, memaddr, addrsize, error)
+            raise
+        self._record(OP_WRITE_MEM, addr, memaddr, addrsize, buf)
+
+    def readfrom(self, addr: int, nbytes: int, stop: bool = True):
+
+        try:
+            data = self._i2c.readfrom(addr, nbytes, stop)
+        except OSError as error:
+            self._write_error(OP_READ, addr, 0, 0, error)
+            raise
+        self._record(OP_READ, addr, 0, 0, data)
+        return data
+
+    def readfrom_into(self, addr: int, buf, stop: bool = True):
+
+        try:
+            self._i2c.readfrom_into(addr, buf, stop)
+        except OSError as error:
+            self._write_error(OP_READ, addr, 0, 0, error)
+            raise
+        self._record(OP_READ, addr, 0, 0, buf)
+
+    def writeto(self, addr: int, buf, stop: bool = True):
+
+        try:
+            acks = self._i2c.writeto(addr, buf, stop)
+        except OSError as error:
+            self._write_error(OP_WRITE, addr, 0, 0, error)
+            raise
+        self._record(OP_WRITE, addr, 0, 0, buf)
+        return acks
+
+    def writevto(self, addr: int, vector, stop: bool = True):
+
+        try:
+            acks = self._i2c.writevto(addr, vector, stop)
+        except OSError as error:
+            self._write_error(OP_WRITE, addr, 0, 0, error)
+            raise
+        self._record(OP_WRITE, addr, 0, 0, b"".join(bytes(buf) for buf in vector))
+        return acks
+
+    ## @brief Records a value returned by a driver, to be checked by I2CReplayer.mark() during the replay.
+    #  @param label: A short name for the value, for example "acceleration".
+    #  @param value: The value, stored as its repr().
+    def mark(self, label: str, value=None):
+
+        label = label.encode()
+        self._write_record(OP_MARK, 0, 0, len(label), label + repr(value).encode())
+
+    ## @brief Flushes the trace stream.
+    def flush(self):
+
+        if hasattr(self._stream, "flush"):
+            self._stream.flush()
+
+## @brief Reads all the records of a trace.
+#  @param data: The trace file contents.
+#  @return: A (bus frequency, list of (op, address, memory address, address size, payload) tuples) tuple.
+def read_trace(data):
+
+    magic, version, freq = ustruct.unpack_from(_FILE_HEADER, data, 0)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("Not an I2C trace file")
+
+    records = []
+    offset = ustruct.calcsize(_FILE_HEADER)
+    while offset < len(data):
+        op, addr, memaddr, addrsize, length = ustruct.unpack_from(_RECORD_HEADER, data, offset)
+        offset += _RECORD_HEADER_SIZE
+        records.append((op, addr, memaddr, addrsize, bytes(data[offset:offset + length])))
+        offset += length
+    return freq, records
+
+## @brief Checks if a value returned by the driver under test matches the repr() recorded in a trace.
+#  @details Floats are compared with a relative tolerance because the device may use single precision floats.
+def _values_match(recorded, value, rel_tol):
+
+    if isinstance(recorded, (tuple, list)) and isinstance(value, (tuple, list)):
+        return len(recorded) == len(value) and all(_values_match(a, b, rel_tol) for a, b in zip(recorded, value))
+    if isinstance(recorded, float) or isinstance(value, float):
+        try:
+            return abs(recorded - value) <= rel_tol * max(abs(recorded), abs(value), 1e-12)
+        except TypeError:
+            return False
+    return recorded == value
+
+## @brief A fake I2C bus that plays a recorded trace back to the driver under test (host only).
+#  @details In strict mode every transaction issued by the driver must match the next transaction of the trace:
+#           same operation, device, register, address size, length and, for writes, the same bytes. Reads return the
+#           recorded bytes and failed transactions raise the recorded OSError.
+#
+#           In non-strict mode the trace is split into segments by its marks, and reads are served from an image of
+#           the device registers seen in the current segment (falling back to the values seen before it). The driver
+#           may then read the registers in a different way, with more or fewer transactions, and the replay still
+#           checks its results and counts its traffic. mark() moves on to the next segment.
+class I2CReplayer:
+
+    ## @brief Constructor for the I2CReplayer class.
+    #  @param trace: The trace file path, or its contents as bytes.
+    #  @param strict: Replay mode, see the class description.
+    #  @param rel_tol: Relative tolerance used to compare the float values of the marks.
+    def __init__(self, trace, strict: bool = True, rel_tol: float = 1e-5):
+
+        if isinstance(trace, str):
+            with open(trace, "rb") as stream:
+                trace = stream.read()
+
+        self.freq, self._records = read_trace(trace)
+        self.strict = strict
+        self.rel_tol = rel_tol
+        self._cursor = 0
+        self.transactions = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.mismatches = []
+
+        # Traffic of the trace, for comparison
+        self.recorded_transactions = 0
+        self.recorded_bytes_read = 0
+        self.recorded_bytes_written = 0
+        for op, _, _, _, payload in self._records:
+            if op == OP_MARK:
+                continue
+            self.recorded_transactions += 1
+            if op in (OP_READ_MEM, OP_READ):
+                self.recorded_bytes_read += len(payload)
+            elif op in (OP_WRITE_MEM, OP_WRITE):
+                self.recorded_bytes_written += len(payload)
+
+        self._image = {}
+        self._segment = {}
+        if not strict:
+            self._load_segment()
+
+    ## @brief Describes a transaction, for the error messages.
+    @staticmethod
+    def _describe(op, addr, memaddr, addrsize, length):
+
+        name = _OP_NAMES.get(op & ~OP_ERROR, "mark")
+        if op & ~OP_ERROR in (OP_READ_MEM, OP_WRITE_MEM):
+            return "{}(0x{:02X}, 0x{:02X}, {} bytes, addrsize={})".format(name, addr, memaddr, length, addrsize)
+        return "{}(0x{:02X}, {} bytes)".format(name, addr, length)
+
+    ## @brief Builds the register image of the segment that starts at the cursor (non-strict mode).
+    def _load_segment(self):
+
+        self._segment = {}
+        for op, addr, memaddr, addrsize, payload in self._records[self._cursor:]:
+            if op == OP_MARK:
+                break
+            if op in (OP_READ_MEM, OP_WRITE_MEM):
+                registers = self._segment.setdefault(addr, {})
+                for i in range(len(payload)):
+                    registers.setdefault(memaddr + i, payload[i])
+
+    ## @brief Moves the cursor past the next mark, or to the end of the trace (non-strict mode).
+    def _next_segment(self):
+
+        for op, addr, memaddr, addrsize, payload in self._records[self._cursor:]:
+            self._cursor += 1
+            if op in (OP_READ_MEM, OP_WRITE_MEM):
+                registers = self._image.setdefault(addr, {})
+                for i in range(len(payload)):
+                    registers[memaddr + i] = payload[i]
+            elif op == OP_MARK:
+                break
+        self._load_segment()
+
+    ## @brief Consumes the next transaction of the trace and checks it against the one issued (strict mode).
+    #  @return: The payload of the recorded transaction.
+    def _expect(self, op, addr, memaddr, addrsize, length, data=None):
+
+        issued = self._describe(op, addr, memaddr, addrsize, length)
+        if self._cursor >= len(self._records):
+            raise ReplayMismatch("Extra transaction after the end of the trace: " + issued)
+
+        rec_op, rec_addr, rec_memaddr, rec_addrsize, payload = self._records[self._cursor]
+        if rec_op == OP_MARK:
+            raise ReplayMismatch("Transaction {} issued where the trace has the mark {!r}".format(
+                issued, payload[:rec_addrsize].decode()))
+        # The payload of a failed transaction is its errno, not its data
+        rec_length = length if rec_op & OP_ERROR else len(payload)
+        if ((rec_op & ~OP_ERROR), rec_addr, rec_memaddr, rec_addrsize, rec_length) != (op, addr, memaddr, addrsize, length):
+            raise ReplayMismatch("Transaction {} issued where the trace has {}".format(
+                issued, self._describe(rec_op, rec_addr, rec_memaddr, rec_addrsize, rec_length)))
+        if data is not None and not rec_op & OP_ERROR and bytes(data) != payload:
+            raise ReplayMismatch("Transaction {} wrote {} where the trace has {}".format(issued, bytes(data), payload))
+
+        self._cursor += 1
+        if rec_op & OP_ERROR:
+            raise OSError(payload[0])
+        return payload
+
+    ## @brief Serves a register read from the segment image (non-strict mode).
+    def _lookup(self, addr, memaddr, nbytes):
+
+        segment = self._segment.get(addr, {})
+        image = self._image.get(addr, {})
+        data = bytearray(nbytes)
+        for i in range(nbytes):
+            value = segment.get(memaddr + i, image.get(memaddr + i))
+            if value is None:
+                raise ReplayMismatch("Register 0x{:02X} of device 0x{:02X} is not in the trace".format(memaddr + i, addr))
+            data[i] = value
+        return bytes(data)
+
+    ## @brief Stores a register write in the segment image (non-strict mode).
+    def _store(self, addr, memaddr, data):
+
+        registers = self._segment.setdefault(addr, {})
+        for i in range(len(data)):
+            registers[memaddr + i] = data[i]
+
+    def readfrom_mem(self, addr: int, memaddr: int, nbytes: int, addrsize: int = 8) -> bytes:
+
+        if self.strict:
+            data = self._expect(OP_READ_MEM, addr, memaddr, addrsize, nbytes)
+        else:
+            data = self._lookup(addr, memaddr, nbytes)
+        self.transactions += 1
+        self.bytes_read += nbytes
+        return data
+
+    def readfrom_mem_into(self, addr: int, memaddr: int, buf, addrsize: int = 8):
+
+        buf[:] = self.readfrom_mem(addr, memaddr, len(buf), addrsize)
+
+    def writeto_mem(self, addr: int, memaddr: int, buf, addrsize: int = 8):
+
+        if self.strict:
+            self._expect(OP_WRITE_MEM, addr, memaddr, addrsize, len(buf), buf)
+        else:
+            self._store(addr, memaddr, buf)
+        self.transactions += 1
+        self.bytes_written += len(buf)
+
+    def readfrom(self, addr: int, nbytes: int, stop: bool = True) -> bytes:
+
+        if not self.strict:
+            raise ReplayMismatch("readfrom() can only be replayed in strict mode")
+        data = self._expect(OP_READ, addr, 0, 0, nbytes)
+        self.transactions += 1
+        self.bytes_read += nbytes
+        return data
+
+    def readfrom_into(self, addr: int, buf, stop: bool = True):
+
+        buf[:] = self.readfrom(addr, len(buf), stop)
+
+    def writeto(self, addr: int, buf, stop: bool = True) -> int:
+
+        if self.strict:
+            self._expect(OP_WRITE, addr, 0, 0, len(buf), buf)
+        self.transactions += 1
+        self.bytes_written += len(buf)
+        return len(buf)
+
+    def writevto(self, addr: int, vector, stop: bool = True) -> int:
+
+        return self.writeto(addr, b"".join(bytes(buf) for buf in vector), stop)
+
+    ## @brief Checks a value returned by the driver under test against the next mark of the trace.
+    #  @details Mismatches are appended to the mismatches list and, if raise_on_mismatch is True, raised.
+    #  @param label: The label used when recording.
+    #  @param value: The value returned by the driver under test.
+    #  @param raise_on_mismatch: If True, a mismatch raises ReplayMismatch.
+    #  @return: True if the value matches the recorded one.
+    def mark(self, label: str, value=None, raise_on_mismatch: bool = True) -> bool:
+
+        import ast
+
+        if self.strict:
+            if self._cursor >= len(self._records) or self._records[self._cursor][0] != OP_MARK:
+                message = "Mark {!r} reached before the end of the recorded transactions".format(label)
+                self.mismatches.append(message)
+                raise ReplayMismatch(message)
+            record = self._records[self._cursor]
+            self._cursor += 1
+        else:
+            record = None
+            for index in range(self._cursor, len(self._records)):
+                if self._records[index][0] == OP_MARK:
+                    record = self._records[index]
+                    break
+            self._next_segment()
+            if record is None:
+                message = "Mark {!r} reached after the end of the trace".format(label)
+                self.mismatches.append(message)
+                raise ReplayMismatch(message)
+
+        _, _, _, label_size, payload = record
+        recorded_label = payload[:label_size].decode()
+        recorded_repr = payload[label_size:].decode()
+        try:
+            recorded = ast.literal_eval(recorded_repr)
+            match = _values_match(recorded, value, self.rel_tol)
+        except (ValueError, SyntaxError):
+            match = recorded_repr == repr(value)
+
+        if recorded_label != label or not match:
+            message = "Mark {!r} = {!r} where the trace has {!r} = {}".format(label, value, recorded_label, recorded_repr)
+            self.mismatches.append(message)
+            if raise_on_mismatch:
+                raise ReplayMismatch(message)
+            return False
+        return True
+
+    ## @brief Checks that the driver under test issued every transaction of the trace (strict mode).
+    def assert_consumed(self):
+
+        remaining = [record for record in self._records[self._cursor:] if record[0] != OP_MARK or self.strict]
+        if remaining:
+            op, addr, memaddr, addrsize, payload = remaining[0]
+            raise ReplayMismatch("{} recorded records were not replayed, next: {}".format(
+                len(remaining), self._describe(op, addr, memaddr, addrsize, len(payload))))
+
+    ## @brief Compares the traffic of the driver under test with the traffic of the trace.
+    #  @return: A dict with the issued and recorded transactions, bytes read and bytes written.
+    def compare(self):
+
+        return {
+            "transactions": (self.transactions, self.recorded_transactions),
+            "bytes_read": (self.bytes_read, self.recorded_bytes_read),
+            "bytes_written": (self.bytes_written, self.recorded_bytes_written),
+        }
+
+    ## @brief Prints the traffic comparison and the mismatches found.
+    def report(self):
+
+        print("I2C replay ({} mode, {} kHz trace)".format("strict" if self.strict else "non-strict", self.freq // 1000))
+        print("{:<14} {:>10} {:>10}".format("", "replayed", "recorded"))
+        for name, (issued, recorded) in self.compare().items():
+            print("{:<14} {:>10d} {:>10d}".format(name, issued, recorded))
+        for message in self.mismatches:
+            print("Mismatch: " + message)
@@ -0,0 +1,897 @@
+"""!
+@file upy_i2c_sim.py
+@brief Host-side simulated I2C bus and register-level models of the I2C devices used in this repository
+@details This module provides SimI2C, a replacement for machine.I2C that implements readfrom_mem, readfrom_mem_into,
+         writeto_mem, readfrom, readfrom_into, writeto, writevto and scan against register-accurate models of the
+         MPU6050, BMP280, DS1307, AT24C32N and SSD1306. It also models the time each transaction takes on the bus at
+         the configured clock frequency (100 kHz, 400 kHz, ...), so the drivers of this repository can be run and
+         benchmarked on a Linux computer without any hardware:
+
+             import upy_i2c_sim
+             upy_i2c_sim.install()
+             from upy_adafruit_mpu6050 import MPU6050
+
+             i2c = upy_i2c_sim.SimI2C(freq=100000)
+             i2c.attach(upy_i2c_sim.SimMPU6050())
+             mpu = MPU6050(i2c)
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+import calendar
+import errno
+import struct
+import time
+
+import upy_host_compat
+
+upy_host_compat.install(driver_paths=False)
+
+# The bus time model is shared with the tracer, which also runs on MicroPython
+from upy_i2c_tracer import transfer_time_us
+
+## @brief Encodes a decimal value from 0 to 99 as binary coded decimal (BCD).
+def _dec2bcd(value):
+
+    return (value // 10) << 4 | (value % 10)
+
+## @brief Decodes a binary coded decimal (BCD) value.
+def _bcd2dec(value):
+
+    return ((value >> 4) * 10) + (value & 0x0F)
+
+## @brief Base class for the register-level models of I2C devices.
+#  @details The model has a register file and an auto-incrementing register pointer. A write transaction sets the
+#           pointer with its first addrsize/8 bytes and writes the remaining bytes to consecutive registers, and a
+#           read transaction reads consecutive registers from the pointer. Subclasses customize the behavior by
+#           overriding the begin(), read_register(), write_register() and next_register() hooks.
+class SimDevice:
+
+    ## @brief Constructor for the SimDevice class.
+    #  @param addr: The I2C address of the device.
+    #  @param size: The number of registers (or memory bytes) of the device.
+    #  @param addrsize: The register address size in bits, 8 or 16.
+    #  @param clock: Function returning the current time in seconds, time.monotonic by default.
+    def __init__(self, addr: int, size: int = 256, addrsize: int = 8, clock=None):
+
+        self.addr = addr
+        self.addrsize = addrsize
+        self.regs = bytearray(size)
+        self.pointer = 0
+        self.clock = clock if clock is not None else time.monotonic
+        ## Highest bus clock frequency in Hz at which the device still answers, or None for no limit. Above it the
+        #  device does not acknowledge, which models a device (or a long cable) that cannot keep up with the clock.
+        self.max_freq = None
+
+    ## @brief Hook that tells if the device acknowledges its address. A device that does not is seen as a NACK.
+    #  @return: True if the device acknowledges.
+    def acknowledge(self) -> bool:
+
+        return True
+
+    ## @brief Hook called at the start of every read or write transaction, used to update time-dependent state.
+    def begin(self):
+
+        pass
+
+    ## @brief Hook that returns the value of a register read by the master.
+    #  @param reg: The register address.
+    #  @return: The register value.
+    def read_register(self, reg: int) -> int:
+
+        return self.regs[reg]
+
+    ## @brief Hook that stores a register value written by the master.
+    #  @param reg: The register address.
+    #  @param value: The register value.
+    def write_register(self, reg: int, value: int):
+
+        self.regs[reg] = value
+
+    ## @brief Hook that returns the register accessed after another one in a burst transfer.
+    #  @param reg: The current register address.
+    #  @return: The next register address.
+    def next_register(self, reg: int) -> int:
+
+        return (reg + 1) % len(self.regs)
+
+    ## @brief Handles a write transaction, the bytes sent by the master after the device address.
+    #  @param data: The bytes written.
+    def write(self, data):
+
+        self.begin()
+        nbytes = self.addrsize // 8
+        if len(data) >= nbytes:
+            pointer = 0
+            for i in range(nbytes):
+                pointer = (pointer << 8) | data[i]
+            self.pointer = pointer % len(self.regs)
+            data = data[nbytes:]
+        for value in data:
+            self.write_register(self.pointer, value)
+            self.pointer = self.next_register(self.pointer)
+
+    ## @brief Handles a read transaction, returning the bytes sent to the master.
+    #  @param nbytes: The number of bytes read.
+    #  @return: The bytes read.
+    def read(self, nbytes: int) -> bytes:
+
+        self.begin()
+        data = bytearray(nbytes)
+        for i in range(nbytes):
+            data[i] = self.read_register(self.pointer)
+            self.pointer = self.next_register(self.pointer)
+        return bytes(data)
+
+## @brief Simulated I2C bus with the same methods as machine.I2C.
+#  @details Each transaction is routed to the device model attached at its address, or raises OSError(EIO) like a
+#           NACK on the real bus. The bus keeps statistics of the transactions, bytes and estimated bus time, and
+#           optionally sleeps for the estimated time so the simulation runs at the speed of the real bus.
+class SimI2C:
+
+    ## @brief Constructor for the SimI2C class, with the same signature as machine.I2C.
+    #  @param id: The bus identifier, ignored.
+    #  @param scl: The SCL pin, ignored.
+    #  @param sda: The SDA pin, ignored.
+    #  @param freq: The bus clock frequency in Hz, used to estimate the transaction times.
+    #  @param timeout: The clock stretching timeout in microseconds, ignored.
+    #  @param realtime: If True, every transaction sleeps for its estimated bus time.
+    def __init__(self, id=0, scl=None, sda=None, freq: int = 400000, timeout=None, realtime: bool = False):
+
+        self.freq = freq
+        self.realtime = realtime
+        self._devices = {}
+        self.reset_stats()
+
+    ## @brief Changes the bus clock frequency, like machine.I2C.init().
+    #  @param scl: The SCL pin, ignored.
+    #  @param sda: The SDA pin, ignored.
+    #  @param freq: The new bus clock frequency in Hz.
+    def init(self, scl=None, sda=None, freq: int = None, timeout=None):
+
+        if freq is not None:
+            self.freq = freq
+
+    ## @brief Attaches a device model to the bus at its address.
+    #  @param device: The SimDevice to attach.
+    #  @return: The device, for convenience.
+    def attach(self, device):
+
+        self._devices[device.addr] = device
+        return device
+
+    ## @brief Removes the device model attached at an address.
+    #  @param addr: The I2C address.
+    def detach(self, addr: int):
+
+        self._devices.pop(addr, None)
+
+    ## @brief Gets the device model attached at an address.
+    #  @param addr: The I2C address.
+    #  @return: The SimDevice, or None if there is no device at the address.
+    def device(self, addr: int):
+
+        return self._devices.get(addr)
+
+    ## @brief Clears the transaction statistics of the bus.
+    def reset_stats(self):
+
+        self.transactions = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.bus_time_us = 0.0
+
+    ## @brief Accounts a transaction in the statistics and, in real time mode, waits for its bus time.
+    #  @param nbytes_out: Bytes sent by the master, including the address bytes.
+    #  @param nbytes_in: Bytes sent by the device.
+    #  @param restarts: The number of repeated START conditions.
+    def _account(self, nbytes_out: int, nbytes_in: int, restarts: int = 0):
+
+        duration_us = transfer_time_us(self.freq, nbytes_out + nbytes_in, restarts)
+        self.transactions += 1
+        self.bytes_written += nbytes_out
+        self.bytes_read += nbytes_in
+        self.bus_time_us += duration_us
+        if self.realtime:
+            time.sleep(duration_us / 1000000)
+
+    ## @brief Gets the device that acknowledges an address, raising OSError(EIO) on a NACK.
+    #  @param addr: The I2C address.
+    #  @return: The SimDevice.
+    def _target(self, addr: int):
+
+        device = self._devices.get(addr)
+        too_fast = device is not None and device.max_freq is not None and self.freq > device.max_freq
+        if device is None or too_fast or not device.acknowledge():
+            # The address byte is still clocked out before the NACK
+            self._account(1, 0)
+            raise OSError(errno.EIO)
+        return device
+
+    ## @brief Lists the addresses of the devices that acknowledge, like machine.I2C.scan().
+    #  @return: A sorted list of addresses.
+    def scan(self):
+
+        for _ in range(0x08, 0x78):
+            self._account(1, 0)
+        return sorted(addr for addr, device in self._devices.items()
+                      if 0x08 <= addr < 0x78 and device.acknowledge())
+
+    def readfrom_mem(self, addr: int, memaddr: int, nbytes: int, addrsize: int = 8) -> bytes:
+
+        device = self._target(addr)
+        device.write(memaddr.to_bytes(addrsize // 8, "big"))
+        data = device.read(nbytes)
+        self._account(2 + addrsize // 8, nbytes, 1)
+        return data
+
+    def readfrom_mem_into(self, addr: int, memaddr: int, buf, addrsize: int = 8):
+
+        buf[:] = self.readfrom_mem(addr, memaddr, len(buf), addrsize)
+
+    def writeto_mem(self, addr: int, memaddr: int, buf, addrsize: int = 8):
+
+        device = self._target(addr)
+        device.write(memaddr.to_bytes(addrsize // 8, "big") + bytes(buf))
+        self._account(1 + addrsize // 8 + len(buf), 0)
+
+    def readfrom(self, addr: int, nbytes: int, stop: bool = True) -> bytes:
+
+        device = self._target(addr)
+        data = device.read(nbytes)
+        self._account(1, nbytes)
+        return data
+
+    def readfrom_into(self, addr: int, buf, stop: bool = True):
+
+        buf[:] = self.readfrom(addr, len(buf), stop)
+
+    def writeto(self, addr: int, buf, stop: bool = True) -> int:
+
+        device = self._target(addr)
+        device.write(bytes(buf))
+        self._account(1 + len(buf), 0)
+        return len(buf)
+
+    def writevto(self, addr: int, vector, stop: bool = True) -> int:
+
+        data = b"".join(bytes(buf) for buf in vector)
+        return self.writeto(addr, data, stop)
+
+# MPU6050 registers used by the model
+_MPU6050_SMPLRT_DIV = 0x19
+_MPU6050_CONFIG = 0x1A
+_MPU6050_GYRO_CONFIG = 0x1B
+_MPU6050_ACCEL_CONFIG = 0x1C
+_MPU6050_MOT_THR = 0x1F
+_MPU6050_FIFO_EN = 0x23
+_MPU6050_INT_ENABLE = 0x38
+_MPU6050_INT_STATUS = 0x3A
+_MPU6050_ACCEL_OUT = 0x3B
+_MPU6050_TEMP_OUT = 0x41
+_MPU6050_GYRO_OUT = 0x43
+_MPU6050_SIG_PATH_RESET = 0x68
+_MPU6050_USER_CTRL = 0x6A
+_MPU6050_PWR_MGMT_1 = 0x6B
+_MPU6050_PWR_MGMT_2 = 0x6C
+_MPU6050_FIFO_COUNT = 0x72
+_MPU6050_FIFO_R_W = 0x74
+_MPU6050_WHO_AM_I = 0x75
+
+# Size of the MPU6050 FIFO in bytes
+_MPU6050_FIFO_SIZE = 1024
+
+# FIFO_EN bits and the slice of the 14 data register bytes each one loads into the FIFO, in FIFO order
+_MPU6050_FIFO_FIELDS = ((0x08, 0, 6), (0x80, 6, 8), (0x40, 8, 10), (0x20, 10, 12), (0x10, 12, 14))
+
+# Gyroscope sensitivity in LSB/(deg/s) for each GyroRange
+_MPU6050_GYRO_LSB = (131.0, 65.5, 32.8, 16.4)
+
+# Accelerometer rate in cycle mode for each LP_WAKE_CTRL value, in Hz
+_MPU6050_CYCLE_RATES = (1.25, 5.0, 20.0, 40.0)
+
+## @brief Register-level model of the MPU6050 accelerometer and gyroscope.
+#  @details Models WHO_AM_I, the self-clearing device reset bit of PWR_MGMT_1 (set for reset_time seconds), the
+#           self-clearing SIGNAL_PATH_RESET and USER_CTRL reset bits, the sleep bit, the sample clock given by
+#           SMPLRT_DIV, the DLPF setting and the error of the internal oscillator, restarted by a signal path
+#           reset, the DATA_RDY flag of INT_STATUS (cleared on read) and the data
+#           registers, which are refreshed on every sample from the accel_g, gyro_dps and temperature attributes
+#           (or from the signal function) using the configured full scale ranges. The 1024-byte FIFO is loaded
+#           with the measurements selected by FIFO_EN while USER_CTRL.FIFO_EN is set, FIFO_COUNT and FIFO_R_W
+#           drain it, USER_CTRL.FIFO_RESET empties it and an overflow drops the oldest bytes and sets the
+#           FIFO_OFLOW flag of INT_STATUS, like the real device. In cycle mode the samples are taken at the
+#           LP_WAKE_CTRL rate, and with MOT_EN set in INT_ENABLE an acceleration change of more than MOT_THR
+#           (2 mg per count) between two samples sets the MOT_INT flag. With DATA_RDY_EN or MOT_EN set, tick()
+#           pulses the SimPin in int_pin once per new sample or motion event.
+class SimMPU6050(SimDevice):
+
+    ## @brief Constructor for the SimMPU6050 class.
+    #  @param addr: The I2C address, 0x68 or 0x69.
+    #  @param reset_time: Time in seconds the device reset bit stays set after a reset.
+    #  @param clock: Function returning the current time in seconds, time.monotonic by default.
+    #  @param clock_error: Relative error of the internal oscillator, e.g. 0.01 for a sample clock 1 % fast.
+    def __init__(self, addr: int = 0x68, reset_time: float = 0.002, clock=None, clock_error: float = 0.0):
+
+        super().__init__(addr, 128, 8, clock)
+        self.reset_time = reset_time
+        self.clock_error = clock_error
+        ## Acceleration in g for the X, Y and Z axes
+        self.accel_g = [0.0, 0.0, 1.0]
+        ## Angular rate in deg/s for the X, Y and Z axes
+        self.gyro_dps = [0.0, 0.0, 0.0]
+        ## Die temperature in Celsius
+        self.temperature = 25.0
+        ## Optional function of the sample time in seconds returning (ax, ay, az, gx, gy, gz) in g and deg/s
+        self.signal = None
+        ## Number of samples taken since power on
+        self.samples = 0
+        ## SimPin connected to the INT pin, pulsed by tick()
+        self.int_pin = None
+        self._int_pulses = 0
+        self._power_on()
+
+    ## @brief Restores the power-on register values.
+    def _power_on(self):
+
+        self.regs[:] = bytes(len(self.regs))
+        self.regs[_MPU6050_PWR_MGMT_1] = 0x40
+        self.regs[_MPU6050_WHO_AM_I] = 0x68
+        ## Contents of the FIFO, oldest byte first
+        self.fifo = bytearray()
+        self._reset_until = 0.0
+        self._sample_time = self.clock()
+        self._motion_ref = None
+
+    ## @brief Sample rate derived from SMPLRT_DIV and the DLPF setting.
+    #  @return: The sample rate in Hz.
+    def sample_rate(self) -> float:
+
+        if self.regs[_MPU6050_PWR_MGMT_1] & 0x20:  # CYCLE
+            rate = _MPU6050_CYCLE_RATES[self.regs[_MPU6050_PWR_MGMT_2] >> 6]
+        else:
+            dlpf_cfg = self.regs[_MPU6050_CONFIG] & 0x07
+            gyro_rate = 8000.0 if dlpf_cfg in (0, 7) else 1000.0
+            rate = gyro_rate / (1 + self.regs[_MPU6050_SMPLRT_DIV])
+        return rate * (1 + self.clock_error)
+
+    ## @brief Checks if the sensors are sleeping (sleep bit set or device still in reset).
+    #  @return: True if no samples are being taken.
+    def sleeping(self) -> bool:
+
+        return bool(self.regs[_MPU6050_PWR_MGMT_1] & 0x40) or self.clock() < self._reset_until
+
+    def begin(self):
+
+        now = self.clock()
+        if self.sleeping():
+            self._sample_time = now
+            return
+
+        period = 1.0 / self.sample_rate()
+        count = int((now - self._sample_time) / period)
+        if count > 0:
+            self._sample_time += count * period
+            self.samples += count
+            self.on_samples(count, self._sample_time)
+
+    ## @brief Hook called when new samples are taken, it latches the last sample in the data registers.
+    #  @param count: The number of samples taken since the last call.
+    #  @param sample_time: The time of the last sample, in seconds.
+    def on_samples(self, count: int, sample_time: float):
+
+        data = self.sample_data(sample_time)
+        self.regs[_MPU6050_ACCEL_OUT:_MPU6050_ACCEL_OUT + 14] = data
+        self.regs[_MPU6050_INT_STATUS] |= 0x01  # DATA_RDY_INT
+        if self.regs[_MPU6050_INT_ENABLE] & 0x01:
+            self._int_pulses += count
+
+        accel = struct.unpack_from(">3h", data)
+        if self.regs[_MPU6050_INT_ENABLE] & 0x40 and self._motion_ref is not None:
+            accel_lsb = 16384 >> ((self.regs[_MPU6050_ACCEL_CONFIG] >> 3) & 0x03)
+            threshold = max(1, self.regs[_MPU6050_MOT_THR] * 0.002 * accel_lsb)
+            if any(abs(a - b) >= threshold for a, b in zip(accel, self._motion_ref)):
+                if not self.regs[_MPU6050_INT_STATUS] & 0x40:
+                    self._int_pulses += 1  # a latched pin rises only once
+                self.regs[_MPU6050_INT_STATUS] |= 0x40  # MOT_INT
+        self._motion_ref = accel
+
+        fifo_en = self.regs[_MPU6050_FIFO_EN]
+        if self.regs[_MPU6050_USER_CTRL] & 0x40 and fifo_en:
+            # Only the samples that can still be in the FIFO are computed
+            frame_size = sum(end - start for bit, start, end in _MPU6050_FIFO_FIELDS if fifo_en & bit)
+            period = 1.0 / self.sample_rate()
+            first = max(0, count - (_MPU6050_FIFO_SIZE // frame_size + 1))
+            for i in range(first, count):
+                data = self.sample_data(sample_time - (count - 1 - i) * period)
+                for bit, start, end in _MPU6050_FIFO_FIELDS:
+                    if fifo_en & bit:
+                        self.fifo += data[start:end]
+            if first > 0 or len(self.fifo) > _MPU6050_FIFO_SIZE:
+                del self.fifo[:len(self.fifo) - _MPU6050_FIFO_SIZE]
+                self.regs[_MPU6050_INT_STATUS] |= 0x10  # FIFO_OFLOW_INT
+
+    ## @brief Converts the physical state at a given time into the 14 bytes of the data registers.
+    #  @param sample_time: The sample time in seconds.
+    #  @return: The ACCEL_OUT, TEMP_OUT and GYRO_OUT registers as bytes.
+    def sample_data(self, sample_time: float) -> bytes:
+
+        if self.signal is not None:
+            values = self.signal(sample_time)
+            accel, gyro = values[0:3], values[3:6]
+        else:
+            accel, gyro = self.accel_g, self.gyro_dps
+
+        accel_lsb = 16384 >> ((self.regs[_MPU6050_ACCEL_CONFIG] >> 3) & 0x03)
+        gyro_lsb = _MPU6050_GYRO_LSB[(self.regs[_MPU6050_GYRO_CONFIG] >> 3) & 0x03]
+        counts = [round(a * accel_lsb) for a in accel]
+        counts.append(round((self.temperature - 36.53) * 340))
+        counts.extend(round(g * gyro_lsb) for g in gyro)
+        return struct.pack(">7h", *(max(-32768, min(32767, c)) for c in counts))
+
+    ## @brief Takes the samples due at the current time and pulses int_pin for the new samples.
+    #  @details The model is updated at the start of every transaction, but the pin is only pulsed here, outside
+    #           of the bus transactions, because the pin handler may start a transaction itself. Call it whenever
+    #           time passes on the simulated board, like the sample clock of the real device.
+    #  @return: The number of pulses.
+    def tick(self) -> int:
+
+        self.begin()
+        pulses = self._int_pulses
+        self._int_pulses = 0
+        if self.int_pin is not None:
+            for _ in range(pulses):
+                self.int_pin.drive(1)
+                self.int_pin.drive(0)
+        return pulses
+
+    def read_register(self, reg: int) -> int:
+
+        value = self.regs[reg]
+        if reg == _MPU6050_PWR_MGMT_1 and self.clock() < self._reset_until:
+            value |= 0x80
+        elif reg == _MPU6050_INT_STATUS:
+            self.regs[reg] = 0
+        elif reg == _MPU6050_FIFO_COUNT:
+            value = len(self.fifo) >> 8
+        elif reg == _MPU6050_FIFO_COUNT + 1:
+            value = len(self.fifo) & 0xFF
+        elif reg == _MPU6050_FIFO_R_W:
+            value = self.fifo.pop(0) if self.fifo else 0
+        return value
+
+    def next_register(self, reg: int) -> int:
+
+        # Burst reads of FIFO_R_W keep reading the FIFO
+        if reg == _MPU6050_FIFO_R_W:
+            return reg
+        return super().next_register(reg)
+
+    def write_register(self, reg: int, value: int):
+
+        if reg == _MPU6050_PWR_MGMT_1 and value & 0x80:
+            self._power_on()
+            self._reset_until = self.clock() + self.reset_time
+        elif reg == _MPU6050_INT_ENABLE:
+            # The pulses of the previous interrupt sources went to whatever handler was attached then
+            self.regs[reg] = value
+            self._int_pulses = 0
+        elif reg in (_MPU6050_SMPLRT_DIV, _MPU6050_CONFIG):
+            self.regs[reg] = value
+            self._sample_time = self.clock()
+        elif reg == _MPU6050_SIG_PATH_RESET:
+            # The reset bits clear themselves, resetting the data registers and the sample clock
+            self.regs[_MPU6050_ACCEL_OUT:_MPU6050_ACCEL_OUT + 14] = bytes(14)
+            self._sample_time = self.clock()
+        elif reg == _MPU6050_USER_CTRL:
+            if value & 0x04:  # FIFO_RESET
+                self.fifo = bytearray()
+            self.regs[reg] = value & ~0x07
+        elif reg in (_MPU6050_WHO_AM_I, _MPU6050_FIFO_COUNT, _MPU6050_FIFO_COUNT + 1, _MPU6050_FIFO_R_W):
+            pass  # read-only registers, FIFO writes are not modeled
+        elif _MPU6050_INT_STATUS <= reg < _MPU6050_GYRO_OUT + 6:
+            pass  # read-only registers
+        else:
+            self.regs[reg] = value
+
+# BMP280 registers used by the model
+_BMP280_CALIB = 0x88
+_BMP280_ID = 0xD0
+_BMP280_RESET = 0xE0
+_BMP280_STATUS = 0xF3
+_BMP280_CTRL_MEAS = 0xF4
+_BMP280_CONFIG = 0xF5
+_BMP280_DATA = 0xF7
+
+# Calibration and raw readings of the BMP280 datasheet example, also used by BMP280.load_test_calibration()
+_BMP280_TEST_CALIBRATION = (27504, 26435, -1000, 36477, -10685, 3024, 2855, 140, -7, 15500, -14600, 6000)
+_BMP280_TEST_T_RAW = 519888
+_BMP280_TEST_P_RAW = 415148
+
+## @brief Register-level model of the BMP280 pressure and temperature sensor.
+#  @details Models the chip ID, the calibration block (0x88 to 0x9F), the soft reset register, ctrl_meas, config,
+#           the measuring bit of the status register and the data registers. A forced measurement takes the maximum
+#           conversion time of the datasheet for the selected oversampling, then updates the data registers with
+#           t_raw and p_raw and returns the device to sleep mode. In normal mode the data registers always hold the
+#           latest raw values.
+class SimBMP280(SimDevice):
+
+    ## @brief Constructor for the SimBMP280 class.
+    #  @param addr: The I2C address, 0x76 or 0x77.
+    #  @param calibration: The 12 trimming coefficients T1 to T3 and P1 to P9.
+    #  @param clock: Function returning the current time in seconds, time.monotonic by default.
+    def __init__(self, addr: int = 0x76, calibration=_BMP280_TEST_CALIBRATION, clock=None):
+
+        super().__init__(addr, 256, 8, clock)
+        ## Raw temperature reading (20 bits)
+        self.t_raw = _BMP280_TEST_T_RAW
+        ## Raw pressure reading (20 bits)
+        self.p_raw = _BMP280_TEST_P_RAW
+        self.regs[_BMP280_CALIB:_BMP280_CALIB + 24] = struct.pack("<HhhHhhhhhhhh", *calibration)
+        self.regs[_BMP280_ID] = 0x58
+        self._power_on()
+
+    ## @brief Restores the power-on values of the control, status and data registers.
+    def _power_on(self):
+
+        self.regs[_BMP280_STATUS] = 0
+        self.regs[_BMP280_CTRL_MEAS] = 0
+        self.regs[_BMP280_CONFIG] = 0
+        self.regs[_BMP280_DATA:_BMP280_DATA + 6] = b"\x80\x00\x00\x80\x00\x00"
+        self._conversion_end = None
+
+    ## @brief Maximum conversion time of a measurement for the oversampling settings in ctrl_meas.
+    #  @return: The conversion time in seconds.
+    def conversion_time(self) -> float:
+
+        ctrl_meas = self.regs[_BMP280_CTRL_MEAS]
+        osrs_t = (ctrl_meas >> 5) & 0x07
+        osrs_p = (ctrl_meas >> 2) & 0x07
+        time_ms = 1.25
+        if osrs_t:
+            time_ms += 2.3 * (1 << (min(osrs_t, 5) - 1))
+        if osrs_p:
+            time_ms += 2.3 * (1 << (min(osrs_p, 5) - 1)) + 0.575
+        return time_ms / 1000
+
+    ## @brief Writes the raw readings to the data registers, honoring skipped measurements.
+    def _latch(self):
+
+        ctrl_meas = self.regs[_BMP280_CTRL_MEAS]
+        p_raw = self.p_raw if ctrl_meas & 0x1C else 0x80000
+        t_raw = self.t_raw if ctrl_meas & 0xE0 else 0x80000
+        data = self.regs
+        data[_BMP280_DATA] = (p_raw >> 12) & 0xFF
+        data[_BMP280_DATA + 1] = (p_raw >> 4) & 0xFF
+        data[_BMP280_DATA + 2] = (p_raw & 0x0F) << 4
+        data[_BMP280_DATA + 3] = (t_raw >> 12) & 0xFF
+        data[_BMP280_DATA + 4] = (t_raw >> 4) & 0xFF
+        data[_BMP280_DATA + 5] = (t_raw & 0x0F) << 4
+
+    def begin(self):
+
+        if self._conversion_end is not None and self.clock() >= self._conversion_end:
+            # Forced measurement done, back to sleep mode
+            self._conversion_end = None
+            self._latch()
+            self.regs[_BMP280_STATUS] &= ~0x08
+            self.regs[_BMP280_CTRL_MEAS] &= ~0x03
+        elif self.regs[_BMP280_CTRL_MEAS] & 0x03 == 0x03:
+            self._latch()
+
+    def write_register(self, reg: int, value: int):
+
+        if reg == _BMP280_RESET:
+            if value == 0xB6:
+                self._power_on()
+        elif reg == _BMP280_CTRL_MEAS:
+            self.regs[reg] = value
+            if value & 0x03 in (0x01, 0x02):
+                self._conversion_end = self.clock() + self.conversion_time()
+                self.regs[_BMP280_STATUS] |= 0x08
+        elif reg == _BMP280_CONFIG:
+            self.regs[reg] = value
+
+# DS1307 registers used by the model
+_DS1307_SECONDS = 0x00
+_DS1307_CONTROL = 0x07
+
+## @brief Register-level model of the DS1307 real time clock.
+#  @details Models the BCD time registers (0x00 to 0x06), which keep counting with the host clock while the clock
+#           halt (CH) bit is clear, the control register and the 56 bytes of RAM (0x08 to 0x3F). The register pointer
+#           wraps around from 0x3F to 0x00. The registers power on with 01/01/00 00:00:00, day 1 and CH set.
+class SimDS1307(SimDevice):
+
+    ## @brief Constructor for the SimDS1307 class.
+    #  @param addr: The I2C address.
+    #  @param clock: Function returning the current time in seconds, time.monotonic by default.
+    def __init__(self, addr: int = 0x68, clock=None):
+
+        super().__init__(addr, 64, 8, clock)
+        self.regs[0:8] = bytes([0x80, 0x00, 0x00, 0x01, 0x01, 0x01, 0x00, 0x03])
+        self._tick_time = self.clock()
+
+    ## @brief Advances the time registers by the whole seconds elapsed since the last update.
+    def begin(self):
+
+        now = self.clock()
+        elapsed = int(now - self._tick_time)
+        if self.regs[_DS1307_SECONDS] & 0x80:
+            self._tick_time = now
+            return
+        if elapsed <= 0:
+            return
+        self._tick_time += elapsed
+
+        regs = self.regs
+        seconds = calendar.timegm((2000 + _bcd2dec(regs[6]), _bcd2dec(regs[5]), _bcd2dec(regs[4]),
+                                   _bcd2dec(regs[2] & 0x3F), _bcd2dec(regs[1]), _bcd2dec(regs[0] & 0x7F),
+                                   0, 0, 0)) + elapsed
+        days = seconds // 86400 - (seconds - elapsed) // 86400
+        now_tuple = time.gmtime(seconds)
+        regs[0] = _dec2bcd(now_tuple[5])
+        regs[1] = _dec2bcd(now_tuple[4])
+        regs[2] = _dec2bcd(now_tuple[3])
+        regs[3] = (regs[3] - 1 + days) % 7 + 1
+        regs[4] = _dec2bcd(now_tuple[2])
+        regs[5] = _dec2bcd(now_tuple[1])
+        regs[6] = _dec2bcd(now_tuple[0] % 100)
+
+    def write_register(self, reg: int, value: int):
+
+        if reg <= 0x06:
+            # Writing the time registers restarts the one second countdown
+            self._tick_time = self.clock()
+        self.regs[reg] = value
+
+    def next_register(self, reg: int) -> int:
+
+        return (reg + 1) & 0x3F
+
+## @brief Model of the AT24C32 serial EEPROM (4 KB, 32-byte pages, 16-bit memory addresses).
+#  @details A write transaction stores its bytes in the addressed page, rolling over to the start of the same page
+#           like the real device, and starts an internal write cycle of write_time seconds during which the device
+#           does not acknowledge its address. Reads roll over from the last byte to the first one.
+class SimAT24C32N(SimDevice):
+
+    ## @brief Constructor for the SimAT24C32N class.
+    #  @param addr: The I2C address, 0x50 to 0x57.
+    #  @param pages: The number of pages.
+    #  @param bpp: The number of bytes per page.
+    #  @param write_time: Duration of the internal write cycle in seconds.
+    #  @param clock: Function returning the current time in seconds, time.monotonic by default.
+    def __init__(self, addr: int = 0x50, pages: int = 128, bpp: int = 32, write_time: float = 0.005, clock=None):
+
+        super().__init__(addr, pages * bpp, 16, clock)
+        self.regs[:] = b"\xff" * len(self.regs)
+        self.bpp = bpp
+        self.write_time = write_time
+        self._busy_until = 0.0
+
+    def acknowledge(self) -> bool:
+
+        return self.clock() >= self._busy_until
+
+    def write(self, data):
+
+        if len(data) < 2:
+            return
+        self.pointer = ((data[0] << 8) | data[1]) % len(self.regs)
+        if len(data) > 2:
+            # The address counter rolls over inside the page on writes
+            page = self.pointer - self.pointer % self.bpp
+            for i in range(2, len(data)):
+                self.regs[page + (self.pointer + i - 2) % self.bpp] = data[i]
+            self._busy_until = self.clock() + self.write_time
+
+# Number of argument bytes of the SSD1306 commands that take arguments
+_SSD1306_COMMAND_ARGS = {0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0x8D: 1, 0xA8: 1, 0xD3: 1, 0xD5: 1, 0xD9: 1, 0xDA: 1, 0xDB: 1}
+
+## @brief Model of the SSD1306 OLED controller on the I2C bus.
+#  @details Decodes the control bytes (Co and D/C# bits) of each write transaction, the column (0x21) and page (0x22)
+#           address commands, display on/off and writes the data bytes to the display RAM with horizontal addressing,
+#           so the frame sent by ssd1306.py can be checked however its transfers are split.
+class SimSSD1306(SimDevice):
+
+    ## @brief Constructor for the SimSSD1306 class.
+    #  @param addr: The I2C address, 0x3C or 0x3D.
+    #  @param width: The display width in pixels.
+    #  @param height: The display height in pixels.
+    def __init__(self, addr: int = 0x3C, width: int = 128, height: int = 64):
+
+        super().__init__(addr, 0)
+        self.width = width
+        self.pages = height // 8
+        ## Display RAM, one byte per column of each page of 8 rows
+        self.gddram = bytearray(width * self.pages)
+        self.display_on = False
+        self.frames = 0
+        self._command = []
+        self._column_range = (0, width - 1)
+        self._page_range = (0, self.pages - 1)
+        self._column = 0
+        self._page = 0
+
+    ## @brief Handles a command byte, buffering the arguments of multi-byte commands.
+    def _write_command(self, value):
+
+        self._command.append(value)
+        if len(self._command) <= _SSD1306_COMMAND_ARGS.get(self._command[0], 0):
+            return
+        command = self._command
+        self._command = []
+        if command[0] == 0x21:
+            self._column_range = (command[1], command[2])
+            self._column = command[1]
+        elif command[0] == 0x22:
+            self._page_range = (command[1] & 0x07, command[2] & 0x07)
+            self._page = self._page_range[0]
+        elif command[0] in (0xAE, 0xAF):
+            self.display_on = command[0] == 0xAF
+
+    ## @brief Handles a data byte, writing it to the display RAM and advancing the address (horizontal mode).
+    def _write_data(self, value):
+
+        if self._page < self.pages and self._column < self.width:
+            self.gddram[self._page * self.width + self._column] = value
+        if self._column < self._column_range[1]:
+            self._column += 1
+            return
+        self._column = self._column_range[0]
+        if self._page < self._page_range[1]:
+            self._page += 1
+        else:
+            self._page = self._page_range[0]
+            self.frames += 1
+
+    def write(self, data):
+
+        i = 0
+        while i < len(data):
+            control = data[i]
+            i += 1
+            # Co = 0: the rest of the transaction has the type given by D/C#
+            end = i + 1 if control & 0x80 else len(data)
+            for value in data[i:end]:
+                if control & 0x40:
+                    self._write_data(value)
+                else:
+                    self._write_command(value)
+            i = end
+
+    def read(self, nbytes: int) -> bytes:
+
+        # Status byte: bit 6 set when the display is off
+        return bytes([0x00 if self.display_on else 0x40]) * nbytes
+
+## @brief Fake /dev/i2c-N device for upy_i2c_linux.LinuxI2C, serving the I2C_RDWR ioctls from a SimI2C bus.
+#  @details Pass it as the device argument of LinuxI2C. Every message of a combined transaction is routed to the
+#           device model at its address; a write message followed by a read message is a register read with a
+#           repeated START. The number of ioctl calls is kept in the ioctls attribute.
+class SimI2CDev:
+
+    ## @brief Constructor for the SimI2CDev class.
+    #  @param i2c: The SimI2C bus with the device models.
+    def __init__(self, i2c):
+
+        self.i2c = i2c
+        self.ioctls = 0
+        self.path = None
+
+    def open(self, path: str) -> int:
+
+        self.path = path
+        return 3
+
+    def close(self, fd: int):
+
+        self.path = None
+
+    def ioctl(self, fd: int, request: int, arg):
+
+        import ctypes
+        from upy_i2c_linux import I2C_RDWR, I2C_M_RD
+
+        self.ioctls += 1
+        if request != I2C_RDWR:
+            raise OSError(errno.EINVAL)
+
+        msgs = [arg.msgs[i] for i in range(arg.nmsgs)]
+        i = 0
+        while i < len(msgs):
+            msg = msgs[i]
+            device = self.i2c._target(msg.addr)
+            if msg.flags & I2C_M_RD:
+                data = device.read(msg.len)
+                ctypes.memmove(msg.buf, data, msg.len)
+                self.i2c._account(1, msg.len)
+            elif i + 1 < len(msgs) and msgs[i + 1].flags & I2C_M_RD and msgs[i + 1].addr == msg.addr:
+                # Write-then-read with a repeated START
+                reply = msgs[i + 1]
+                device.write(ctypes.string_at(msg.buf, msg.len))
+                data = device.read(reply.len)
+                ctypes.memmove(reply.buf, data, reply.len)
+                self.i2c._account(2 + msg.len, reply.len, 1)
+                i += 1
+            else:
+                if msg.len:
+                    device.write(ctypes.string_at(msg.buf, msg.len))
+                self.i2c._account(1 + msg.len, 0)
+            i += 1
+        return 0
+
+## @brief Simulated GPIO pin with the machine.Pin methods used by the drivers (value and irq).
+#  @details A device model (or the test code) changes the level of an input pin with drive(), which calls the
+#           handler registered with irq() on the matching edges. The handler runs right away, like a hard
+#           interrupt, and the callbacks it schedules with micropython.schedule also run right away on the host.
+class SimPin:
+
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    ## @brief Constructor for the SimPin class, with the same signature as machine.Pin.
+    #  @param id: The pin number.
+    #  @param mode: The pin mode, IN or OUT.
+    #  @param pull: The pull resistor, ignored.
+    #  @param value: The initial level.
+    def __init__(self, id, mode=IN, pull=None, value=0):
+
+        self.id = id
+        self.mode = mode
+        self._value = value
+        self._handler = None
+        self._trigger = 0
+        ## Number of times the handler was called
+        self.irqs = 0
+
+    ## @brief Reads or sets the pin level, like machine.Pin.value().
+    def value(self, value=None):
+
+        if value is None:
+            return self._value
+        self._value = 1 if value else 0
+
+    def __call__(self, value=None):
+
+        return self.value(value)
+
+    def on(self):
+
+        self.value(1)
+
+    def off(self):
+
+        self.value(0)
+
+    ## @brief Registers the edge handler, like machine.Pin.irq().
+    #  @param handler: Function called with the pin, or None to remove the handler.
+    #  @param trigger: IRQ_RISING, IRQ_FALLING or both.
+    #  @param hard: Ignored, the handler always runs right away.
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+
+        self._handler = handler
+        self._trigger = trigger
+
+    ## @brief Changes the level of the pin from outside, calling the handler on a matching edge.
+    #  @param level: The new level, 0 or 1.
+    def drive(self, level: int):
+
+        level = 1 if level else 0
+        previous = self._value
+        self._value = level
+        if self._handler is None or level == previous:
+            return
+        if self._trigger & (self.IRQ_RISING if level else self.IRQ_FALLING):
+            self.irqs += 1
+            self._handler(self)
+
+## @brief Registers the host replacements of the MicroPython modules, with SimI2C as machine.I2C and SimPin as
+#         machine.Pin.
+#  @details Call it before importing the drivers. See upy_host_compat.install().
+def install():
+
+    upy_host_compat.install(machine={"I2C": SimI2C, "Pin": SimPin})
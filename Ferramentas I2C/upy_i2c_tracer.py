@@ -0,0 +1,250 @@
+"""!
+@file upy_i2c_tracer.py
+@brief MicroPython I2C transaction tracer and bus utilization profiler
+@details This library provides the I2CTracer class, a wrapper around an I2C object that can be passed to any driver of
+         this repository (MPU6050, BMP280, DS1307, AT24C32N, SSD1306_I2C, ...) in place of the bus. Every transaction
+         is forwarded to the bus and recorded with its device address, register, direction, byte count and duration.
+         The tracer reports per-device and per-register transaction counts, bytes and the estimated bus occupancy at
+         the configured clock frequency. It runs on MicroPython and on the host (CPython).
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Import utime library to measure the duration of the transactions
+import utime
+
+# Directions of the recorded transactions
+READ = "R"
+WRITE = "W"
+
+## @brief Estimates the time a transaction takes on the I2C bus.
+#  @details Every byte, including the address bytes, takes 9 clock cycles (8 data bits and the ACK bit), plus one
+#           cycle for the START and one for the STOP conditions and one more for each repeated START.
+#  @param freq: The bus clock frequency in Hz.
+#  @param nbytes: The number of bytes on the bus, including the device and register address bytes.
+#  @param restarts: The number of repeated START conditions.
+#  @return: The transaction time in microseconds.
+def transfer_time_us(freq: int, nbytes: int, restarts: int = 0) -> float:
+
+    return (9 * nbytes + 2 + restarts) * 1000000 / freq
+
+## @brief A wrapper around an I2C object that records every transaction.
+#  @details The register of a readfrom_mem/writeto_mem transaction is its memory address. For writeto/writevto it is
+#           the first byte written, which is the register address for register-based devices and the control byte
+#           for the SSD1306 (0x80 for commands, 0x40 for display data). For readfrom it is None.
+class I2CTracer:
+
+    ## @brief Constructor for the I2CTracer class.
+    #  @param i2c: The I2C bus to be traced.
+    #  @param freq: The bus clock frequency in Hz used to estimate the bus occupancy. If None, the freq attribute of
+    #               the bus is used when present, or the standard mode 100 kHz.
+    #  @param log_size: Number of most recent transactions kept in the transaction log (0 disables the log).
+    def __init__(self, i2c, freq: int = None, log_size: int = 0):
+
+        if freq is None:
+            freq = getattr(i2c, "freq", 100000)
+
+        self._i2c = i2c
+        self.freq = freq
+        self._log = [None] * log_size
+        self.reset()
+
+    ## @brief Clears the statistics and the transaction log, restarting the measurement window.
+    def reset(self):
+
+        self._stats = {}
+        self._log_count = 0
+        self.errors = 0
+        self._start_us = utime.ticks_us()
+
+    ## @brief Forwards any other attribute (init, scan, ...) to the traced bus.
+    def __getattr__(self, name):
+
+        return getattr(self._i2c, name)
+
+    ## @brief Records a transaction.
+    #  @param addr: The device address.
+    #  @param reg: The register (see the class description).
+    #  @param direction: READ or WRITE.
+    #  @param nbytes: Number of data bytes transferred.
+    #  @param overhead: Number of address bytes on the bus (device address and register address bytes).
+    #  @param restarts: Number of repeated START conditions.
+    #  @param start_us: Value of utime.ticks_us() when the transaction started.
+    def _record(self, addr, reg, direction, nbytes, overhead, restarts, start_us):
+
+        duration_us = utime.ticks_diff(utime.ticks_us(), start_us)
+        bus_us = transfer_time_us(self.freq, nbytes + overhead, restarts)
+
+        key = (addr, reg, direction)
+        entry = self._stats.get(key)
+        if entry is None:
+            entry = [0, 0, 0.0, 0]
+            self._stats[key] = entry
+        entry[0] += 1
+        entry[1] += nbytes
+        entry[2] += bus_us
+        entry[3] += duration_us
+
+        if self._log:
+            self._log[self._log_count % len(self._log)] = (addr, reg, direction, nbytes, duration_us)
+        self._log_count += 1
+
+    def readfrom_mem(self, addr: int, memaddr: int, nbytes: int, addrsize: int = 8):
+
+        start_us = utime.ticks_us()
+        try:
+            return self._i2c.readfrom_mem(addr, memaddr, nbytes, addrsize=addrsize)
+        except OSError:
+            self.errors += 1
+            raise
+        finally:
+            self._record(addr, memaddr, READ, nbytes, 2 + addrsize // 8, 1, start_us)
+
+    def readfrom_mem_into(self, addr: int, memaddr: int, buf, addrsize: int = 8):
+
+        start_us = utime.ticks_us()
+        try:
+            return self._i2c.readfrom_mem_into(addr, memaddr, buf, addrsize=addrsize)
+        except OSError:
+            self.errors += 1
+            raise
+        finally:
+            self._record(addr, memaddr, READ, len(buf), 2 + addrsize // 8, 1, start_us)
+
+    def writeto_mem(self, addr: int, memaddr: int, buf, addrsize: int = 8):
+
+        start_us = utime.ticks_us()
+        try:
+            return self._i2c.writeto_mem(addr, memaddr, buf, addrsize=addrsize)
+        except OSError:
+            self.errors += 1
+            raise
+        finally:
+            self._record(addr, memaddr, WRITE, len(buf), 1 + addrsize // 8, 0, start_us)
+
+    def readfrom(self, addr: int, nbytes: int, stop: bool = True):
+
+        start_us = utime.ticks_us()
+        try:
+            return self._i2c.readfrom(addr, nbytes, stop)
+        except OSError:
+            self.errors += 1
+            raise
+        finally:
+            self._record(addr, None, READ, nbytes, 1, 0, start_us)
+
+    def readfrom_into(self, addr: int, buf, stop: bool = True):
+
+        start_us = utime.ticks_us()
+        try:
+            return self._i2c.readfrom_into(addr, buf, stop)
+        except OSError:
+            self.errors += 1
+            raise
+        finally:
+            self._record(addr, None, READ, len(buf), 1, 0, start_us)
+
+    def writeto(self, addr: int, buf, stop: bool = True):
+
+        start_us = utime.ticks_us()
+        try:
+            return self._i2c.writeto(addr, buf, stop)
+        except OSError:
+            self.errors += 1
+            raise
+        finally:
+            self._record(addr, buf[0] if len(buf) else None, WRITE, len(buf), 1, 0, start_us)
+
+    def writevto(self, addr: int, vector, stop: bool = True):
+
+        start_us = utime.ticks_us()
+        try:
+            return self._i2c.writevto(addr, vector, stop)
+        except OSError:
+            self.errors += 1
+            raise
+        finally:
+            nbytes = 0
+            reg = None
+            for buf in vector:
+                if reg is None and len(buf):
+                    reg = buf[0]
+                nbytes += len(buf)
+            self._record(addr, reg, WRITE, nbytes, 1, 0, start_us)
+
+    ## @brief Number of transactions recorded since the last reset.
+    @property
+    def transactions(self) -> int:
+
+        return self._log_count
+
+    ## @brief Time elapsed since the last reset.
+    #  @return: The measurement window in microseconds.
+    def elapsed_us(self) -> int:
+
+        return utime.ticks_diff(utime.ticks_us(), self._start_us)
+
+    ## @brief Statistics per device, register and direction.
+    #  @return: A dict mapping (address, register, direction) to (transactions, bytes, bus time in us, duration in us).
+    def by_register(self):
+
+        return {key: tuple(entry) for key, entry in self._stats.items()}
+
+    ## @brief Statistics per device.
+    #  @return: A dict mapping the device address to (transactions, bytes, bus time in us, duration in us).
+    def by_device(self):
+
+        devices = {}
+        for key, entry in self._stats.items():
+            total = devices.get(key[0])
+            if total is None:
+                total = [0, 0, 0.0, 0]
+                devices[key[0]] = total
+            for i in range(4):
+                total[i] += entry[i]
+        return {addr: tuple(total) for addr, total in devices.items()}
+
+    ## @brief Estimated bus occupancy in the measurement window.
+    #  @param addr: Device address to restrict the estimate to, or None for the whole bus.
+    #  @return: The fraction of the elapsed time the bus was busy, from 0.0 to 1.0.
+    def utilization(self, addr: int = None) -> float:
+
+        elapsed_us = self.elapsed_us()
+        if elapsed_us <= 0:
+            return 0.0
+        bus_us = 0.0
+        for key, entry in self._stats.items():
+            if addr is None or key[0] == addr:
+                bus_us += entry[2]
+        return bus_us / elapsed_us
+
+    ## @brief The most recent transactions, oldest first.
+    #  @return: A list of (address, register, direction, bytes, duration in us) tuples.
+    def log(self):
+
+        size = len(self._log)
+        if self._log_count <= size:
+            return self._log[:self._log_count]
+        first = self._log_count % size
+        return self._log[first:] + self._log[:first]
+
+    ## @brief Prints the per-device and per-register statistics and the bus occupancy.
+    def report(self):
+
+        elapsed_us = self.elapsed_us()
+        print("I2C trace: {} transactions, {} errors, {:.1f} ms at {} kHz".format(
+            self._log_count, self.errors, elapsed_us / 1000, self.freq // 1000))
+
+        print("{:>6} {:>8} {:>10} {:>10} {:>7}".format("addr", "count", "bytes", "bus ms", "busy %"))
+        devices = self.by_device()
+        for addr in sorted(devices):
+            count, nbytes, bus_us, _ = devices[addr]
+            print("  0x{:02X} {:>8d} {:>10d} {:>10.2f} {:>7.2f}".format(
+                addr, count, nbytes, bus_us / 1000, 100 * bus_us / elapsed_us if elapsed_us > 0 else 0))
+
+        print("{:>6} {:>6} {:>3} {:>6} {:>8} {:>10} {:>10}".format("addr", "reg", "dir", "count", "bytes", "bus ms", "avg us"))
+        for key in sorted(self._stats, key=lambda key: (key[0], -1 if key[1] is None else key[1], key[2])):
+            count, nbytes, bus_us, duration_us = self._stats[key]
+            reg = "-" if key[1] is None else "0x{:02X}".format(key[1])
+            print("  0x{:02X} {:>6} {:>3} {:>6d} {:>8d} {:>10.2f} {:>10.1f}".format(
+                key[0], reg, key[2], count, nbytes, bus_us / 1000, duration_us / count))
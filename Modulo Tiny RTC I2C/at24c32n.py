@@ -47,15 +47,21 @@ class AT24C32N(object):
 
     def write(self, addr, buf):
         """Write one or more bytes to the EEPROM starting from a specific address"""
+        for _ in self._write_pages(addr, buf):
+            time.sleep_ms(5)
+
+    def _write_pages(self, addr, buf):
+        """Write the data one page at a time, yielding after each page write so the
+        caller can wait for the 5 ms write cycle (sleeping, or awaiting in at24c32n_async)"""
         offset = addr % self.bpp
         partial = 0
         # partial page write
         if offset > 0:
             partial = self.bpp - offset
             self.i2c.writeto_mem(self.i2c_addr, addr, buf[0:partial], addrsize=16)
-            time.sleep_ms(5)
+            yield
             addr += partial
         # full page write
         for i in range(partial, len(buf), self.bpp):
             self.i2c.writeto_mem(self.i2c_addr, addr+i-partial, buf[i:i+self.bpp], addrsize=16)
-            time.sleep_ms(5)
\ No newline at end of file
+            yield
\ No newline at end of file
@@ -0,0 +1,20 @@
+"""
+MicroPython TinyRTC I2C Module, AT24C32N EEPROM
+uasyncio version of at24c32n.py: the 5 ms write cycle after each page is awaited
+instead of slept, so the other tasks keep running during long writes.
+"""
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+from at24c32n import AT24C32N
+
+class AsyncAT24C32N(AT24C32N):
+    """uasyncio driver for the AT24C32N 32K EEPROM."""
+
+    async def write(self, addr, buf):
+        """Write one or more bytes to the EEPROM starting from a specific address"""
+        for _ in self._write_pages(addr, buf):
+            await asyncio.sleep(0.005)
@@ -0,0 +1,92 @@
+"""!
+@file hcsr04_async.py
+@brief Biblioteca uasyncio para controlar o módulo ultrassônico HC-SR04 com Raspberry Pi Pico e MicroPython
+@details Essa biblioteca estende a classe HCSR04 de hcsr04.py. Em vez de aguardar o pulso de echo em um laço de
+         espera ocupada, as bordas de subida e de descida do pino ECHO são capturadas por interrupção e a medição
+         é aguardada com um uasyncio.ThreadSafeFlag, devolvendo o controle para as outras tarefas.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+# Importa a classe Pin da biblioteca machine para controlar o hardware do Raspberry Pi Pico
+from machine import Pin
+# Importa a biblioteca utime para usar funções relacionadas ao tempo
+import utime
+# Importa a biblioteca uasyncio para executar tarefas concorrentes (ThreadSafeFlag e wait_for_ms só existem nela)
+import uasyncio as asyncio
+# Importa a classe HCSR04 da biblioteca hcsr04.py
+from hcsr04 import HCSR04
+
+## @brief Classe para controlar o módulo ultrassônico HC-SR04 com uasyncio
+class AsyncHCSR04(HCSR04):
+    ## @brief Construtor da classe AsyncHCSR04
+    #  @param trigger_pin Número do pino do Raspberry Pi Pico conectado ao pino TRIG do HC-SR04
+    #  @param echo_pin Número do pino do Raspberry Pi Pico conectado ao pino ECHO do HC-SR04
+    #  @param timeout_ms Tempo limite (em milissegundos) para aguardar a resposta do HC-SR04 (opcional, valor padrão: 20 ms)
+    def __init__(self, trigger_pin, echo_pin, timeout_ms=20):
+
+        super().__init__(trigger_pin, echo_pin, timeout_ms)
+
+        ## Instantes das bordas de subida e de descida do pino de echo (em us)
+        self._rise_us = None
+        self._fall_us = None
+        ## Flag sinalizada pela interrupção na borda de descida do pino de echo
+        self._echo_flag = asyncio.ThreadSafeFlag()
+
+        # Configura a interrupção do pino de echo nas duas bordas
+        self.echo.irq(self._echo_irq, Pin.IRQ_RISING | Pin.IRQ_FALLING, hard=True)
+
+    ## @brief Rotina de interrupção do pino de echo, marca o instante de cada borda
+    #  @param pin Pino que gerou a interrupção
+    def _echo_irq(self, pin):
+
+        if pin.value():
+            self._rise_us = utime.ticks_us()
+        else:
+            self._fall_us = utime.ticks_us()
+            self._echo_flag.set()
+
+    ## @brief Método para medir o tempo de trânsito do sinal ultrassônico sem bloquear as outras tarefas
+    #  @return Tempo de trânsito do sinal ultrassônico em us, ou 0 se o tempo limite for excedido
+    async def measure(self):
+
+        # Descarta uma borda de descida de uma medição anterior
+        self._echo_flag.clear()
+        self._rise_us = None
+
+        # Garante que o pino de trigger está em nível baixo e envia um pulso de 10 microssegundos
+        self.trigger.low()
+        utime.sleep_us(2)
+        self.trigger.high()
+        utime.sleep_us(10)
+        self.trigger.low()
+
+        # Aguarda a borda de descida do pino de echo, devolvendo o controle para as outras tarefas
+        try:
+            await asyncio.wait_for_ms(self._echo_flag.wait(), self.timeout_ms)
+        except asyncio.TimeoutError:
+            # Retorna um valor inválido
+            return 0
+
+        # Verifica se a borda de subida foi capturada nesta medição
+        if self._rise_us is None:
+            return 0
+
+        # Calcula o tempo de trânsito do sinal ultrassônico
+        return utime.ticks_diff(self._fall_us, self._rise_us)
+
+    ## @brief Método para obter a distância medida pelo sensor HC-SR04 em cm sem bloquear as outras tarefas
+    #  @return Distância em cm
+    async def measure_cm(self):
+
+        # (distancia) [cm] = (tempo até a reflexão ser detectada) [us] * 0.0343 [cm/µs] / 2
+        echo_time_us = await self.measure()
+        return echo_time_us * 0.0343 / 2
+
+    ## @brief Método para obter a distância medida pelo sensor HC-SR04 em mm sem bloquear as outras tarefas
+    #  @return Distância em mm
+    async def measure_mm(self):
+
+        # (distancia) [mm] = (tempo até a reflexão ser detectada) [us] * 0.343 [mm/µs] / 2
+        echo_time_us = await self.measure()
+        return echo_time_us * 0.343 / 2
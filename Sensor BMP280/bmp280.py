@@ -1,5 +1,7 @@
+import json
 from micropython import const
 from ustruct import unpack as unp
+from utime import sleep_us, ticks_add, ticks_diff, ticks_ms, ticks_us
 
 # Author David Stenwall (david at stenwall.io)
 
@@ -76,6 +78,18 @@ _BMP280_CASE_MATRIX = [
     [BMP280_POWER_NORMAL, BMP280_OS_ULTRAHIGH, BMP280_IIR_FILTER_16, BMP280_STANDBY_0_5]
 ]
 
+# Compensation paths
+# 64-bit integer path of the datasheet, 1/256 Pa resolution
+BMP280_COMP_64BIT = const(0)
+# 32-bit integer path of the datasheet, 1 Pa resolution, stays within small ints
+# from -40 to 85 C and allocates nothing, within 7 Pa of the 64-bit path
+BMP280_COMP_32BIT = const(1)
+# floating point path of the datasheet, single precision on MicroPython, within
+# 0.1 Pa and 0.01 C of the 64-bit path in a float32 emulation on CPython
+# (both checked by Ferramentas I2C/bmp280_compensacao_exemplo.py)
+BMP280_COMP_FLOAT = const(2)
+
+_BMP280_REGISTER_CALIB = const(0x88)
 _BMP280_REGISTER_ID = const(0xD0)
 _BMP280_REGISTER_RESET = const(0xE0)
 _BMP280_REGISTER_STATUS = const(0xF3)
@@ -84,40 +98,105 @@ _BMP280_REGISTER_CONFIG = const(0xF5)  # IIR filter config
 
 _BMP280_REGISTER_DATA = const(0xF7)
 
+_BMP280_CHIP_ID = const(0x58)
+
+# T1 to T3 and P1 to P9, 0x88 to 0x9F
+# < little-endian
+# H unsigned short
+# h signed short
+_BMP280_CALIB_FORMAT = '<HhhHhhhhhhhh'
+_BMP280_CALIB_SIZE = const(24)
+
+
+class BMP280CalibrationFile:
+    # Keeps the calibration blocks in a JSON file in flash, keyed by chip ID and
+    # address. The trimming is unique to each sensor, delete the file when the
+    # sensor is replaced.
+    def __init__(self, path='bmp280_calibration.json'):
+        self.path = path
+
+    def _load_all(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self, key):
+        calib = self._load_all().get('%02x_%02x' % key)
+        if calib is None or len(calib) != _BMP280_CALIB_SIZE:
+            return None
+        return bytes(calib)
+
+    def save(self, key, calib):
+        data = self._load_all()
+        data['%02x_%02x' % key] = list(calib)
+        with open(self.path, 'w') as f:
+            json.dump(data, f)
+
+
+class BMP280CalibrationEEPROM:
+    # Keeps one calibration block in an EEPROM such as the AT24C32N (any object
+    # with read(addr, nbytes) and write(addr, buf)), as a 28-byte record: magic,
+    # chip ID, address, calibration block and checksum. Place the record inside
+    # one 32-byte page.
+    MAGIC = 0xB2
+
+    def __init__(self, eeprom, addr=0):
+        self.eeprom = eeprom
+        self.addr = addr
+
+    def load(self, key):
+        record = self.eeprom.read(self.addr, _BMP280_CALIB_SIZE + 4)
+        if (record[0] != self.MAGIC or record[1] != key[0] or record[2] != key[1]
+                or sum(record[:-1]) & 0xFF != record[-1]):
+            return None
+        return bytes(record[3:-1])
+
+    def save(self, key, calib):
+        record = bytearray([self.MAGIC, key[0], key[1]]) + calib
+        record.append(sum(record) & 0xFF)
+        self.eeprom.write(self.addr, record)
+
 
 class BMP280:
-    def __init__(self, i2c_bus, addr=0x76, use_case=BMP280_CASE_HANDHELD_DYN):
+    def __init__(self, i2c_bus, addr=0x76, use_case=BMP280_CASE_HANDHELD_DYN, new_read_ms=0,
+                 calibration_cache=None, compensation=BMP280_COMP_64BIT):
         self._bmp_i2c = i2c_bus
         self._i2c_addr = addr
-
-        # read calibration data
-        # < little-endian
-        # H unsigned short
-        # h signed short
-        self._T1 = unp('<H', self._read(0x88, 2))[0]
-        self._T2 = unp('<h', self._read(0x8A, 2))[0]
-        self._T3 = unp('<h', self._read(0x8C, 2))[0]
-        self._P1 = unp('<H', self._read(0x8E, 2))[0]
-        self._P2 = unp('<h', self._read(0x90, 2))[0]
-        self._P3 = unp('<h', self._read(0x92, 2))[0]
-        self._P4 = unp('<h', self._read(0x94, 2))[0]
-        self._P5 = unp('<h', self._read(0x96, 2))[0]
-        self._P6 = unp('<h', self._read(0x98, 2))[0]
-        self._P7 = unp('<h', self._read(0x9A, 2))[0]
-        self._P8 = unp('<h', self._read(0x9C, 2))[0]
-        self._P9 = unp('<h', self._read(0x9E, 2))[0]
+        assert compensation in (BMP280_COMP_64BIT, BMP280_COMP_32BIT, BMP280_COMP_FLOAT)
+        self.compensation = compensation
+
+        # read calibration data, from the cache if it has the block of this
+        # sensor, otherwise in one burst
+        key = (_BMP280_CHIP_ID, addr)
+        calib = None
+        if calibration_cache is not None:
+            calib = calibration_cache.load(key)
+        if calib is None:
+            calib = self._read(_BMP280_REGISTER_CALIB, _BMP280_CALIB_SIZE)
+            if calibration_cache is not None and self.chip_id[0] == _BMP280_CHIP_ID:
+                calibration_cache.save(key, calib)
+        (self._T1, self._T2, self._T3,
+         self._P1, self._P2, self._P3, self._P4, self._P5,
+         self._P6, self._P7, self._P8, self._P9) = unp(_BMP280_CALIB_FORMAT, calib)
 
         # output raw
         self._t_raw = 0
         self._t_fine = 0
-        self._t = 0
+        self._t = None
 
         self._p_raw = 0
-        self._p = 0
+        self._p = None
+
+        self._data = bytearray(6)
 
         self.read_wait_ms = 0  # interval between forced measure and readout
-        self._new_read_ms = 200  # interval between
-        self._last_read_ts = 0
+        self.ready_at = None  # ticks_us when the triggered measurement is done
+        # interval in which the properties are served from the last burst read
+        self.new_read_ms = new_read_ms
+        self._last_read_ts = None
+        self._test_data = False  # serve load_test_data() until a real read
 
         if use_case is not None:
             self.use_case(use_case)
@@ -131,18 +210,23 @@ class BMP280:
         return self._bmp_i2c.writeto_mem(self._i2c_addr, addr, b_arr)
 
     def _gauge(self):
-        # TODO limit new reads
+        if self._test_data:
+            return
+        now = ticks_ms()
+        if (self._last_read_ts is not None
+                and ticks_diff(now, self._last_read_ts) < self.new_read_ms):
+            return
         # read all data at once (as by spec)
-        d = self._read(_BMP280_REGISTER_DATA, 6)
+        d = self._data
+        self._bmp_i2c.readfrom_mem_into(self._i2c_addr, _BMP280_REGISTER_DATA, d)
+        self._last_read_ts = now
 
         self._p_raw = (d[0] << 12) + (d[1] << 4) + (d[2] >> 4)
         self._t_raw = (d[3] << 12) + (d[4] << 4) + (d[5] >> 4)
-
-        self._t_fine = 0
-        self._t = 0
-        self._p = 0
+        self._calc_t_fine()
 
     def reset(self):
+        self._test_data = False
         self._write(_BMP280_REGISTER_RESET, 0xB6)
 
     def load_test_calibration(self):
@@ -162,6 +246,8 @@ class BMP280:
     def load_test_data(self):
         self._t_raw = 519888
         self._p_raw = 415148
+        self._test_data = True
+        self._calc_t_fine()
 
     def print_calibration(self):
         print("T1: {} {}".format(self._T1, type(self._T1)))
@@ -177,48 +263,151 @@ class BMP280:
         print("P8: {} {}".format(self._P8, type(self._P8)))
         print("P9: {} {}".format(self._P9, type(self._P9)))
 
+    @property
+    def calibration(self):
+        return (self._T1, self._T2, self._T3,
+                self._P1, self._P2, self._P3, self._P4, self._P5,
+                self._P6, self._P7, self._P8, self._P9)
+
     def _calc_t_fine(self):
-        # From datasheet page 22
+        self._t_fine = self._t_fine_of(self._t_raw)
+        self._t = None
+        self._p = None
+
+    def _t_fine_of(self, t_raw):
+        if self.compensation == BMP280_COMP_FLOAT:
+            # From datasheet section 8.1
+            var1 = (t_raw / 16384.0 - self._T1 / 1024.0) * self._T2
+            var2 = t_raw / 131072.0 - self._T1 / 8192.0
+            return var1 + var2 * var2 * self._T3
+        # From datasheet page 22, within small ints from -40 to 85 C
+        var1 = (((t_raw >> 3) - (self._T1 << 1)) * self._T2) >> 11
+        var2 = (((((t_raw >> 4) - self._T1)
+                  * ((t_raw >> 4)
+                     - self._T1)) >> 12)
+                * self._T3) >> 14
+        return var1 + var2
+
+    def read(self):
+        # temperature and pressure of one burst read and one compensation pass
         self._gauge()
-        if self._t_fine == 0:
-            var1 = (((self._t_raw >> 3) - (self._T1 << 1)) * self._T2) >> 11
-            var2 = (((((self._t_raw >> 4) - self._T1)
-                      * ((self._t_raw >> 4)
-                         - self._T1)) >> 12)
-                    * self._T3) >> 14
-            self._t_fine = var1 + var2
+        return self._temperature(), self._pressure()
 
     @property
     def temperature(self):
-        self._calc_t_fine()
-        if self._t == 0:
-            self._t = ((self._t_fine * 5 + 128) >> 8) / 100.
-        return self._t
+        self._gauge()
+        return self._temperature()
 
     @property
     def pressure(self):
-        # From datasheet page 22
-        self._calc_t_fine()
-        if self._p == 0:
-            var1 = self._t_fine - 128000
-            var2 = var1 * var1 * self._P6
-            var2 = var2 + ((var1 * self._P5) << 17)
-            var2 = var2 + (self._P4 << 35)
-            var1 = ((var1 * var1 * self._P3) >> 8) + ((var1 * self._P2) << 12)
-            var1 = (((1 << 47) + var1) * self._P1) >> 33
-
-            if var1 == 0:
-                return 0
-
-            p = 1048576 - self._p_raw
-            p = int((((p << 31) - var2) * 3125) / var1)
-            var1 = (self._P9 * (p >> 13) * (p >> 13)) >> 25
-            var2 = (self._P8 * p) >> 19
-
-            p = ((p + var1 + var2) >> 8) + (self._P7 << 4)
-            self._p = p / 256.0
+        self._gauge()
+        return self._pressure()
+
+    def _temperature(self):
+        if self._t is None:
+            self._t = self._temperature_of(self._t_fine)
+        return self._t
+
+    def _pressure(self):
+        if self._p is None:
+            self._p = self._pressure_of(self._p_raw, self._t_fine)
         return self._p
 
+    def _temperature_of(self, t_fine):
+        if self.compensation == BMP280_COMP_FLOAT:
+            return t_fine / 5120.0
+        return ((t_fine * 5 + 128) >> 8) / 100.
+
+    def _pressure_of(self, p_raw, t_fine):
+        if self.compensation == BMP280_COMP_32BIT:
+            return self._pressure_32(p_raw, t_fine)
+        if self.compensation == BMP280_COMP_FLOAT:
+            return self._pressure_float(p_raw, t_fine)
+        return self._pressure_64(p_raw, t_fine)
+
+    def _pressure_64(self, p_raw, t_fine):
+        # From datasheet page 22
+        var1 = t_fine - 128000
+        var2 = var1 * var1 * self._P6
+        var2 = var2 + ((var1 * self._P5) << 17)
+        var2 = var2 + (self._P4 << 35)
+        var1 = ((var1 * var1 * self._P3) >> 8) + ((var1 * self._P2) << 12)
+        var1 = (((1 << 47) + var1) * self._P1) >> 33
+
+        if var1 == 0:
+            return 0
+
+        p = 1048576 - p_raw
+        p = int((((p << 31) - var2) * 3125) / var1)
+        var1 = (self._P9 * (p >> 13) * (p >> 13)) >> 25
+        var2 = (self._P8 * p) >> 19
+
+        p = ((p + var1 + var2) >> 8) + (self._P7 << 4)
+        return p / 256.0
+
+    def _pressure_float(self, p_raw, t_fine):
+        # From datasheet section 8.1
+        var1 = t_fine / 2.0 - 64000.0
+        var2 = var1 * var1 * self._P6 / 32768.0
+        var2 = var2 + var1 * self._P5 * 2.0
+        var2 = var2 / 4.0 + self._P4 * 65536.0
+        var1 = (self._P3 * var1 * var1 / 524288.0 + self._P2 * var1) / 524288.0
+        var1 = (1.0 + var1 / 32768.0) * self._P1
+        if var1 == 0:
+            return 0
+        p = 1048576.0 - p_raw
+        p = (p - var2 / 4096.0) * 6250.0 / var1
+        var1 = self._P9 * p * p / 2147483648.0
+        var2 = p * self._P8 / 32768.0
+        return p + (var1 + var2 + self._P7) / 16.0
+
+    def _pressure_32(self, p_raw, t_fine):
+        # 32-bit fixed point path of the datasheet (section 8.2), with the
+        # products that exceed 30 bits split so every intermediate value stays a
+        # small int on MicroPython from -40 to 85 C
+        var1 = (t_fine >> 1) - 64000
+        # (a * a) >> 11 and >> 13 with a = var1 >> 2, from a = 2h + r:
+        # (h * (h + r)) >> 9 and >> 11
+        a = var1 >> 2
+        h = a >> 1
+        square = h * (h + (a & 1))
+        var2 = (square >> 9) * self._P6
+        var2 = var2 + ((var1 * self._P5) << 1)
+        var2 = (var2 >> 2) + (self._P4 << 16)
+        # (P3 * ((a * a) >> 13)) >> 3 and (P2 * var1) >> 1, summed and >> 18
+        square >>= 11
+        x = self._P3 * (square >> 3) + ((self._P3 * (square & 7)) >> 3)
+        y = ((var1 * (self._P2 >> 8)) << 7) + ((var1 * (self._P2 & 0xFF)) >> 1)
+        var1 = (x >> 18) + (y >> 18) + (((x & 0x3FFFF) + (y & 0x3FFFF)) >> 18)
+        # ((32768 + var1) * P1) >> 15
+        var1 += 32768
+        var1 = ((var1 * (self._P1 >> 8)) + ((var1 * (self._P1 & 0xFF)) >> 8)) >> 7
+        if var1 == 0:
+            return 0
+        p = (1048576 - p_raw) - (var2 >> 12)
+        # (p * 6250) // var1, or ((p * 3125) // var1) * 2 as the datasheet does
+        # once p * 3125 reaches 2^31
+        k = 6250 if p < 687195 else 3125
+        q, rem = divmod((p >> 8) * k, var1)
+        p = (q << 8) + ((rem << 8) + (p & 0xFF) * k) // var1
+        if k == 3125:
+            p <<= 1
+        var1 = (self._P9 * (((p >> 3) * (p >> 3)) >> 13)) >> 12
+        var2 = ((p >> 2) * self._P8) >> 13
+        return p + ((var1 + var2 + self._P7) >> 4)
+
+    def compensate_batch(self, p_raw, t_raw, temperature, pressure):
+        # Compensate arrays of raw samples with the compensation path of the
+        # sensor, writing C and Pa into the preallocated temperature and
+        # pressure arrays
+        t_fine_of = self._t_fine_of
+        temperature_of = self._temperature_of
+        pressure_of = self._pressure_of
+        for i in range(len(t_raw)):
+            t_fine = t_fine_of(t_raw[i])
+            temperature[i] = temperature_of(t_fine)
+            pressure[i] = pressure_of(p_raw[i], t_fine)
+
     def _write_bits(self, address, value, length, shift=0):
         d = self._read(address)[0]
         m = int('1' * length, 2) << shift
@@ -303,6 +492,49 @@ class BMP280:
     def force_measure(self):
         self.power_mode = BMP280_POWER_FORCED
 
+    @staticmethod
+    def _conversion_us(ctrl):
+        # Maximum measurement time from the oversampling in ctrl_meas (datasheet
+        # section 3.8.1), 1.25 ms + 2.3 ms per temperature sample
+        # + (2.3 ms per pressure sample + 0.575 ms)
+        t_os = ctrl >> 5 & 0x07
+        p_os = ctrl >> 2 & 0x07
+        t = 1250
+        if t_os:
+            t += 2300 << (min(t_os, 5) - 1)
+        if p_os:
+            t += (2300 << (min(p_os, 5) - 1)) + 575
+        return t
+
+    def trigger(self):
+        # Start a forced measurement and return the time until it is done in us,
+        # also kept in ready_at
+        ctrl = self._read(_BMP280_REGISTER_CONTROL)[0]
+        self._write(_BMP280_REGISTER_CONTROL, (ctrl & 0xFC) | BMP280_POWER_FORCED)
+        t = self._conversion_us(ctrl)
+        self.ready_at = ticks_add(ticks_us(), t)
+        return t
+
+    def ready_in_us(self):
+        # Time left until the triggered measurement is done, 0 if it already is
+        if self.ready_at is None:
+            return 0
+        return max(0, ticks_diff(self.ready_at, ticks_us()))
+
+    def collect(self):
+        # Temperature and pressure of the triggered measurement, waiting for the
+        # rest of the conversion time instead of polling is_measuring
+        wait = self.ready_in_us()
+        if wait:
+            sleep_us(wait)
+        return self._collect()
+
+    def _collect(self):
+        self.ready_at = None
+        self._last_read_ts = None  # a fresh burst, whatever new_read_ms is
+        self._test_data = False
+        return self.read()
+
     def normal_measure(self):
         self.power_mode = BMP280_POWER_NORMAL
 
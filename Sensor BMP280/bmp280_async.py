@@ -0,0 +1,21 @@
+"""
+MicroPython BMP280 pressure and temperature sensor
+uasyncio version of bmp280.py: the conversion time of a forced measurement is
+awaited instead of slept or polled, so the other tasks keep running meanwhile.
+Needs uasyncio for sleep_ms; the conversion time is rounded up to whole ms.
+"""
+
+import uasyncio as asyncio
+
+from bmp280 import BMP280
+
+
+class AsyncBMP280(BMP280):
+    """uasyncio driver for the BMP280 pressure and temperature sensor."""
+
+    async def measure(self):
+        """Trigger a forced measurement, suspend for its conversion time and return
+        the temperature and the pressure"""
+        t = self.trigger()
+        await asyncio.sleep_ms((t + 999) // 1000)
+        return self._collect()
@@ -10,8 +10,8 @@
 
 # Importa as classes Pin e I2C da biblioteca machine para controlar o hardware do Raspberry Pi Pico
 from machine import Pin, I2C
-# Importa a classe BMP280 da biblioteca bmp280.py
-from bmp280 import BMP280
+# Importa as classes BMP280 e BMP280CalibrationFile da biblioteca bmp280.py
+from bmp280 import BMP280, BMP280CalibrationFile
 # Importa a biblioteca utime para usar funções relacionadas ao tempo
 import utime
 
@@ -22,15 +22,14 @@ i2c0_sda_pin = 8
 # Inicializa o I2C0 com os pinos GPIO9 (SCL) e GPIO8 (SDA)
 i2c0 = I2C(0, scl=Pin(i2c0_slc_pin), sda=Pin(i2c0_sda_pin), freq=100000)
 
-# Inicializa o sensor BMP280
-bmp280 = BMP280(i2c0)
+# Inicializa o sensor BMP280, guardando a calibração na memória flash para as próximas inicializações
+bmp280 = BMP280(i2c0, calibration_cache=BMP280CalibrationFile())
 
 # Loop infinito
 while True:
     
-    # Lê a temperatura e a pressão do sensor
-    bmp280_temp = bmp280.temperature
-    bmp280_press = bmp280.pressure
+    # Lê a temperatura e a pressão do sensor em uma única leitura I2C
+    bmp280_temp, bmp280_press = bmp280.read()
     
     # Exibe os valores lidos no console
     print("Temperatura: {:.2f} C".format(bmp280_temp))
@@ -0,0 +1,39 @@
+"""
+BMP280 pressure and temperature sensor, host post-processing
+Vectorized NumPy compensation of logged raw BMP280 samples, for CPython on the
+host. compensate() runs the 64-bit integer path of the datasheet on whole int64
+arrays, with the same results as BMP280.temperature and BMP280.pressure.
+"""
+
+import numpy as np
+
+
+def compensate(calibration, p_raw, t_raw):
+    """Compensate arrays of raw samples. calibration is BMP280.calibration (T1 to
+    T3 and P1 to P9). Returns the temperature in C and the pressure in Pa"""
+    T1, T2, T3, P1, P2, P3, P4, P5, P6, P7, P8, P9 = (np.int64(c) for c in calibration)
+    p_raw = np.asarray(p_raw, dtype=np.int64)
+    t_raw = np.asarray(t_raw, dtype=np.int64)
+
+    # From datasheet page 22
+    var1 = (((t_raw >> 3) - (T1 << 1)) * T2) >> 11
+    var2 = (((((t_raw >> 4) - T1) * ((t_raw >> 4) - T1)) >> 12) * T3) >> 14
+    t_fine = var1 + var2
+    temperature = ((t_fine * 5 + 128) >> 8) / 100.
+
+    var1 = t_fine - 128000
+    var2 = var1 * var1 * P6
+    var2 = var2 + ((var1 * P5) << 17)
+    var2 = var2 + (P4 << 35)
+    var1 = ((var1 * var1 * P3) >> 8) + ((var1 * P2) << 12)
+    var1 = (((np.int64(1) << 47) + var1) * P1) >> 33
+    valid = var1 != 0
+    var1 = np.where(valid, var1, 1)
+
+    p = 1048576 - p_raw
+    p = (((p << 31) - var2) * 3125) // var1
+    var1 = (P9 * (p >> 13) * (p >> 13)) >> 25
+    var2 = (P8 * p) >> 19
+    p = ((p + var1 + var2) >> 8) + (P7 << 4)
+    pressure = np.where(valid, p / 256.0, 0.0)
+    return temperature, pressure
@@ -38,13 +38,20 @@ class MatrixKeyboard:
     def _scan_keys(self):
         """Escaneia o teclado para identificar quais teclas estão sendo pressionadas."""
         pressed_keys = []
+        for _ in self._scan_rows(pressed_keys):
+            utime.sleep_ms(1)  # Estabiliza a linha
+        return pressed_keys
+
+    def _scan_rows(self, pressed_keys):
+        """Gerador que escaneia uma linha por vez, adicionando as teclas pressionadas à lista.
+        Após ativar cada linha, devolve o controle para quem chama aguardar a estabilização."""
         for row in self.rows:
             self._set_row_mode(row, 1)  # Configura para alta impedância
 
         for row_num, row in enumerate(self.rows):
             self._set_row_mode(row, 0)
             row.value(0)
-            utime.sleep_ms(1)  # Estabiliza a linha
+            yield  # Aguarda a estabilização da linha
 
             for col_num, col in enumerate(self.cols):
                 if col.value() == 0:
@@ -52,8 +59,6 @@ class MatrixKeyboard:
 
             self._set_row_mode(row, 1)
 
-        return pressed_keys
-
     def _debounce(self, keys):
         """Debouncing para estabilizar a detecção de teclas pressionadas."""
         if not keys:
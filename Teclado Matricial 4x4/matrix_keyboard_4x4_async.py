@@ -0,0 +1,58 @@
+"""
+@file matrix_keyboard_4x4_async.py
+@brief Biblioteca uasyncio para controlar um teclado de matriz 4x4 com Raspberry Pi Pico e MicroPython
+@details Esta biblioteca estende a classe MatrixKeyboard de matrix_keyboard_4x4.py. A estabilização de cada linha
+         e o tempo de debounce são aguardados com uasyncio, devolvendo o controle para as outras tarefas.
+@author Rodrigo França
+@date 2026-10-17
+"""
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+from matrix_keyboard_4x4 import MatrixKeyboard
+
+class AsyncMatrixKeyboard(MatrixKeyboard):
+    """
+    @brief Classe para manipular um teclado de matriz 4x4 com uasyncio.
+    """
+    def __init__(self, rows_pins, cols_pins, debounce_time_ms=20, poll_time_ms=20):
+        """
+        @param rows_pins Lista dos pinos GPIO conectados às linhas do teclado.
+        @param cols_pins Lista dos pinos GPIO conectados às colunas do teclado.
+        @param debounce_time_ms Tempo de debounce em milissegundos (padrão: 20ms).
+        @param poll_time_ms Intervalo entre as varreduras de next_key em milissegundos (padrão: 20ms).
+        """
+        super().__init__(rows_pins, cols_pins, debounce_time_ms)
+        self.poll_time_ms = poll_time_ms
+        self._pending_keys = []
+
+    async def _scan_keys_async(self):
+        """Escaneia o teclado aguardando a estabilização de cada linha sem bloquear."""
+        pressed_keys = []
+        for _ in self._scan_rows(pressed_keys):
+            await asyncio.sleep(0.001)  # Estabiliza a linha
+        return pressed_keys
+
+    async def get_pressed_keys(self):
+        """Obtém os caracteres das teclas que foram pressionadas após o debouncing."""
+        current_keys = await self._scan_keys_async()
+        falling_edges = [key for key in current_keys if key not in self.last_keys]
+        key_chars = []
+        if falling_edges:
+            await asyncio.sleep(self.debounce_time_ms / 1000)
+            stable_keys = await self._scan_keys_async()
+            key_chars = [self.key_map[row][col] for row, col in stable_keys if (row, col) in falling_edges]
+            current_keys = stable_keys
+        self.last_keys = current_keys  # Atualiza o estado das últimas teclas
+        return key_chars
+
+    async def next_key(self):
+        """Aguarda até uma tecla ser pressionada e retorna o seu caractere."""
+        while not self._pending_keys:
+            self._pending_keys = await self.get_pressed_keys()
+            if not self._pending_keys:
+                await asyncio.sleep(self.poll_time_ms / 1000)
+        return self._pending_keys.pop(0)